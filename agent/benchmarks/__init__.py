@@ -0,0 +1,5 @@
+"""
+Benchmarks: end-to-end pipeline runs and micro-benchmarks of the hot paths, against synthetic repositories
+served as local bare remotes and a deterministic fake LLM. No network, tokens or provider accounts needed.
+Run from agent/: python -m benchmarks --help
+"""
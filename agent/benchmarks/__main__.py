@@ -0,0 +1,95 @@
+"""
+python -m benchmarks [--suite micro,e2e] [--size small,medium] [--out results.json] [--baseline old.json]
+
+Writes {"meta": ..., "results": [...]} (seconds) to --out; with --baseline, prints p50 ratios against an
+earlier results file and exits 1 when --fail-on-regression is set and any benchmark got slower than
+--threshold. Synthetic remotes are cached under --root (a temporary directory by default).
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from .harness import compare, configure, metadata, write_results
+from .synth import SIZES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="ai-dev-agent benchmarks")
+    parser.add_argument("--suite", default="micro,e2e", help="Comma-separated: micro, e2e")
+    parser.add_argument("--size", default="small", help=f"Comma-separated: {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per micro-benchmark")
+    parser.add_argument("--tasks", type=int, default=8, help="Tickets per end-to-end run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tickets in flight (end-to-end)")
+    parser.add_argument("--mode", choices=("threads", "async"), default="threads", help="Pipeline flavour (e2e)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM seconds per request")
+    parser.add_argument("--llm-tps", type=float, default=0.0, help="Fake LLM output tokens/second (0 = instant)")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="NAME=VALUE",
+        help="Agent setting override as env var, e.g. --set GIT_BACKEND=cli (repeatable)",
+    )
+    parser.add_argument("--root", type=Path, default=None, help="Keep remotes and workspaces here")
+    parser.add_argument("--out", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold (p50 ratio - 1)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    overrides = dict(item.split("=", 1) for item in args.set)
+    root = args.root or Path(tempfile.mkdtemp(prefix="agent-bench-"))
+    configure(root, **overrides)
+
+    # Imported after configure(): some modules read settings at import time.
+    from .e2e import run_e2e
+    from .fake_llm import FakeLLM, fake_llm
+    from .micro import run_micro
+    from .synth import make_remote
+
+    suites = [s.strip() for s in args.suite.split(",") if s.strip()]
+    sizes = [s.strip() for s in args.size.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"Unknown size(s): {', '.join(unknown)}")
+    fake = FakeLLM(args.llm_latency, args.llm_tps)
+    results = []
+    try:
+        with fake_llm(fake):
+            for size in sizes:
+                remote = make_remote(SIZES[size], root)
+                if "micro" in suites:
+                    results += run_micro(remote, size, repeat=args.repeat)
+                if "e2e" in suites:
+                    results += run_e2e(remote, size, args.tasks, args.concurrency, args.mode)
+    finally:
+        if args.root is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    meta = metadata(
+        suites=suites, sizes=sizes, specs={s: SIZES[s]._asdict() for s in sizes}, overrides=overrides,
+        fake_llm={"latency_seconds": fake.latency_seconds, "tokens_per_second": fake.tokens_per_second,
+                  "requests": fake.requests},
+    )
+    write_results(args.out, meta, results)
+    for r in results:
+        s = r["stats"]
+        print(f"{r['suite']:5} {r['size']:7} {r['name']:24} n={s['n']:<3} p50={s['p50']:.4f}s p95={s['p95']:.4f}s")
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        rows = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['suite']:5} {row['size']:7} {row['name']:24} {row['baseline']:.4f}s -> {row['current']:.4f}s "
+                  f"x{row['ratio']}{flag}")
+        if args.fail_on_regression and any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+End-to-end benchmark: `tasks` tickets against one synthetic remote through run_pipeline (threads, `concurrency`
+in flight) or run_pipeline_async, with the fake LLM and a fake PR provider. Pushes go to the file:// remote.
+Reports per-task latency, throughput, per-stage time and outcome counts from the progress store.
+"""
+
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from src.core import delivery
+from src.core.async_pipeline import run_pipeline_async
+from src.core.delivery import get_delivery_worker
+from src.core.pipeline import run_pipeline
+from src.models.task import GitProvider, TaskContext
+from src.utils.progress import get_progress_store
+
+from .harness import result, summarize
+from .synth import Remote
+
+
+class FakeProvider:
+    """create_pull_request only; what delivery calls."""
+
+    def __init__(self) -> None:
+        self.pull_requests: list[dict[str, Any]] = []
+
+    def create_pull_request(self, **kwargs: Any) -> dict[str, Any]:
+        pr = {"url": f"https://example.invalid/pr/{len(self.pull_requests) + 1}", "number": len(self.pull_requests) + 1}
+        self.pull_requests.append(pr)
+        return pr
+
+
+def _tasks(remote: Remote, count: int) -> list[TaskContext]:
+    run = uuid.uuid4().hex[:6]  # fresh branch names: pushes to the shared remote never conflict
+    return [
+        TaskContext(
+            ticket_id=f"BENCH-{run}-{i}",
+            title=f"Add helper {i}",
+            description=f"Add a bench_helper function.\nTarget file: {remote.target_file}",
+            provider=GitProvider.GITHUB,
+            repo_owner=remote.owner,
+            repo_name=remote.name,
+            repo_full_name=remote.full_name,
+            default_branch="main",
+        )
+        for i in range(count)
+    ]
+
+
+def _timed(task: TaskContext) -> float:
+    started = time.perf_counter()
+    run_pipeline(task)
+    return time.perf_counter() - started
+
+
+async def _run_async(tasks: list[TaskContext], concurrency: int) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(task: TaskContext) -> float:
+        async with sem:
+            started = time.perf_counter()
+            await run_pipeline_async(task)
+            return time.perf_counter() - started
+
+    return list(await asyncio.gather(*(one(t) for t in tasks)))
+
+
+def _drain_outbox() -> None:
+    worker = get_delivery_worker()
+    while worker.pending():
+        due = worker._due()
+        if not due:
+            time.sleep(0.05)  # only backed-off retries left
+            continue
+        for path in due:
+            worker._process(path)
+
+
+def run_e2e(
+    remote: Remote, size: str, tasks: int = 8, concurrency: int = 4, mode: str = "threads"
+) -> list[dict[str, Any]]:
+    provider = FakeProvider()
+    saved = delivery.get_git_provider
+    delivery.get_git_provider = lambda _provider: provider
+    batch = _tasks(remote, tasks)
+    try:
+        started = time.perf_counter()
+        if mode == "async":
+            latencies = asyncio.run(_run_async(batch, concurrency))
+        else:
+            with ThreadPoolExecutor(concurrency, thread_name_prefix="bench") as pool:
+                latencies = list(pool.map(_timed, batch))
+        pipelines_done = time.perf_counter() - started
+        _drain_outbox()
+        wall = time.perf_counter() - started
+    finally:
+        delivery.get_git_provider = saved
+
+    store = get_progress_store()
+    statuses = [store.get(t.task_id) for t in batch]
+    states: dict[str, int] = {}
+    stages: dict[str, list[float]] = {}
+    errors = []
+    for status in statuses:
+        if status is None:
+            continue
+        states[status.state] = states.get(status.state, 0) + 1
+        for stage, seconds in status.stage_durations.items():
+            stages.setdefault(stage, []).append(seconds)
+        if status.error:
+            errors.append(status.error)
+    params = {"tasks": tasks, "concurrency": concurrency, "mode": mode}
+    results = [
+        result(
+            "e2e", "run_pipeline", size, summarize(latencies), **params,
+            wall_seconds=round(wall, 3), pipelines_seconds=round(pipelines_done, 3),
+            throughput_per_minute=round(60 * tasks / wall, 2), states=states,
+            pull_requests=len(provider.pull_requests), errors=errors[:5],
+        )
+    ]
+    for stage, samples in sorted(stages.items()):
+        results.append(result("e2e", f"stage:{stage}", size, summarize(samples), **params))
+    return results
@@ -0,0 +1,104 @@
+"""
+Deterministic stand-in for the Anthropic client. It is installed under src.services.llm, so spans, metrics,
+token accounting and the planner / implementer parsers run exactly as in production.
+Planning requests get a one-step plan for the file named by "Target file: <path>" in the ticket;
+implementation requests get an EDIT_FILE block that appends a function to that file's current content
+(taken from the prompt's "Relevant file contents"). Each response waits latency_seconds, plus
+output_tokens / tokens_per_second when that is set.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+from src.services import llm
+from src.services.prompts import PLANNING_SYSTEM
+
+RE_TARGET = re.compile(r"(?m)^Target file:\s*(\S+)\s*$")
+RE_PLAN_FILE = re.compile(r"(?m)^[-*]?\s*FILE:\s*(\S+)\s*$")
+
+
+class FakeLLM:
+    def __init__(self, latency_seconds: float = 0.0, tokens_per_second: float = 0.0) -> None:
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def respond(self, system: str, messages: list[dict[str, Any]]) -> SimpleNamespace:
+        prompt = "\n".join(m["content"] for m in messages if isinstance(m.get("content"), str))
+        text = self._plan(prompt) if system == PLANNING_SYSTEM else self._edit(prompt)
+        with self._lock:
+            self.requests += 1
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=(len(system) + len(prompt)) // 4, output_tokens=len(text) // 4),
+            stop_reason="end_turn",
+        )
+
+    def delay(self, response: SimpleNamespace) -> float:
+        delay = self.latency_seconds
+        if self.tokens_per_second > 0:
+            delay += response.usage.output_tokens / self.tokens_per_second
+        return delay
+
+    def _plan(self, prompt: str) -> str:
+        m = RE_TARGET.search(prompt)
+        path = m.group(1) if m else "bench_feature.py"
+        return f"- FILE: {path}\n  ACTION: modify\n  REASON: add the requested helper\nSUMMARY: Add bench_helper to {path}"
+
+    def _edit(self, prompt: str) -> str:
+        m = RE_PLAN_FILE.search(prompt) or RE_TARGET.search(prompt)
+        path = m.group(1) if m else "bench_feature.py"
+        current = ""
+        start = prompt.find(f"### {path}\n")
+        if start != -1:
+            current = prompt[start + len(path) + 5:]
+            current = re.split(r"\n### |\n## ", current, maxsplit=1)[0]
+            if current.startswith("(file not found)"):
+                current = ""
+        content = current.rstrip() + "\n\n\ndef bench_helper(x):\n    return x + 1\n"
+        return f"EDIT_FILE: {path}\n```python\n{content.lstrip()}```\n"
+
+
+class _Messages:
+    def __init__(self, fake: FakeLLM) -> None:
+        self._fake = fake
+
+    def create(self, *, system: str = "", messages: list[dict[str, Any]], **_: Any) -> SimpleNamespace:
+        response = self._fake.respond(system, messages)
+        time.sleep(self._fake.delay(response))
+        return response
+
+
+class _AsyncMessages(_Messages):
+    async def create(self, *, system: str = "", messages: list[dict[str, Any]], **_: Any) -> SimpleNamespace:
+        response = self._fake.respond(system, messages)
+        await asyncio.sleep(self._fake.delay(response))
+        return response
+
+
+class _Client:
+    def __init__(self, fake: FakeLLM) -> None:
+        self.messages = _Messages(fake)
+
+
+class _AsyncClient:
+    def __init__(self, fake: FakeLLM) -> None:
+        self.messages = _AsyncMessages(fake)
+
+
+@contextmanager
+def fake_llm(fake: FakeLLM) -> Iterator[FakeLLM]:
+    """Route llm.chat / chat_multi / chat_async to fake for the duration of the block."""
+    saved = llm._get_client, llm._get_async_client
+    llm._get_client = lambda: _Client(fake)
+    llm._get_async_client = lambda: _AsyncClient(fake)
+    try:
+        yield fake
+    finally:
+        llm._get_client, llm._get_async_client = saved
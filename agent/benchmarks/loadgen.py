@@ -0,0 +1,316 @@
+"""
+Webhook load generator: starts the app in-process (uvicorn on 127.0.0.1, pipeline workers in the same
+process) against a synthetic file:// remote with the fake LLM and a fake PR provider, then POSTs GitHub and
+GitLab issue payloads (scripts/sample_payloads) to /api/webhook/task at --rate per second for --duration
+seconds, open loop. Mixed in: redelivered webhooks (same delivery id: 200 duplicate), repeated tickets (new
+delivery id: 202 coalesced or 409 in progress) and bursts of --burst-size requests every --burst-every seconds.
+Reports accept latency percentiles, the share of each status code (409 / 429 / 503 rates), queue wait
+(accepted -> worker start, including any debounce window) and end-to-end completion time (webhook sent ->
+terminal state) of accepted tasks, and throughput.
+
+Run from agent/: python -m benchmarks.loadgen --rate 5 --duration 60 --out loadgen.json
+"""
+
+import argparse
+import copy
+import json
+import logging
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .harness import configure, metadata, summarize
+from .synth import SIZES
+
+SAMPLES = Path(__file__).resolve().parent.parent / "scripts" / "sample_payloads"
+TERMINAL = {"succeeded", "no_changes", "validation_failed", "skipped", "failed", "cancelled", "timed_out"}
+
+
+def _http_request(
+    method: str, url: str, data: dict | None = None, headers: dict[str, str] | None = None
+) -> tuple[int, str]:
+    body: bytes | None = None
+    all_headers = {"Content-Type": "application/json", **(headers or {})}
+    if data is not None:
+        body = json.dumps(data).encode("utf-8")
+    req = urllib.request.Request(url, data=body, headers=all_headers, method=method.upper())
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.getcode() or 0, resp.read().decode("utf-8", errors="replace")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", errors="replace")
+
+
+class Planned(NamedTuple):
+    at: float  # seconds after start
+    provider: str  # github | gitlab
+    ticket: int
+    delivery_id: str
+    kind: str  # new | duplicate (redelivery) | repeat (same ticket, new delivery) | burst
+
+
+class Sent(NamedTuple):
+    planned: Planned
+    lag: float  # send start - scheduled time (client saturation)
+    sent_at: float  # epoch seconds
+    latency: float
+    status: int
+    task_id: str | None
+
+
+def plan_requests(
+    rate: float, duration: float, duplicate_ratio: float, repeat_ratio: float, gitlab_ratio: float,
+    burst_every: float, burst_size: int, seed: int,
+) -> list[Planned]:
+    """Poisson arrivals at rate/s, plus bursts; deterministic for a seed."""
+    rng = random.Random(seed)
+    plan: list[Planned] = []
+    next_ticket = 1
+
+    def new(at: float, kind: str) -> Planned:
+        nonlocal next_ticket
+        provider = "gitlab" if rng.random() < gitlab_ratio else "github"
+        next_ticket += 1
+        return Planned(at, provider, next_ticket - 1, uuid.UUID(int=rng.getrandbits(128)).hex, kind)
+
+    t = rng.expovariate(rate) if rate > 0 else duration
+    while t < duration:
+        roll = rng.random()
+        if plan and roll < duplicate_ratio:
+            plan.append(rng.choice(plan)._replace(at=t, kind="duplicate"))
+        elif plan and roll < duplicate_ratio + repeat_ratio:
+            prev = rng.choice(plan)
+            plan.append(prev._replace(at=t, delivery_id=uuid.UUID(int=rng.getrandbits(128)).hex, kind="repeat"))
+        else:
+            plan.append(new(t, "new"))
+        t += rng.expovariate(rate)
+    if burst_every > 0 and burst_size > 0:
+        b = burst_every
+        while b < duration:
+            plan.extend(new(b, "burst") for _ in range(burst_size))
+            b += burst_every
+    return sorted(plan, key=lambda p: p.at)
+
+
+def _payload(templates: dict[str, dict], remote: Any, p: Planned) -> tuple[dict, dict[str, str]]:
+    body = copy.deepcopy(templates[p.provider])
+    title = f"Load test ticket {p.ticket}"
+    description = f"Add a bench_helper function.\nTarget file: {remote.target_file}"
+    if p.provider == "github":
+        body["issue"].update(number=p.ticket, title=title, body=description)
+        body["repository"].update(
+            full_name=remote.full_name, name=remote.name, owner={"login": remote.owner}, default_branch="main"
+        )
+        return body, {"X-GitHub-Event": "issues", "X-GitHub-Delivery": p.delivery_id}
+    body["object_attributes"].update(iid=p.ticket, title=title, description=description)
+    body["project"].update(path_with_namespace=remote.full_name, default_branch="main")
+    return body, {"X-Gitlab-Event": "Issue Hook", "X-Gitlab-Event-UUID": p.delivery_id}
+
+
+def fire(base_url: str, plan: list[Planned], templates: dict[str, dict], remote: Any, clients: int) -> list[Sent]:
+    """Send each planned request at its time (open loop: slow responses don't delay later sends)."""
+    results: list[Sent] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def send(p: Planned) -> None:
+        body, headers = _payload(templates, remote, p)
+        began = time.perf_counter()
+        sent_at = time.time()
+        try:
+            status, text = _http_request("POST", f"{base_url}/api/webhook/task", body, headers)
+        except OSError:
+            status, text = 0, ""
+        latency = time.perf_counter() - began
+        task_id = None
+        if status == 201:
+            try:
+                task_id = json.loads(text).get("task_id")
+            except ValueError:
+                pass
+        with lock:
+            results.append(Sent(p, began - start - p.at, sent_at, latency, status, task_id))
+
+    with ThreadPoolExecutor(clients, thread_name_prefix="loadgen") as pool:
+        for p in plan:
+            delay = start + p.at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, p)
+    return results
+
+
+def collect(base_url: str, sent: list[Sent], timeout: float) -> dict[str, dict[str, Any]]:
+    """Poll GET /api/tasks/{id} for accepted tasks until all are terminal or timeout passes."""
+    pending = {s.task_id for s in sent if s.task_id}
+    statuses: dict[str, dict[str, Any]] = {}
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        for task_id in list(pending):
+            code, text = _http_request("GET", f"{base_url}/api/tasks/{task_id}")
+            if code != 200:
+                continue
+            status = json.loads(text)
+            statuses[task_id] = status
+            if status["state"] in TERMINAL:
+                pending.discard(task_id)
+        if pending:
+            time.sleep(0.5)
+    return statuses
+
+
+def report(sent: list[Sent], statuses: dict[str, dict[str, Any]], duration: float, health: dict) -> dict[str, Any]:
+    codes: dict[str, int] = {}
+    for s in sent:
+        codes[str(s.status)] = codes.get(str(s.status), 0) + 1
+    total = len(sent) or 1
+    accepted = {s.task_id: s for s in sent if s.task_id}
+    completion, queue_wait, states = [], [], {}
+    for task_id, st in statuses.items():
+        states[st["state"]] = states.get(st["state"], 0) + 1
+        if st.get("started_at"):
+            queue_wait.append(st["started_at"] - st["created_at"])
+        if st["state"] in TERMINAL and st.get("finished_at"):
+            completion.append(st["finished_at"] - accepted[task_id].sent_at)
+    completed = [st for st in statuses.values() if st["state"] in TERMINAL]
+    last_finish = max((st["finished_at"] for st in completed), default=None)
+    first_send = min((s.sent_at for s in sent), default=None)
+    return {
+        "requests": len(sent),
+        "status_codes": codes,
+        "rates": {
+            "accepted_201": round(codes.get("201", 0) / total, 4),
+            "coalesced_202": round(codes.get("202", 0) / total, 4),
+            "duplicate_200": round(codes.get("200", 0) / total, 4),
+            "conflict_409": round(codes.get("409", 0) / total, 4),
+            "queue_full_429": round(codes.get("429", 0) / total, 4),
+            "saturated_503": round(codes.get("503", 0) / total, 4),
+        },
+        "accept_latency": summarize([s.latency for s in sent]),
+        "send_lag": summarize([max(0.0, s.lag) for s in sent]),
+        "queue_wait": summarize(queue_wait),
+        "completion": summarize(completion),
+        "states": states,
+        "unfinished": len(accepted) - len(completed),
+        "throughput_per_minute": {
+            "offered": round(60 * len(sent) / duration, 2),
+            "accepted": round(60 * len(accepted) / duration, 2),
+            "completed": round(60 * len(completed) / (last_finish - first_send), 2) if completed and first_send else 0.0,
+        },
+        "server": health,
+    }
+
+
+def _serve(port: int) -> tuple[Any, threading.Thread]:
+    import uvicorn
+
+    from src.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit(f"Server failed to start on port {port}")
+        time.sleep(0.05)
+    return server, thread
+
+
+def _print(summary: dict[str, Any]) -> None:
+    def line(name: str, s: dict[str, float]) -> str:
+        if not s.get("n"):
+            return f"{name:16} n=0"
+        return f"{name:16} n={s['n']:<5} p50={s['p50']:.3f}s p95={s['p95']:.3f}s p99={s['p99']:.3f}s max={s['max']:.3f}s"
+
+    print(f"requests {summary['requests']}  status codes {summary['status_codes']}")
+    print("rates " + "  ".join(f"{k}={v:.1%}" for k, v in summary["rates"].items()))
+    for key in ("accept_latency", "send_lag", "queue_wait", "completion"):
+        print(line(key, summary[key]))
+    print(f"states {summary['states']}  unfinished {summary['unfinished']}")
+    print("throughput/min " + "  ".join(f"{k}={v}" for k, v in summary["throughput_per_minute"].items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen", description="Webhook load generator")
+    parser.add_argument("--rate", type=float, default=2.0, help="New webhooks per second (Poisson)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of traffic")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05, help="Share of redelivered webhooks")
+    parser.add_argument("--repeat-ratio", type=float, default=0.05, help="Share of repeat events for a sent ticket")
+    parser.add_argument("--gitlab-ratio", type=float, default=0.3, help="Share of GitLab payloads")
+    parser.add_argument("--burst-every", type=float, default=10.0, help="Seconds between bursts (0 = none)")
+    parser.add_argument("--burst-size", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent HTTP senders")
+    parser.add_argument("--size", default="small", choices=list(SIZES), help="Synthetic repository")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake LLM seconds per request")
+    parser.add_argument("--llm-tps", type=float, default=0.0, help="Fake LLM output tokens/second (0 = instant)")
+    parser.add_argument("--drain-timeout", type=float, default=300.0, help="Seconds to wait for accepted tasks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="NAME=VALUE",
+        help="Agent setting override as env var, e.g. --set WORKER_CONCURRENCY=16 (repeatable)",
+    )
+    parser.add_argument("--root", type=Path, default=None, help="Keep remotes and workspaces here")
+    parser.add_argument("--out", type=Path, default=Path("loadgen-results.json"))
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    overrides = {"LOG_LEVEL": args.log_level.upper(), **dict(item.split("=", 1) for item in args.set)}
+    root = args.root or Path(tempfile.mkdtemp(prefix="agent-loadgen-"))
+    configure(root, **overrides)
+    logging.basicConfig(level=args.log_level.upper())
+
+    from src.core import delivery
+
+    from .e2e import FakeProvider
+    from .fake_llm import FakeLLM, fake_llm
+    from .synth import make_remote
+
+    remote = make_remote(SIZES[args.size], root)
+    templates = {
+        "github": json.loads((SAMPLES / "webhook_task_github.json").read_text(encoding="utf-8")),
+        "gitlab": json.loads((SAMPLES / "webhook_task_gitlab.json").read_text(encoding="utf-8")),
+    }
+    plan = plan_requests(
+        args.rate, args.duration, args.duplicate_ratio, args.repeat_ratio, args.gitlab_ratio,
+        args.burst_every, args.burst_size, args.seed,
+    )
+    provider = FakeProvider()
+    delivery.get_git_provider = lambda _provider: provider
+    fake = FakeLLM(args.llm_latency, args.llm_tps)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        with fake_llm(fake):
+            server, thread = _serve(args.port)
+            try:
+                print(f"Sending {len(plan)} webhooks over {args.duration:.0f}s to {base_url}")
+                sent = fire(base_url, plan, templates, remote, args.clients)
+                statuses = collect(base_url, sent, args.drain_timeout)
+                _, health = _http_request("GET", f"{base_url}/api/health")
+            finally:
+                server.should_exit = True
+                thread.join(timeout=30)
+    finally:
+        if args.root is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    summary = report(sent, statuses, args.duration, json.loads(health) if health else {})
+    meta = metadata(
+        load={k: v for k, v in vars(args).items() if k not in ("out", "root", "set")},
+        overrides=overrides, spec=SIZES[args.size]._asdict(), pull_requests=len(provider.pull_requests),
+    )
+    args.out.write_text(json.dumps({"meta": meta, "summary": summary}, indent=2) + "\n", encoding="utf-8")
+    _print(summary)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
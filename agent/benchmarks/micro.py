@@ -0,0 +1,74 @@
+"""
+Micro-benchmarks of the pipeline's hot paths on a synthetic repository:
+clone_repo (from the file:// remote), build_map and build_repo_map (fresh checkout), _apply_edits
+(an implementer response touching edit_files files) and run_validation (result cache cleared, and cached).
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from src.services import validator
+from src.services.codebase_map import build_map
+from src.services.git.clone import clone_repo
+from src.services.implementer import _apply_edits
+from src.services.symbol_index import build_repo_map
+
+from .harness import measure, result
+from .synth import Remote, _rel_path
+
+
+def _edit_response(remote: Remote, checkout: Path, files: int) -> str:
+    """EDIT_FILE blocks rewriting the first `files` generated files with one function appended."""
+    blocks = []
+    for i in range(min(files, remote.spec.files)):
+        rel = _rel_path(remote.spec, i)
+        content = (checkout / rel).read_text(encoding="utf-8")
+        blocks.append(f"EDIT_FILE: {rel}\n```text\n{content}\n// edited\n```\n")
+    return "\n".join(blocks)
+
+
+def run_micro(remote: Remote, size: str, repeat: int = 5, edit_files: int = 20) -> list[dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-micro-") as tmp:
+        tmp_path = Path(tmp)
+        counter = iter(range(1_000_000))
+        clones: list[Path] = []
+
+        def clone() -> None:
+            dest = tmp_path / f"clone-{next(counter)}"
+            clone_repo(remote.url, dest, branch="main")
+            clones.append(dest)
+
+        def discard() -> None:
+            for path in clones:
+                shutil.rmtree(path, ignore_errors=True)
+            clones.clear()
+
+        results.append(result("micro", "clone_repo", size, measure(clone, repeat, setup=discard)))
+        discard()
+
+        checkout = tmp_path / "checkout"
+        clone_repo(remote.url, checkout, branch="main")
+        results.append(result("micro", "build_map", size, measure(lambda: build_map(checkout), repeat)))
+        results.append(result("micro", "build_repo_map", size, measure(lambda: build_repo_map(checkout), repeat)))
+
+        response = _edit_response(remote, checkout, edit_files)
+        results.append(result(
+            "micro", "_apply_edits", size, measure(lambda: _apply_edits(checkout, response), repeat),
+            files=min(edit_files, remote.spec.files), response_bytes=len(response),
+        ))
+        # Validate the unedited tree; the edits above aren't valid Python.
+        shutil.rmtree(checkout)
+        clone_repo(remote.url, checkout, branch="main")
+
+        def clear_cache() -> None:
+            with validator._result_cache_lock:
+                validator._result_cache.clear()
+                validator._commands_cache.clear()
+
+        validate = lambda: validator.run_validation(checkout)  # noqa: E731
+        results.append(result("micro", "run_validation", size, measure(validate, repeat, setup=clear_cache)))
+        results.append(result("micro", "run_validation_cached", size, measure(validate, repeat)))
+    return results
@@ -0,0 +1,157 @@
+"""
+Synthetic repositories of parameterized size (files, languages, directory depth, vendored node_modules),
+committed and published as bare remotes under <root>/remotes/<owner>/<name>.git.
+Content is a pure function of the RepoSpec, so a spec always produces the same tree (and remote).
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+OWNER = "bench"
+
+_EXT = {"python": ".py", "javascript": ".js", "typescript": ".ts", "go": ".go", "java": ".java"}
+
+# Fixed identity and dates: the same spec yields the same commit hash.
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "bench",
+    "GIT_AUTHOR_EMAIL": "bench@example.invalid",
+    "GIT_COMMITTER_NAME": "bench",
+    "GIT_COMMITTER_EMAIL": "bench@example.invalid",
+    "GIT_AUTHOR_DATE": "2024-01-01T00:00:00Z",
+    "GIT_COMMITTER_DATE": "2024-01-01T00:00:00Z",
+}
+
+
+class RepoSpec(NamedTuple):
+    name: str
+    files: int = 200
+    languages: tuple[str, ...] = ("python",)
+    depth: int = 3
+    vendored_files: int = 0  # committed node_modules files (skipped by the map, still cloned and hashed)
+    functions_per_file: int = 8
+
+    def digest(self) -> str:
+        return hashlib.sha256(repr(tuple(self)).encode()).hexdigest()[:10]
+
+
+SIZES: dict[str, RepoSpec] = {
+    "small": RepoSpec("small", files=50, depth=2),
+    "medium": RepoSpec("medium", files=500, languages=("python", "javascript", "go"), depth=4, vendored_files=500),
+    "large": RepoSpec(
+        "large", files=3000, languages=("python", "javascript", "typescript", "go", "java"), depth=6,
+        vendored_files=5000,
+    ),
+}
+
+
+class Remote(NamedTuple):
+    spec: RepoSpec
+    owner: str
+    name: str
+    path: Path  # bare repository
+    target_file: str  # file the fake LLM's plans modify
+
+    @property
+    def url(self) -> str:
+        return self.path.resolve().as_uri()
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.name}"
+
+
+def _rel_path(spec: RepoSpec, i: int) -> str:
+    lang = spec.languages[i % len(spec.languages)]
+    parts = ["src"]
+    n = i
+    for level in range(max(spec.depth - 1, 0)):
+        n, r = divmod(n, 4)
+        parts.append(f"d{level}_{r}")
+    return "/".join(parts) + f"/mod_{i}{_EXT[lang]}"
+
+
+def _source(lang: str, i: int, functions: int) -> str:
+    if lang == "python":
+        body = [f'"""Module {i}."""', "", ""]
+        body += [f"class Model{i}:", "    def __init__(self, value):", "        self.value = value", "", ""]
+        for j in range(functions):
+            body += [f"def func_{i}_{j}(x):", f"    return x * {j + 1} + {i}", "", ""]
+        return "\n".join(body).rstrip() + "\n"
+    if lang in ("javascript", "typescript"):
+        body = [f"export class Model{i} {{", "  constructor(value) { this.value = value; }", "}", ""]
+        for j in range(functions):
+            body += [f"export function func_{i}_{j}(x) {{", f"  return x * {j + 1} + {i};", "}", ""]
+        return "\n".join(body)
+    if lang == "go":
+        body = ["package bench", "", f"type Model{i} struct {{ Value int }}", ""]
+        for j in range(functions):
+            body += [f"func Func_{i}_{j}(x int) int {{", f"\treturn x*{j + 1} + {i}", "}", ""]
+        return "\n".join(body)
+    body = [f"public class Model{i} {{"]
+    for j in range(functions):
+        body += [f"    public static int func_{i}_{j}(int x) {{ return x * {j + 1} + {i}; }}"]
+    return "\n".join(body + ["}", ""])
+
+
+def target_file(spec: RepoSpec) -> str:
+    """First Python module (else the first file): what benchmark tasks ask to change."""
+    for i in range(spec.files):
+        if spec.languages[i % len(spec.languages)] == "python":
+            return _rel_path(spec, i)
+    return _rel_path(spec, 0)
+
+
+def generate_tree(spec: RepoSpec, dest: Path) -> None:
+    """Write the spec's files into dest (created if missing)."""
+    dest.mkdir(parents=True, exist_ok=True)
+    for i in range(spec.files):
+        lang = spec.languages[i % len(spec.languages)]
+        path = dest / _rel_path(spec, i)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_source(lang, i, spec.functions_per_file), encoding="utf-8")
+    for i in range(spec.vendored_files):
+        path = dest / "node_modules" / f"pkg{i // 20}" / f"index{i % 20}.js"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_source("javascript", i, 4), encoding="utf-8")
+    (dest / "README.md").write_text(f"# {spec.name}\n\nSynthetic benchmark repository.\n", encoding="utf-8")
+    if "python" in spec.languages:
+        # pytest-based validation; lint runs too when ruff / pyflakes are installed.
+        (dest / "pyproject.toml").write_text(
+            f'[project]\nname = "bench-{spec.name}"\nversion = "0.0.0"\n\n'
+            '[tool.pytest.ini_options]\ntestpaths = ["tests"]\n',
+            encoding="utf-8",
+        )
+        (dest / "tests").mkdir(exist_ok=True)
+        (dest / "tests" / "test_smoke.py").write_text("def test_smoke():\n    assert 1 + 1 == 2\n", encoding="utf-8")
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True,
+        env={**os.environ, **GIT_ENV, "GIT_TERMINAL_PROMPT": "0"},
+    )
+
+
+def make_remote(spec: RepoSpec, root: Path, owner: str = OWNER) -> Remote:
+    """Bare remote with the spec's tree as one commit on main; reused if it already exists under root."""
+    name = f"{spec.name}-{spec.digest()}"
+    path = Path(root) / "remotes" / owner / f"{name}.git"
+    remote = Remote(spec, owner, name, path, target_file(spec))
+    if (path / "HEAD").is_file():
+        return remote
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="bench-src-", dir=path.parent) as tmp:
+        src = Path(tmp) / "src"
+        generate_tree(spec, src)
+        _git(src, "init", "-q", "-b", "main")
+        _git(src, "add", "-A")
+        _git(src, "commit", "-q", "-m", f"Synthetic repository {spec.name}")
+        staging = Path(tmp) / "remote.git"
+        _git(Path(tmp), "clone", "-q", "--bare", str(src), str(staging))
+        shutil.move(str(staging), path)
+    return remote
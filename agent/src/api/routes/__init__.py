@@ -3,10 +3,14 @@
 from fastapi import APIRouter
 
 from .health import router as health_router
+from .metrics import router as metrics_router
+from .tasks import router as tasks_router
 from .webhooks import router as webhooks_router
 
 api_router = APIRouter(prefix="/api", tags=["api"])
 api_router.include_router(health_router, prefix="/health", tags=["health"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(tasks_router, prefix="/tasks", tags=["tasks"])
 api_router.include_router(webhooks_router, prefix="/webhook", tags=["webhooks"])
 
 __all__ = ["api_router"]
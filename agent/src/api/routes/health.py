@@ -1,6 +1,12 @@
 """Health check (for load balancers and readiness)."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from ...core.admission import admission_stats
+from ...core.delivery import get_delivery_worker
+from ...core.executors import pool_stats
+from ...core.workspace import get_workspace_reaper
 
 router = APIRouter()
 
@@ -8,4 +14,19 @@ router = APIRouter()
 @router.get("")
 @router.get("/")
 def health() -> dict:
-    return {"status": "ok", "service": "ai-dev-agent"}
+    return {
+        "status": "ok",
+        "service": "ai-dev-agent",
+        "admission": admission_stats(),
+        "pools": pool_stats(),
+        "outbox_pending": get_delivery_worker().pending(),
+        "workspaces": get_workspace_reaper().stats(),
+    }
+
+
+@router.get("/ready")
+def ready() -> JSONResponse:
+    """Readiness: 503 while admission control would reject new tasks."""
+    stats = admission_stats()
+    code = status.HTTP_200_OK if stats["accepting"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=code, content={"ready": stats["accepting"], "reason": stats["reason"]})
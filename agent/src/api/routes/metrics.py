@@ -0,0 +1,14 @@
+"""Prometheus scrape endpoint (text exposition format) for this process's metrics."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ...utils.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+
+@router.get("")
+@router.get("/")
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
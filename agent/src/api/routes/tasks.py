@@ -0,0 +1,70 @@
+"""
+Task status (F1.5): GET /tasks/{task_id} for the current view, GET /tasks/{task_id}/events for a live
+Server-Sent Events stream of stage transitions (history is replayed first, then live events until a terminal state).
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from ...utils.progress import TERMINAL_STATES, get_progress_store
+from ...models.events import PipelineEvent, TaskStatus
+
+router = APIRouter()
+
+_KEEPALIVE_SECONDS = 15.0
+
+
+def _sse(event: PipelineEvent) -> str:
+    return f"id: {event.seq}\nevent: {event.type}\ndata: {event.model_dump_json()}\n\n"
+
+
+def _is_terminal(event: PipelineEvent) -> bool:
+    return event.type == "state" and event.state in TERMINAL_STATES
+
+
+@router.get("/{task_id}", response_model=TaskStatus)
+def get_task(task_id: str) -> TaskStatus:
+    status = get_progress_store().get(task_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown task_id (expired or handled by another process)")
+    return status
+
+
+@router.get("/{task_id}/events")
+async def task_events(task_id: str, request: Request) -> StreamingResponse:
+    store = get_progress_store()
+    if store.get(task_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown task_id (expired or handled by another process)")
+
+    async def stream() -> AsyncIterator[str]:
+        sub = store.subscribe(task_id)  # before history, so nothing published in between is lost
+        try:
+            last_seq = 0
+            for event in store.history(task_id):
+                last_seq = event.seq
+                yield _sse(event)
+                if _is_terminal(event):
+                    return
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event.seq <= last_seq:
+                    continue
+                last_seq = event.seq
+                yield _sse(event)
+                if _is_terminal(event):
+                    return
+        finally:
+            store.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
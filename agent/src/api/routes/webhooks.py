@@ -1,20 +1,34 @@
 """
 Webhook endpoints (F1.1, F1.4, F1.5, F1.6).
-POST /webhook/task — task assignment; returns 201 and processes async.
-POST /webhook/pr-comment — PR comment (Phase 4); stub for now.
+POST /webhook/task — task assignment; returns 201 with a task_id (GET /api/tasks/{task_id}) and processes async.
+  Redeliveries (same X-GitHub-Delivery / X-Gitlab-Event-UUID) of an event that was taken return 200; a rejected
+  one (400/409/429/503) is processed again when retried. Events for a ticket whose debounce window is still open
+  are coalesced (202) into the pending run.
+POST /webhook/pr-comment — review comment on an agent PR (F7); 202 and runs the incremental PR-feedback pipeline.
+  Comments on the same PR within the debounce window are merged into one run; comments arriving while a run for
+  the PR is in progress are merged into a follow-up run queued after it.
+POST /webhook/push — push to a repo's default branch; 202 and refreshes its mirror, symbol index and dependency envs.
 """
 
+import functools
 import logging
-from typing import Any
+from typing import Any, Awaitable, Callable
 
-from fastapi import APIRouter, BackgroundTasks, Header, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Header, Request, status
+from fastapi.responses import JSONResponse, Response
 
 from ...models.task import TaskContext
-from ...core.pipeline import run_pipeline
-from ...services.webhook_parser import parse_task_payload
-from ...utils.idempotency import idempotency_check
+from ...config import get_settings
+from ...core.admission import check_admission, record_admission
+from ...core.ingress import forget_delivery, get_debouncer, get_follow_ups, is_duplicate_delivery, task_key
+from ...core.pr_feedback import comment_task, merge_comments
+from ...core.warmup import get_refresher, is_warm_repo, warm_task
+from ...core.task_queue import enqueue_task
+from ...services.git.clone import BRANCH_PREFIX
+from ...services.webhook_parser import parse_pr_comment_payload, parse_push_payload, parse_task_payload
+from ...utils.idempotency import idempotency_acquire
 from ...utils.logging import log_task
+from ...utils.progress import task_accepted
 
 logger = logging.getLogger(__name__)
 
@@ -34,25 +48,127 @@ def _task_from_body(
     return task, None
 
 
+def _profile_requested(header: str | None) -> bool:
+    """X-Agent-Profile: 1 / true / yes asks for a profile of the run (see utils/profiling.py)."""
+    return (header or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _duplicate_response(delivery_id: str | None) -> JSONResponse | None:
+    if not is_duplicate_delivery(delivery_id):
+        return None
+    logger.info("Duplicate webhook delivery %s ignored", delivery_id)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"status": "duplicate", "delivery_id": delivery_id},
+    )
+
+
+def _settles_delivery(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    The delivery ID is recorded when a webhook arrives (so concurrent redeliveries are caught); forget it again
+    when the handler rejects the event (4xx/5xx or an exception), so the sender's retry is processed.
+    """
+
+    @functools.wraps(handler)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        delivery_id = kwargs.get("x_github_delivery") or kwargs.get("x_gitlab_event_uuid")
+        try:
+            response = await handler(*args, **kwargs)
+        except BaseException:
+            forget_delivery(delivery_id)
+            raise
+        if isinstance(response, Response) and response.status_code >= 400:
+            forget_delivery(delivery_id)
+        return response
+
+    return wrapper
+
+
+def _admit_and_enqueue(
+    task: TaskContext,
+    merge: Callable[[TaskContext, TaskContext], TaskContext] | None = None,
+    follow_up: bool = False,
+) -> JSONResponse | None:
+    """
+    Coalesce into a pending run, or admit, lease and queue task. Returns the response for coalesced or
+    deferred (202) or rejected (409/429/503) requests; None when the task was accepted.
+    With follow_up, a task whose lease is held is queued after the running run instead of rejected with 409.
+    """
+    debounce = get_settings().webhook_debounce_seconds > 0
+    if debounce and get_debouncer().update(task_key(task), task, enqueue_task, merge=merge):
+        log_task(logger, task.ticket_id, "Webhook coalesced into pending run", repo=task.repo_full_name)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": "coalesced", "task_id": task.task_id, "ticket_id": task.ticket_id, "repo": task.repo_full_name},
+        )
+
+    admission = check_admission()
+    record_admission(admission)
+    if not admission.allowed:
+        return JSONResponse(
+            status_code=admission.status_code,
+            content={"error": admission.reason},
+            headers={"Retry-After": str(admission.retry_after)},
+        )
+
+    task.lease_token = idempotency_acquire(task.ticket_id, task.repo_full_name)
+    if task.lease_token is None and follow_up:
+        merged = get_follow_ups().add(task_key(task), task, enqueue_task, merge=merge)
+        log_task(
+            logger, task.ticket_id, "Run in progress; held for a follow-up run",
+            repo=task.repo_full_name, merged=merged, run_id=task.task_id,
+        )
+        if not merged:
+            task_accepted(task)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": "deferred", "task_id": task.task_id, "ticket_id": task.ticket_id, "repo": task.repo_full_name},
+        )
+    if task.lease_token is None:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"error": "Task already in progress for this ticket and repo"},
+        )
+
+    log_task(logger, task.ticket_id, "Webhook accepted", repo=task.repo_full_name, run_id=task.task_id)
+    task_accepted(task)
+    if debounce:
+        get_debouncer().schedule(task_key(task), task, enqueue_task)
+    else:
+        enqueue_task(task)
+    return None
+
+
 @router.post(
     "/task",
     status_code=status.HTTP_201_CREATED,
     responses={
+        200: {"description": "Duplicate delivery (already received)"},
         201: {"description": "Task accepted and queued"},
+        202: {"description": "Coalesced into a pending run for the same ticket"},
         400: {"description": "Bad payload"},
         409: {"description": "Duplicate task (idempotency)"},
+        429: {"description": "Queue full; retry after Retry-After seconds"},
+        503: {"description": "Host saturated or low on workspace disk; retry after Retry-After seconds"},
     },
 )
+@_settles_delivery
 async def webhook_task(
     request: Request,
-    background_tasks: BackgroundTasks,
     x_git_provider: str | None = Header(None, alias="X-Git-Provider"),
     x_repo: str | None = Header(None, alias="X-Repo"),
+    x_github_delivery: str | None = Header(None, alias="X-GitHub-Delivery"),
+    x_gitlab_event_uuid: str | None = Header(None, alias="X-Gitlab-Event-UUID"),
+    x_agent_profile: str | None = Header(None, alias="X-Agent-Profile"),
 ) -> dict:
     """
-    Receive task assignment (Jira/Git). Responds 201 immediately; runs pipeline in background.
+    Receive task assignment (Jira/Git). Responds 201 immediately; the task is queued for a pipeline worker.
     Jira automation can rely on 201 = move ticket to "In Progress" (F1.5).
     """
+    duplicate = _duplicate_response(x_github_delivery or x_gitlab_event_uuid)
+    if duplicate is not None:
+        return duplicate
+
     try:
         body = await request.json()
     except Exception as e:
@@ -70,32 +186,41 @@ async def webhook_task(
             content={"error": parse_error},
         )
 
-    if not idempotency_check(task.ticket_id, task.repo_full_name):
-        return JSONResponse(
-            status_code=status.HTTP_409_CONFLICT,
-            content={"error": "Task already in progress for this ticket and repo"},
-        )
-
-    log_task(logger, task.ticket_id, "Webhook accepted", repo=task.repo_full_name)
-    background_tasks.add_task(run_pipeline, task)
-    return {"status": "accepted", "ticket_id": task.ticket_id, "repo": task.repo_full_name}
+    task.profile = _profile_requested(x_agent_profile)
+    rejected = _admit_and_enqueue(task)
+    if rejected is not None:
+        return rejected
+    return {"status": "accepted", "task_id": task.task_id, "ticket_id": task.ticket_id, "repo": task.repo_full_name}
 
 
 @router.post(
     "/pr-comment",
     status_code=status.HTTP_202_ACCEPTED,
     responses={
-        202: {"description": "Comment accepted for processing"},
+        200: {"description": "Duplicate delivery, or ignored (not a new comment on an agent PR)"},
+        202: {"description": "Comment accepted, merged into a pending run, or held for a run after the one in progress"},
         400: {"description": "Bad payload"},
+        429: {"description": "Queue full; retry after Retry-After seconds"},
+        503: {"description": "Host saturated or low on workspace disk; retry after Retry-After seconds"},
     },
 )
+@_settles_delivery
 async def webhook_pr_comment(
     request: Request,
-    background_tasks: BackgroundTasks,
+    x_git_provider: str | None = Header(None, alias="X-Git-Provider"),
+    x_repo: str | None = Header(None, alias="X-Repo"),
+    x_github_delivery: str | None = Header(None, alias="X-GitHub-Delivery"),
+    x_gitlab_event_uuid: str | None = Header(None, alias="X-Gitlab-Event-UUID"),
+    x_agent_profile: str | None = Header(None, alias="X-Agent-Profile"),
 ) -> dict:
     """
-    PR comment webhook (F7.1). Stub: accept and log; Phase 4 will process.
+    PR comment webhook (F7.1). Queues an incremental run that applies the comment on the PR branch and pushes.
+    Only new comments on agent branches (ai/...) by someone other than the PR author are handled.
     """
+    duplicate = _duplicate_response(x_github_delivery or x_gitlab_event_uuid)
+    if duplicate is not None:
+        return duplicate
+
     try:
         body = await request.json()
     except Exception as e:
@@ -104,5 +229,76 @@ async def webhook_pr_comment(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"error": "Invalid JSON body"},
         )
-    logger.info("PR comment webhook received (stub): keys=%s", list(body.keys()))
-    return {"status": "accepted", "message": "PR comment handling (Phase 4) not yet implemented"}
+
+    comment = parse_pr_comment_payload(body, provider_header=x_git_provider, repo_header=x_repo)
+    ignored = None
+    if comment is None:
+        ignored = "not a PR/MR comment"
+    elif body.get("action") not in (None, "created"):
+        ignored = f"comment {body.get('action')}"
+    elif not comment.comment_body.strip():
+        ignored = "empty comment"
+    elif comment.pr_author and comment.comment_author == comment.pr_author:
+        ignored = "comment by the PR author"
+    elif comment.pr_branch and not comment.pr_branch.startswith(BRANCH_PREFIX):
+        ignored = "not an agent branch"
+    if ignored:
+        logger.info("PR comment webhook ignored: %s", ignored)
+        return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "ignored", "reason": ignored})
+
+    task = comment_task(comment)
+    task.profile = _profile_requested(x_agent_profile)
+    rejected = _admit_and_enqueue(task, merge=merge_comments, follow_up=True)
+    if rejected is not None:
+        return rejected
+    return {"status": "accepted", "task_id": task.task_id, "ticket_id": task.ticket_id, "repo": task.repo_full_name}
+
+
+@router.post(
+    "/push",
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        200: {"description": "Duplicate delivery, or ignored (not a push to a warm repo's default branch)"},
+        202: {"description": "Warmup scheduled"},
+        400: {"description": "Bad payload"},
+    },
+)
+@_settles_delivery
+async def webhook_push(
+    request: Request,
+    x_git_provider: str | None = Header(None, alias="X-Git-Provider"),
+    x_github_delivery: str | None = Header(None, alias="X-GitHub-Delivery"),
+    x_gitlab_event_uuid: str | None = Header(None, alias="X-Gitlab-Event-UUID"),
+) -> dict:
+    """
+    Push webhook (F2). Refreshes the repo's mirror, symbol index and dependency envs in the background,
+    so the next ticket's clone and map stages are near-instant.
+    """
+    duplicate = _duplicate_response(x_github_delivery or x_gitlab_event_uuid)
+    if duplicate is not None:
+        return duplicate
+
+    try:
+        body = await request.json()
+    except Exception as e:
+        logger.warning("Push webhook body not JSON: %s", e)
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": "Invalid JSON body"},
+        )
+
+    event = parse_push_payload(body, provider_header=x_git_provider)
+    ignored = None
+    if event is None:
+        ignored = "not a branch push"
+    elif event.default_branch and event.branch != event.default_branch:
+        ignored = "not the default branch"
+    elif not is_warm_repo(event.provider, event.repo_full_name):
+        ignored = "repo not in WARM_REPOS"
+    if ignored:
+        logger.info("Push webhook ignored: %s", ignored)
+        return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "ignored", "reason": ignored})
+
+    get_refresher().request(warm_task(event.provider, event.repo_full_name, event.branch))
+    logger.info("Warmup scheduled for %s (%s@%s)", event.repo_full_name, event.branch, event.after[:12])
+    return {"status": "scheduled", "repo": event.repo_full_name, "branch": event.branch}
@@ -28,30 +28,123 @@ class Settings(BaseSettings):
     app_name: str = Field(default="ai-dev-agent", description="Application name")
     debug: bool = Field(default=False, description="Debug mode")
     log_level: str = Field(default="INFO", description="Log level")
+    log_format: str = Field(default="text", description="Log output: text or json (one object per line)")
+    log_queue_size: int = Field(
+        default=10000, description="Records buffered for the log writer thread; more are dropped (0 = unbounded)"
+    )
+
+    # ----- Observability -----
+    otel_traces_enabled: bool = Field(
+        default=False,
+        description="Export OpenTelemetry spans (OTLP/HTTP, OTEL_EXPORTER_OTLP_* env vars); needs opentelemetry-sdk",
+    )
+    otel_service_name: str = Field(default="ai-dev-agent", description="service.name resource attribute of spans")
+    worker_metrics_port: int = Field(
+        default=0, description="Serve /metrics from standalone workers on this port (0 = off; the API has /api/metrics)"
+    )
 
     # ----- Server -----
     host: str = Field(default="0.0.0.0", description="Bind host")
     port: int = Field(default=8000, description="Bind port")
 
     # ----- Webhook / Idempotency -----
-    # Default: in-memory set for dedup (single instance). Production: use Redis key.
+    # Default: in-memory leases for dedup (single instance). Production / replicas: Redis leases.
     idempotency_backend: Literal["memory", "redis"] = Field(
         default="memory", description="Idempotency backend"
     )
+    webhook_delivery_ttl_seconds: int = Field(
+        default=3600, description="How long delivery IDs are remembered for redelivery dedup"
+    )
+    webhook_delivery_cache_size: int = Field(default=10000, description="Max remembered delivery IDs")
+    webhook_debounce_seconds: float = Field(
+        default=2.0,
+        description="Coalesce events for the same ticket+repo arriving within this window (0 = off)",
+    )
+    webhook_debounce_max_seconds: float = Field(
+        default=10.0, description="Upper bound on how long a burst can delay the pipeline start"
+    )
+    idempotency_lease_ttl_seconds: int = Field(
+        default=120,
+        description="Lease TTL; renewed every TTL/3 while a run is alive, expires if the worker dies",
+    )
     redis_url: str = Field(
         default="redis://localhost:6379/0",
         description="Redis URL when idempotency_backend=redis",
     )
 
+    # ----- Task queue / workers -----
+    # memory: API process runs the pipelines. sqlite/redis: shared queue for `python -m src.worker` processes.
+    task_queue_backend: Literal["memory", "sqlite", "redis"] = Field(
+        default="memory", description="Queue between API ingress and pipeline workers"
+    )
+    task_queue_path: str = Field(
+        default="", description="SQLite queue file (default: <workspace_base>/task_queue.sqlite3)"
+    )
+    worker_concurrency: int = Field(
+        default=8, description="Tasks in flight per process (workers only sequence stages; the stage pools bound resources)"
+    )
+    worker_mode: Literal["threads", "async"] = Field(
+        default="threads",
+        description="threads: one thread per task in flight. async: all tasks on one event loop (asyncio pipeline)",
+    )
+    async_worker_concurrency: int = Field(
+        default=200, description="Tasks in flight per process when worker_mode=async"
+    )
+    stage_pool_io_workers: int = Field(default=16, description="Concurrent git / provider API stages per process")
+    stage_pool_llm_workers: int = Field(default=32, description="Concurrent LLM requests per process")
+    stage_pool_cpu_workers: int = Field(
+        default=0, description="Concurrent map / validation stages per process (0 = CPU count)"
+    )
+    api_run_workers: bool = Field(
+        default=True, description="Also run pipeline workers inside the API process (always on for memory queue)"
+    )
+
+    # ----- Admission control (429/503 + Retry-After on /api/webhook/task) -----
+    admission_max_queue_depth: int = Field(default=50, description="Reject with 429 at this many queued tasks (0 = off)")
+    admission_max_running_tasks: int = Field(
+        default=0, description="Reject with 503 at this many running tasks across workers (0 = off)"
+    )
+    admission_min_free_disk_mb: int = Field(
+        default=2048, description="Reject with 503 when workspace_base has less free disk (0 = off)"
+    )
+    admission_retry_after_seconds: int = Field(default=30, description="Base Retry-After for rejected tasks")
+
     # ----- Git provider -----
     git_provider: Literal["github", "gitlab"] = Field(
         default="github", description="Default Git provider"
     )
     default_branch: str = Field(default="main", description="Default branch to base from")
+    provider_cache_ttl_seconds: int = Field(
+        default=600, description="How long provider repo / project / label lookups are reused"
+    )
+    provider_rate_limit_reserve: int = Field(
+        default=100, description="Below this many remaining API calls, pace requests until the rate-limit reset"
+    )
 
     # ----- MANDATORY: Git / GitHub (when git_provider=github) -----
     # GitHub Personal Access Token with repo scope. No default in production.
     github_token: str = Field(default="", description="[MANDATORY for GitHub] PAT with repo scope")
+    github_api_url: str = Field(
+        default="https://api.github.com", description="GitHub REST API base (GitHub Enterprise: https://<host>/api/v3)"
+    )
+    github_delivery_mode: Literal["graphql", "rest"] = Field(
+        default="graphql", description="Open PRs via GraphQL (labels + reviewers batched; REST fallback) or REST only"
+    )
+    git_backend: Literal["auto", "pygit2", "cli"] = Field(
+        default="auto",
+        description="Local git ops (status, commit, checkout, write-tree): in-process pygit2, git CLI, or auto (by size)",
+    )
+    git_inprocess_max_files: int = Field(
+        default=500, description="GIT_BACKEND=auto: use pygit2 below this many tracked files, the git CLI above"
+    )
+    delivery_mode: Literal["inline", "outbox"] = Field(
+        default="outbox",
+        description="outbox: commit + bundle, free the workspace, push/PR from the delivery worker; inline: push/PR in the run",
+    )
+    delivery_max_attempts: int = Field(default=8, description="Push/PR attempts per outbox item before it is dead-lettered")
+    delivery_backoff_seconds: float = Field(
+        default=10.0, description="Delay before the first delivery retry (doubles per attempt, max 15 min)"
+    )
 
     # ----- MANDATORY: Git / GitLab (when git_provider=gitlab) -----
     gitlab_token: str = Field(default="", description="[MANDATORY for GitLab] Access token")
@@ -81,9 +174,98 @@ class Settings(BaseSettings):
         description="Base directory for clone workspaces (default: agent/workspaces)",
     )
     max_validation_retries: int = Field(default=5, description="Max self-healing retries (F5)")
-    task_timeout_seconds: int = Field(default=1800, description="Max seconds per task run")
+    speculative_candidates: int = Field(
+        default=0,
+        description="Opt-in: generate and validate K self-heal candidates in parallel worktrees (0/1 = sequential)",
+    )
+    task_timeout_seconds: int = Field(
+        default=1800, description="Wall-clock deadline per task run across all stages (then timed_out)"
+    )
+    validation_cache_size: int = Field(
+        default=256, description="Validation results memoized by tree hash (0 = disabled)"
+    )
+    validation_output_max_bytes: int = Field(
+        default=8000,
+        description="Max bytes of stdout/stderr kept in memory per validation command (head + tail)",
+    )
+
+    # ----- Validation sandbox (F5) -----
+    # Repo lint/test commands run with a scrubbed env, rlimits, and a cgroup v2 group when writable.
+    sandbox_enabled: bool = Field(default=True, description="Sandbox validation commands")
+    sandbox_cpu_share: float = Field(
+        default=1.0,
+        description="CPU cores per validation command (cgroup cpu.max; without one, a CPU-time limit of share x timeout); "
+        "0 = unlimited",
+    )
+    sandbox_memory_mb: int = Field(default=4096, description="Memory limit per validation command; 0 = unlimited")
+    sandbox_cgroup_root: str = Field(
+        default="/sys/fs/cgroup/ai-dev-agent",
+        description="cgroup v2 parent for per-task groups (empty = rlimits only)",
+    )
+    sandbox_env_passthrough: list[str] = Field(
+        default_factory=list,
+        description="Extra env var names passed to validation commands (e.g. PIP_INDEX_URL)",
+    )
+
+    # ----- Dependency cache (F5) -----
+    # Virtualenvs / node_modules built once per lockfile hash under workspace_base/.dep-cache.
+    dep_cache_enabled: bool = Field(default=True, description="Install and cache repo dependencies for validation")
+    dep_cache_max_bytes: int = Field(
+        default=20 * 1024**3, description="Disk budget for cached dependency envs (LRU eviction)"
+    )
+    dep_install_timeout_seconds: int = Field(default=900, description="Max seconds per dependency install step")
+    dep_cache_python_extras: list[str] = Field(
+        default_factory=lambda: ["pytest"],
+        description="Packages always installed into cached virtualenvs (test runner)",
+    )
     pr_label_ai_generated: str = Field(default="ai-generated", description="PR label for agent PRs")
 
+    # ----- Workspaces (F2) -----
+    # Run workspaces under workspace_base/runs; released ones are deleted by a background reaper.
+    workspace_provisioning: Literal["auto", "reflink", "worktree"] = Field(
+        default="auto",
+        description="Mirror checkouts: reflink copy of a per-commit template (auto: if the filesystem supports it) or worktree",
+    )
+    workspace_reap_interval_seconds: int = Field(
+        default=30, description="How often released, orphaned and idle template workspaces are deleted in the background"
+    )
+    workspace_quota_bytes: int = Field(
+        default=0,
+        description="Apparent size budget for runs + templates + trash; over it idle templates go and tasks get 503 (0 = off)",
+    )
+
+    # ----- Profiling -----
+    # Per-stage cProfile / tracemalloc / child-process rusage for selected runs (see utils/profiling.py).
+    profiling_enabled: bool = Field(default=False, description="Profile every run (costly; prefer the label or header)")
+    profiling_label: str = Field(
+        default="agent-profile", description="Ticket label that turns on profiling for that run (empty = off)"
+    )
+    profiles_dir: str = Field(default="", description="Where profiles are written (default: <workspace_base>/profiles)")
+    profiles_keep: int = Field(default=20, description="Profiled runs kept; older ones are deleted")
+
+    # ----- Warm repos (F2) -----
+    # Bare mirrors under workspace_base/mirrors and a blob-keyed symbol index under workspace_base/index,
+    # refreshed on push webhooks (/api/webhook/push) or periodically, so tickets skip clone and map work.
+    repo_mirrors_enabled: bool = Field(
+        default=True, description="Check out ticket workspaces from a local mirror (fetch, no clone)"
+    )
+    mirror_initial_fetch_timeout_seconds: int = Field(
+        default=900, description="Budget for the first (full-history) fetch of a new mirror; later fetches get 120s"
+    )
+    mirror_failed_retry_seconds: int = Field(
+        default=3600, description="After a mirror's first fetch fails, tickets clone instead for this long"
+    )
+    symbol_index_enabled: bool = Field(
+        default=True, description="Build repo maps from the incremental symbol index (by git blob)"
+    )
+    warm_repos: list[str] = Field(
+        default_factory=list,
+        description='Repos kept warm, "owner/repo" or "gitlab:group/repo" (empty = any repo sending push webhooks)',
+    )
+    warm_refresh_interval_seconds: int = Field(
+        default=0, description="Periodically refresh warm_repos every N seconds (0 = push webhooks only)"
+    )
+
     # ----- Jira (optional; for status sync) -----
     jira_base_url: str = Field(default="", description="Jira base URL (e.g. https://your.atlassian.net)")
     jira_username: str = Field(default="", description="Jira user for API (optional)")
@@ -0,0 +1,107 @@
+"""
+Admission control for task webhooks (F1.1, F1.5).
+Rejects new work with 429 (queue full) or 503 (host saturated / out of workspace disk) plus Retry-After,
+so callers back off instead of piling up tasks we can't finish.
+"""
+
+import logging
+import math
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from ..config import get_settings
+from ..utils.metrics import counter, gauge
+from .ingress import get_debouncer
+from .task_queue import get_task_queue
+from .workspace import get_workspace_reaper
+
+logger = logging.getLogger(__name__)
+
+_rejections: dict[str, int] = {}
+_accepted = 0
+_lock = threading.Lock()
+
+ADMISSIONS = counter("agent_admission_decisions_total", "Webhook admission decisions", ("outcome",))
+
+
+class AdmissionDecision(NamedTuple):
+    allowed: bool
+    status_code: int
+    reason: str
+    retry_after: int
+
+
+def _free_disk_mb(path: Path) -> float:
+    path.mkdir(parents=True, exist_ok=True)
+    return shutil.disk_usage(path).free / (1024 * 1024)
+
+
+def check_admission() -> AdmissionDecision:
+    """Decide whether a new task can be queued now."""
+    settings = get_settings()
+    base_retry = settings.admission_retry_after_seconds
+
+    if settings.admission_min_free_disk_mb > 0:
+        free_mb = _free_disk_mb(Path(settings.workspace_base))
+        if free_mb < settings.admission_min_free_disk_mb:
+            return AdmissionDecision(False, 503, f"Low workspace disk ({free_mb:.0f} MB free)", base_retry * 2)
+    if get_workspace_reaper().over_quota():
+        return AdmissionDecision(False, 503, "Workspace quota exceeded", base_retry * 2)
+
+    stats = get_task_queue().stats()
+    if 0 < settings.admission_max_running_tasks <= stats["running"]:
+        return AdmissionDecision(False, 503, f"Host saturated ({stats['running']} running tasks)", base_retry)
+
+    depth = stats["depth"] + get_debouncer().pending()
+    if 0 < settings.admission_max_queue_depth <= depth:
+        # Expect the queue to drain about as fast as recent tasks waited.
+        retry = max(base_retry, math.ceil(stats["wait_avg_seconds"]))
+        return AdmissionDecision(False, 429, f"Queue full ({depth} waiting)", retry)
+
+    return AdmissionDecision(True, 201, "", 0)
+
+
+def record_admission(decision: AdmissionDecision) -> None:
+    global _accepted
+    ADMISSIONS.inc(outcome="accepted" if decision.allowed else str(decision.status_code))
+    with _lock:
+        if decision.allowed:
+            _accepted += 1
+        else:
+            key = str(decision.status_code)
+            _rejections[key] = _rejections.get(key, 0) + 1
+    if not decision.allowed:
+        logger.warning("Admission rejected (%s): %s", decision.status_code, decision.reason)
+
+
+def _queue_gauge() -> dict[tuple[str, ...], float]:
+    stats = get_task_queue().stats()
+    return {("queued",): stats["depth"], ("running",): stats["running"], ("debouncing",): get_debouncer().pending()}
+
+
+gauge("agent_tasks_in_queue", "Tasks waiting, running or debouncing", ("state",), _queue_gauge)
+
+
+def admission_stats() -> dict[str, Any]:
+    """Queue depth, wait times and accept/reject counters for the health endpoint."""
+    settings = get_settings()
+    queue = get_task_queue().stats()
+    decision = check_admission()
+    with _lock:
+        rejected = dict(_rejections)
+        accepted = _accepted
+    return {
+        "accepting": decision.allowed,
+        "reason": decision.reason or None,
+        "queue": {**queue, "debounce_pending": get_debouncer().pending()},
+        "limits": {
+            "max_queue_depth": settings.admission_max_queue_depth,
+            "max_running_tasks": settings.admission_max_running_tasks,
+            "min_free_disk_mb": settings.admission_min_free_disk_mb,
+        },
+        "free_disk_mb": round(_free_disk_mb(Path(settings.workspace_base))),
+        "accepted": accepted,
+        "rejected": rejected,
+    }
@@ -0,0 +1,206 @@
+"""
+Asyncio pipeline: the same stages as run_pipeline, as a coroutine, so one event loop can drive hundreds of
+I/O-bound tickets without a thread apiece (WORKER_MODE=async).
+git runs via asyncio subprocesses, the LLM via AsyncAnthropic; map building and validation are CPU-bound
+and still go to the cpu pool, provider API calls (sync SDKs) to the io pool.
+Cancelling the run's task kills the running git / lint / test process, cleans up the workspace and
+reports the task as cancelled.
+"""
+
+import asyncio
+import logging
+import shutil
+import threading
+from pathlib import Path
+
+from ..config import get_settings
+from ..models.plan import ImplementationPlan
+from ..models.task import TaskContext
+from ..services.branch_state import save_branch_state
+from ..services.git import get_clone_url, head_tree, tree_hash
+from ..services.git.aio import (
+    clone_repo_async,
+    commit_async,
+    create_feature_branch_async,
+    ensure_mirror_async,
+    has_changes_async,
+    mirror_checkout_async,
+    push_async,
+)
+from ..services.git.mirror import mirror_path
+from ..services.implementer import implement_async
+from ..services.planner import create_plan_async
+from ..services.symbol_index import build_repo_map
+from ..services.validator import ValidationResult, run_validation
+from ..utils.deadline import Deadline
+from ..utils.idempotency import async_lease_heartbeat, idempotency_release
+from ..utils.logging import log_task
+from ..utils.metrics import span
+from ..utils.profiling import profile_run
+from ..utils.progress import ProgressReporter
+from .delivery import commit_message, enqueue_delivery, open_pr
+from .executors import run_in_async
+from .pipeline import can_deliver, finish_timed_out, finish_undelivered, run_work_dir
+from .pr_feedback import run_pr_feedback
+from .speculative import speculative_self_heal
+from .validation_loop import LoopOutcome
+from .workspace import provision_workspace, templates_enabled, workspace
+
+logger = logging.getLogger(__name__)
+
+
+async def _checkout_async(task: TaskContext, work_dir: Path) -> str:
+    """Async _checkout: base branch from the mirror (or clone), then the feature branch."""
+    clone_url = get_clone_url(task)
+    mirror: Path | None = None
+    if get_settings().repo_mirrors_enabled:
+        try:
+            mirror = await ensure_mirror_async(clone_url, mirror_path(task))
+            if templates_enabled():
+                await asyncio.to_thread(provision_workspace, mirror, work_dir, task.default_branch or None)
+            else:
+                await mirror_checkout_async(mirror, work_dir, task.default_branch or None)
+        except RuntimeError as e:
+            logger.warning("[%s] Mirror checkout failed, cloning instead: %s", task.ticket_id, e)
+            mirror = None
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+    if mirror is None:
+        await clone_repo_async(clone_url, work_dir, branch=task.default_branch or None)
+    return await create_feature_branch_async(work_dir, task)
+
+
+async def _validate_async(work_dir: Path, timeout: int, tree: str | None) -> ValidationResult:
+    """run_validation on the cpu pool; cancelling the caller kills the running lint/test command."""
+    cancel = threading.Event()
+    try:
+        return await run_in_async("cpu", run_validation, work_dir, timeout=timeout, tree=tree, cancel=cancel)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
+
+
+async def validate_with_self_heal_async(
+    work_dir: Path,
+    task: TaskContext,
+    repo_map: str,
+    plan: ImplementationPlan | None,
+    reporter: ProgressReporter,
+    run_id: str,
+) -> LoopOutcome:
+    """validate_with_self_heal for the asyncio pipeline (same attempts, early exit and speculation)."""
+    settings = get_settings()
+    timeout = min(300, settings.task_timeout_seconds)
+    base_tree = await run_in_async("io", head_tree, work_dir)
+    for attempt in range(settings.max_validation_retries + 1):
+        reporter.set_attempt(attempt + 1)
+        tree = await run_in_async("io", tree_hash, work_dir)
+        if tree and tree == base_tree:
+            log_task(logger, task.ticket_id, "Workspace unchanged from base; skipping validation", attempt=attempt + 1, run_id=run_id)
+            return LoopOutcome(False, True)
+        with reporter.stage("validate"):
+            result = await _validate_async(work_dir, timeout, tree)
+        if result.success:
+            log_task(logger, task.ticket_id, "Validation passed", attempt=attempt + 1, run_id=run_id)
+            return LoopOutcome(True, False)
+        log_task(logger, task.ticket_id, "Validation failed, self-heal attempt", attempt=attempt + 1, cached=result.cached, run_id=run_id)
+        if attempt < settings.max_validation_retries and plan and plan.steps:
+            with reporter.stage("self_heal"):
+                healed = None
+                if settings.speculative_candidates > 1:
+                    # Candidates coordinate their own worktrees and pools; run the coordinator off the loop.
+                    healed = await asyncio.to_thread(
+                        speculative_self_heal, work_dir, task, repo_map, plan, result.feedback,
+                        candidates=settings.speculative_candidates, timeout=timeout,
+                    )
+                if healed is None:
+                    await implement_async(work_dir, task, repo_map, plan, feedback=result.feedback)
+        else:
+            logger.warning("[%s] Validation failed after max retries; skipping PR", task.ticket_id)
+            break
+    return LoopOutcome(False, False)
+
+
+async def run_pipeline_async(task: TaskContext) -> None:
+    """
+    Asyncio counterpart of run_pipeline (same stages, progress events, lease handling and terminal states).
+    PR-comment tasks run the threaded pr_feedback pipeline off the loop.
+    Cancelling the task stops at the next await and reports state "cancelled"; reaching the task deadline
+    cancels it the same way and reports "timed_out".
+    """
+    reporter = ProgressReporter(task)
+    deadline = Deadline(get_settings().task_timeout_seconds)
+    try:
+        async with async_lease_heartbeat(task.ticket_id, task.repo_full_name, task.lease_token):
+            with reporter.activate(), deadline.activate():
+                timeout = asyncio.timeout(deadline.remaining())
+                try:
+                    async with timeout:
+                        with span("pipeline") as sp, profile_run(task):
+                            sp.set(task_id=task.task_id, ticket_id=task.ticket_id, repo=task.repo_full_name)
+                            if task.pr_comments:
+                                await asyncio.to_thread(run_pr_feedback, task, reporter)
+                            else:
+                                await _run_pipeline_async(task, reporter)
+                except Exception as e:
+                    if not (timeout.expired() or deadline.expired()):
+                        raise
+                    finish_timed_out(task, reporter, deadline, e)
+                except asyncio.CancelledError:
+                    log_task(logger, task.ticket_id, "Pipeline cancelled", run_id=task.task_id)
+                    reporter.finish("cancelled")
+                    raise
+    finally:
+        await asyncio.to_thread(idempotency_release, task.ticket_id, task.repo_full_name, task.lease_token)
+
+
+async def _run_pipeline_async(task: TaskContext, reporter: ProgressReporter) -> None:
+    run_id = task.task_id
+    log_task(logger, task.ticket_id, "Pipeline started", run_id=run_id, mode="async")
+
+    settings = get_settings()
+    branch_name: str | None = None
+    repo_map = ""
+    plan = None
+    validation_passed = False
+    no_changes = False
+
+    # Releasing is a rename, so a cancellation can't interrupt it half-way.
+    with workspace(run_work_dir(task)) as work_dir:
+        with reporter.stage("clone"):
+            branch_name = await _checkout_async(task, work_dir)
+        log_task(logger, task.ticket_id, "Clone and branch ready", branch=branch_name, run_id=run_id)
+
+        if not settings.anthropic_api_key:
+            logger.info("[%s] Phase 2 skipped (no ANTHROPIC_API_KEY)", task.ticket_id)
+        else:
+            with reporter.stage("map"):
+                repo_map = await run_in_async("cpu", build_repo_map, work_dir)
+            log_task(logger, task.ticket_id, "Codebase map built", run_id=run_id)
+            with reporter.stage("plan"):
+                plan = await create_plan_async(task, repo_map)
+            log_task(logger, task.ticket_id, "Plan created", steps=len(plan.steps), run_id=run_id)
+            with reporter.stage("implement"):
+                await implement_async(work_dir, task, repo_map, plan)
+            log_task(logger, task.ticket_id, "Implementation applied", run_id=run_id)
+
+            validation_passed, no_changes = await validate_with_self_heal_async(
+                work_dir, task, repo_map, plan, reporter, run_id
+            )
+
+        has_changes = bool(validation_passed and branch_name and can_deliver() and await has_changes_async(work_dir))
+        if not has_changes and (validation_passed or no_changes) and branch_name:
+            log_task(logger, task.ticket_id, "Skipping PR: no changes to commit", run_id=run_id)
+        if has_changes and settings.delivery_mode == "outbox":
+            with reporter.stage("bundle"):
+                item_id = await run_in_async("io", enqueue_delivery, task, work_dir, branch_name, repo_map, plan)
+            reporter.hand_off("delivering", outbox_id=item_id)
+        elif has_changes:
+            with reporter.stage("deliver"):
+                await commit_async(work_dir, commit_message(task))
+                await push_async(work_dir, branch_name)
+                pr = await run_in_async("io", open_pr, task, branch_name)
+            log_task(logger, task.ticket_id, "PR created", pr_url=pr.get("url"), run_id=run_id)
+            await asyncio.to_thread(save_branch_state, task, branch_name, repo_map, plan)
+            reporter.finish("succeeded", pr_url=pr.get("url"))
+        else:
+            finish_undelivered(reporter, validation_passed, no_changes, planned=plan is not None)
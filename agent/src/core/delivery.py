@@ -0,0 +1,275 @@
+"""
+Queued delivery (F6): push + PR as a stage of its own, retried with backoff, decoupled from the workspace.
+With delivery_mode=outbox, the pipeline commits, writes a `git bundle` of just the new commit and the PR
+metadata to workspace_base/outbox, and releases its worker slot and workspace right away. The delivery
+worker unbundles into the repo's mirror, pushes from there, opens the PR and records the outcome.
+Items are claimed with a per-item flock, so several processes can share one outbox.
+The run hands its idempotency lease (task.lease_token) to the item: the worker renews it while the item waits
+and releases it once the PR is open or the item is dead-lettered, so a repeat ticket webhook cannot start a
+second run on the same branch meanwhile.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from ..config import get_settings
+from ..models.plan import ImplementationPlan
+from ..models.task import TaskContext
+from ..services.branch_state import save_branch_state
+from ..services.git import commit, get_clone_url, get_git_provider
+from ..services.git.clone import _run_git
+from ..services.git.mirror import ensure_mirror, mirror_path
+from ..utils.filelock import file_lock
+from ..utils.idempotency import idempotency_release, idempotency_renew, lease_heartbeat
+from ..utils.logging import log_task
+from ..utils.metrics import gauge
+from ..utils.progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DIRNAME = "outbox"
+_OUTBOX_REF = "refs/agent-outbox"
+_MAX_BACKOFF_SECONDS = 900.0
+
+
+class DeliveryItem(BaseModel):
+    """One pending delivery: the task, its feature branch and what save_branch_state needs afterwards."""
+
+    id: str
+    task: TaskContext
+    branch: str
+    repo_map: str = ""
+    plan: ImplementationPlan = Field(default_factory=ImplementationPlan)
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    last_error: str | None = None
+    created_at: float = Field(default_factory=time.time)
+
+
+def _pr_body(task: TaskContext) -> str:
+    """Build PR description from task (F6.4)."""
+    parts = [f"**Ticket:** {task.ticket_id}", f"**Title:** {task.title or '(no title)'}", ""]
+    if task.description:
+        parts.append("## Description\n")
+        parts.append(task.description.strip())
+        parts.append("")
+    if task.acceptance_criteria:
+        parts.append("## Acceptance criteria")
+        for c in task.acceptance_criteria:
+            parts.append(f"- {c}")
+    return "\n".join(parts)
+
+
+def commit_message(task: TaskContext) -> str:
+    """Commit subject for a ticket run: "<ticket>: <title>"."""
+    return f"{task.ticket_id}: {task.title or 'Implement task'}"[:200]
+
+
+def open_pr(task: TaskContext, branch_name: str) -> dict:
+    """
+    Open the PR for the pushed feature branch (F6.3, F6.4). An open PR for the branch already counts: a retry
+    after a lost create response must not fail on "already exists" until the item is dead-lettered.
+    """
+    settings = get_settings()
+    provider = get_git_provider(task.provider)
+    try:
+        existing = provider.find_open_pull_request(task.repo_owner, task.repo_name, branch_name)
+    except Exception as e:
+        logger.warning("[%s] Could not look up an open PR for %s: %s", task.ticket_id, branch_name, e)
+        existing = None
+    if existing:
+        log_task(logger, task.ticket_id, "PR already open", pr_url=existing.get("url"), run_id=task.task_id)
+        return existing
+    return provider.create_pull_request(
+        repo_owner=task.repo_owner,
+        repo_name=task.repo_name,
+        head_branch=branch_name,
+        base_branch=task.default_branch or "main",
+        title=f"{task.ticket_id}: {task.title or 'Implement task'}"[:256],
+        body=_pr_body(task),
+        reviewer_logins=[task.reporter] if task.reporter else None,
+        labels=[settings.pr_label_ai_generated] if settings.pr_label_ai_generated else None,
+    )
+
+
+def outbox_dir() -> Path:
+    return Path(get_settings().workspace_base) / OUTBOX_DIRNAME
+
+
+def _write_item(item: DeliveryItem, path: Path) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(item.model_dump_json(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def enqueue_delivery(
+    task: TaskContext, work_dir: Path, branch: str, repo_map: str, plan: ImplementationPlan | None
+) -> str:
+    """
+    Commit the workspace, bundle the new commit and queue it for delivery. Returns the outbox item id.
+    The task's lease moves to the item (task.lease_token is cleared).
+    """
+    commit(work_dir, commit_message(task))
+    outbox = outbox_dir()
+    outbox.mkdir(parents=True, exist_ok=True)
+    item = DeliveryItem(
+        id=f"{task.task_id}-{uuid.uuid4().hex[:6]}", task=task, branch=branch, repo_map=repo_map,
+        plan=plan or ImplementationPlan(),
+    )
+    bundle = outbox / f"{item.id}.bundle"
+    # The branch is one commit on top of origin/<base>; the mirror already has everything below it.
+    r = _run_git(work_dir, "bundle", "create", str(bundle), f"refs/heads/{branch}", "^HEAD~1")
+    if r.returncode != 0:
+        bundle.unlink(missing_ok=True)
+        raise RuntimeError(f"Git bundle failed: {r.stderr or r.stdout}")
+    _write_item(item, outbox / f"{item.id}.json")
+    task.lease_token = None  # the item holds the lease now; the run must not release it
+    log_task(
+        logger, task.ticket_id, "Delivery queued", outbox_id=item.id, bytes=bundle.stat().st_size, run_id=task.task_id
+    )
+    return item.id
+
+
+def deliver_item(item: DeliveryItem, bundle: Path) -> dict:
+    """Push the bundled branch from the mirror and open the PR. Returns the provider's PR dict."""
+    task = item.task
+    mirror = ensure_mirror(get_clone_url(task), mirror_path(task))
+    ref = f"{_OUTBOX_REF}/{item.id}"
+    try:
+        r = _run_git(mirror, "fetch", "--quiet", str(bundle), f"+refs/heads/{item.branch}:{ref}")
+        if r.returncode != 0:
+            raise RuntimeError(f"Git fetch bundle failed: {r.stderr or r.stdout}")
+        r = _run_git(mirror, "push", "origin", f"{ref}:refs/heads/{item.branch}")
+        if r.returncode != 0:
+            raise RuntimeError(f"Git push failed: {r.stderr or r.stdout}")
+    finally:
+        _run_git(mirror, "update-ref", "-d", ref)
+    return open_pr(task, item.branch)
+
+
+class DeliveryWorker:
+    """Polls the outbox and delivers due items, one at a time per process."""
+
+    def pending(self) -> int:
+        outbox = outbox_dir()
+        return len(list(outbox.glob("*.json"))) if outbox.is_dir() else 0
+
+    def _due(self) -> list[Path]:
+        outbox = outbox_dir()
+        if not outbox.is_dir():
+            return []
+        now = time.time()
+        due: list[tuple[float, Path]] = []
+        for path in outbox.glob("*.json"):
+            try:
+                item = DeliveryItem.model_validate_json(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if item.next_attempt_at <= now:
+                due.append((item.created_at, path))
+        return [p for _, p in sorted(due)]
+
+    def _process(self, path: Path) -> None:
+        lock = path.with_suffix(".lock")
+        with file_lock(lock, blocking=False) as held:
+            if not held or not path.exists():
+                return  # another process is delivering it (or just did)
+            item = DeliveryItem.model_validate_json(path.read_text(encoding="utf-8"))
+            bundle = path.with_suffix(".bundle")
+            reporter = ProgressReporter(item.task)
+            task = item.task
+            try:
+                with lease_heartbeat(task.ticket_id, task.repo_full_name, task.lease_token), reporter.stage("deliver"):
+                    pr = deliver_item(item, bundle)
+            except Exception as e:
+                self._failed(item, path, e, reporter)
+            else:
+                save_branch_state(item.task, item.branch, item.repo_map, item.plan)
+                reporter.finish("succeeded", pr_url=pr.get("url"), delivery_attempts=item.attempts + 1)
+                log_task(
+                    logger, item.task.ticket_id, "PR created",
+                    pr_url=pr.get("url"), outbox_id=item.id, run_id=item.task.task_id,
+                )
+                path.unlink(missing_ok=True)
+                bundle.unlink(missing_ok=True)
+                idempotency_release(task.ticket_id, task.repo_full_name, task.lease_token)
+            if not path.exists():
+                # Still held: whoever opens the old lock file next sees the item gone and skips it.
+                lock.unlink(missing_ok=True)
+
+    def _failed(self, item: DeliveryItem, path: Path, error: Exception, reporter: ProgressReporter) -> None:
+        settings = get_settings()
+        item.attempts += 1
+        item.last_error = f"{type(error).__name__}: {error}"[:1000]
+        if item.attempts >= settings.delivery_max_attempts:
+            failed = path.parent / "failed"
+            failed.mkdir(exist_ok=True)
+            _write_item(item, failed / path.name)
+            path.unlink(missing_ok=True)
+            bundle = path.with_suffix(".bundle")
+            if bundle.exists():
+                os.replace(bundle, failed / bundle.name)
+            logger.error("[%s] Delivery %s failed after %s attempts: %s", item.task.ticket_id, item.id, item.attempts, error)
+            reporter.finish("failed", error=f"Delivery failed: {item.last_error}")
+            idempotency_release(item.task.ticket_id, item.task.repo_full_name, item.task.lease_token)
+            return
+        backoff = min(_MAX_BACKOFF_SECONDS, settings.delivery_backoff_seconds * 2 ** (item.attempts - 1))
+        item.next_attempt_at = time.time() + backoff
+        _write_item(item, path)
+        log_task(
+            logger, item.task.ticket_id, "Delivery failed, will retry",
+            outbox_id=item.id, attempt=item.attempts, retry_in=round(backoff), error=item.last_error,
+            run_id=item.task.task_id,
+        )
+
+    def _renew_leases(self) -> None:
+        """Keep the leases of waiting items (backing off between attempts) alive."""
+        outbox = outbox_dir()
+        if not outbox.is_dir():
+            return
+        for path in outbox.glob("*.json"):
+            try:
+                task = DeliveryItem.model_validate_json(path.read_text(encoding="utf-8")).task
+            except (OSError, ValueError):
+                continue
+            if task.lease_token is None:
+                continue
+            try:
+                idempotency_renew(task.ticket_id, task.repo_full_name, task.lease_token)
+            except Exception as e:
+                logger.warning("[%s] Renewing delivery lease failed: %s", task.ticket_id, e)
+
+    def _loop(self, stop: threading.Event) -> None:
+        renew_interval = max(1.0, get_settings().idempotency_lease_ttl_seconds / 3)
+        renewed_at = 0.0
+        while not stop.is_set():
+            try:
+                if time.monotonic() - renewed_at >= renew_interval:
+                    renewed_at = time.monotonic()
+                    self._renew_leases()
+                for path in self._due():
+                    if stop.is_set():
+                        break
+                    self._process(path)
+            except Exception:
+                logger.exception("Delivery worker iteration failed")
+            stop.wait(1.0)
+
+    def start(self, stop: threading.Event) -> threading.Thread:
+        thread = threading.Thread(target=self._loop, args=(stop,), name="delivery", daemon=True)
+        thread.start()
+        return thread
+
+
+_worker = DeliveryWorker()
+gauge("agent_outbox_pending", "Deliveries waiting in the outbox", (), lambda: {(): _worker.pending()})
+
+
+def get_delivery_worker() -> DeliveryWorker:
+    return _worker
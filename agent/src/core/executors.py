@@ -0,0 +1,120 @@
+"""
+Stage executor pools: pipeline stages run on a pool sized for the resource they wait on.
+io: git and provider API calls. llm: Anthropic requests (mostly idle waiting; high concurrency).
+cpu: map building and validation (bounded by cores, so in-flight tickets don't oversubscribe test runs).
+Worker threads only coordinate a task's stages, so worker_concurrency (tasks in flight) can exceed the core count.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Literal, TypeVar
+
+from ..config import get_settings
+from ..utils.metrics import gauge
+from ..utils.profiling import profiled_call
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+PoolName = Literal["io", "llm", "cpu"]
+
+_in_pool = threading.local()
+
+
+class StagePool:
+    """Thread pool for one stage kind, with queued/active counters for health stats."""
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"stage-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """Queue fn on this pool in a copy of the caller's context."""
+        ctx = contextvars.copy_context()
+        with self._lock:
+            self._queued += 1
+
+        def call() -> T:
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+            _in_pool.name = self.name
+            try:
+                return ctx.run(profiled_call, fn, *args, **kwargs)
+            finally:
+                _in_pool.name = None
+                with self._lock:
+                    self._active -= 1
+
+        future = self._executor.submit(call)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: "Future[Any]") -> None:
+        if future.cancelled():  # cancelled while queued: call() never ran
+            with self._lock:
+                self._queued -= 1
+
+    def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn on this pool (in a copy of the caller's context) and wait for its result."""
+        if getattr(_in_pool, "name", None) == self.name:
+            return fn(*args, **kwargs)  # already on this pool: nesting would deadlock when saturated
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"max_workers": self.max_workers, "active": self._active, "queued": self._queued}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pools: dict[str, StagePool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_size(name: str) -> int:
+    settings = get_settings()
+    if name == "io":
+        return settings.stage_pool_io_workers
+    if name == "llm":
+        return settings.stage_pool_llm_workers
+    return settings.stage_pool_cpu_workers or os.cpu_count() or 2
+
+
+def get_pool(name: PoolName) -> StagePool:
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = StagePool(name, max(1, _pool_size(name)))
+    return pool
+
+
+def run_in(name: PoolName, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a stage function on the named pool and wait for it (exceptions propagate)."""
+    return get_pool(name).run(fn, *args, **kwargs)
+
+
+async def run_in_async(name: PoolName, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await a blocking stage function on the named pool from a coroutine (asyncio pipeline)."""
+    return await asyncio.wrap_future(get_pool(name).submit(fn, *args, **kwargs))
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    return {name: get_pool(name).stats() for name in ("io", "llm", "cpu")}
+
+
+gauge(
+    "agent_stage_pool_tasks", "Stage pool tasks running / waiting for a worker", ("pool", "state"),
+    lambda: {(pool, k): s[k] for pool, s in pool_stats().items() for k in ("active", "queued")},
+)
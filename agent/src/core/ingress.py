@@ -0,0 +1,222 @@
+"""
+Webhook ingress (F1.1, F1.6): delivery-ID deduplication and burst coalescing.
+Providers redeliver on timeout and send several events per logical action (opened, assigned, labeled, edited).
+Redeliveries are dropped by delivery ID; events for the same (ticket, repo) within a short window
+collapse into one pipeline run with the latest payload. Review comments arriving while a run for the same PR
+holds the lease are held as a follow-up run, queued once that run releases it.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from ..config import get_settings
+from ..models.task import TaskContext
+from ..utils.idempotency import idempotency_acquire, idempotency_release
+from ..utils.logging import log_task
+from ..utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_FOLLOW_UP_POLL_SECONDS = 5.0
+
+_deliveries: TTLCache[str, bool] | None = None
+_deliveries_lock = threading.Lock()
+
+
+def _delivery_cache() -> TTLCache[str, bool]:
+    global _deliveries
+    if _deliveries is None:
+        with _deliveries_lock:
+            if _deliveries is None:
+                settings = get_settings()
+                _deliveries = TTLCache(settings.webhook_delivery_cache_size, settings.webhook_delivery_ttl_seconds)
+    return _deliveries
+
+
+def is_duplicate_delivery(delivery_id: str | None) -> bool:
+    """Record delivery_id; True if it was already seen within the TTL window."""
+    if not delivery_id:
+        return False
+    return not _delivery_cache().add(delivery_id.strip(), True)
+
+
+def forget_delivery(delivery_id: str | None) -> None:
+    """Drop delivery_id from the seen set, so a redelivery of an event that was not taken is processed."""
+    if delivery_id:
+        _delivery_cache().pop(delivery_id.strip())
+
+
+class _Pending:
+    __slots__ = ("task", "first_seen", "generation", "timer", "events")
+
+    def __init__(self, task: TaskContext) -> None:
+        self.task = task
+        self.first_seen = time.monotonic()
+        self.generation = 0
+        self.timer: threading.Timer | None = None
+        self.events = 1
+
+
+class Debouncer:
+    """
+    Trailing-edge debounce per key: dispatch(task) runs `window` seconds after the last event,
+    but no later than `max_wait` seconds after the first one.
+    """
+
+    def __init__(self, window: float, max_wait: float) -> None:
+        self.window = window
+        self.max_wait = max(window, max_wait)
+        self._pending: dict[tuple[str, str], _Pending] = {}
+        self._lock = threading.Lock()
+
+    def _arm(self, key: tuple[str, str], p: _Pending, dispatch: Callable[[TaskContext], None]) -> None:
+        if p.timer is not None:
+            p.timer.cancel()
+        p.generation += 1
+        delay = min(self.window, p.first_seen + self.max_wait - time.monotonic())
+        p.timer = threading.Timer(max(0.0, delay), self._fire, args=(key, p.generation, dispatch))
+        p.timer.daemon = True
+        p.timer.start()
+
+    def schedule(self, key: tuple[str, str], task: TaskContext, dispatch: Callable[[TaskContext], None]) -> None:
+        """Start a debounce window for key (caller holds the idempotency lease)."""
+        with self._lock:
+            p = _Pending(task)
+            self._pending[key] = p
+            self._arm(key, p, dispatch)
+
+    def update(
+        self,
+        key: tuple[str, str],
+        task: TaskContext,
+        dispatch: Callable[[TaskContext], None],
+        merge: Callable[[TaskContext, TaskContext], TaskContext] | None = None,
+    ) -> bool:
+        """
+        Replace the pending payload for key (or merge(pending, task) into it) and extend its window.
+        False if nothing is pending.
+        """
+        with self._lock:
+            p = self._pending.get(key)
+            if p is None:
+                return False
+            if merge is not None:
+                task = merge(p.task, task)
+            task.lease_token = p.task.lease_token
+            task.task_id = p.task.task_id
+            task.profile = task.profile or p.task.profile
+            p.task = task
+            p.events += 1
+            self._arm(key, p, dispatch)
+            return True
+
+    def _fire(self, key: tuple[str, str], generation: int, dispatch: Callable[[TaskContext], None]) -> None:
+        with self._lock:
+            p = self._pending.get(key)
+            if p is None or p.generation != generation:
+                return  # superseded by a later event
+            del self._pending[key]
+        log_task(logger, p.task.ticket_id, "Debounce window closed", events=p.events, repo=p.task.repo_full_name)
+        try:
+            dispatch(p.task)
+        except Exception:
+            logger.exception("[%s] Dispatch after debounce failed", p.task.ticket_id)
+            idempotency_release(p.task.ticket_id, p.task.repo_full_name, p.task.lease_token)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+class FollowUps:
+    """
+    Events for a key whose run holds the lease: merged into one follow-up task per key, which is dispatched
+    with a fresh lease as soon as the running run releases it (or its lease expires). Providers do not retry
+    webhooks, so rejecting these with 409 would drop them.
+    """
+
+    def __init__(self, poll_interval: float = _FOLLOW_UP_POLL_SECONDS) -> None:
+        self.poll_interval = poll_interval
+        self._pending: dict[tuple[str, str], tuple[TaskContext, Callable[[TaskContext], None]]] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add(
+        self,
+        key: tuple[str, str],
+        task: TaskContext,
+        dispatch: Callable[[TaskContext], None],
+        merge: Callable[[TaskContext, TaskContext], TaskContext] | None = None,
+    ) -> bool:
+        """Hold task until key's lease is free; True if it was merged into a follow-up already held."""
+        with self._lock:
+            held = self._pending.get(key)
+            if held is not None:
+                if merge is not None:
+                    task = merge(held[0], task)
+                task.task_id = held[0].task_id
+                task.profile = task.profile or held[0].profile
+            self._pending[key] = (task, dispatch)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="follow-ups", daemon=True)
+                self._thread.start()
+        return held is not None
+
+    def drain(self) -> int:
+        """Dispatch every follow-up whose lease can be taken now. Returns how many were dispatched."""
+        with self._lock:
+            keys = list(self._pending)
+        dispatched = 0
+        for key in keys:
+            try:
+                token = idempotency_acquire(*key)
+            except Exception as e:
+                logger.warning("[%s] Follow-up lease check failed: %s", key[0], e)
+                continue
+            if token is None:
+                continue
+            with self._lock:
+                task, dispatch = self._pending.pop(key)
+            task.lease_token = token
+            log_task(logger, task.ticket_id, "Follow-up run queued", repo=task.repo_full_name, run_id=task.task_id)
+            try:
+                dispatch(task)
+                dispatched += 1
+            except Exception:
+                logger.exception("[%s] Follow-up dispatch failed", task.ticket_id)
+                idempotency_release(task.ticket_id, task.repo_full_name, token)
+        return dispatched
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Follow-up drain failed")
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+_debouncer: Debouncer | None = None
+_follow_ups = FollowUps()
+
+
+def get_debouncer() -> Debouncer:
+    global _debouncer
+    if _debouncer is None:
+        settings = get_settings()
+        _debouncer = Debouncer(settings.webhook_debounce_seconds, settings.webhook_debounce_max_seconds)
+    return _debouncer
+
+
+def get_follow_ups() -> FollowUps:
+    return _follow_ups
+
+
+def task_key(task: TaskContext) -> tuple[str, str]:
+    return (task.ticket_id.strip(), task.repo_full_name.strip())
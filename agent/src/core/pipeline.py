@@ -1,11 +1,11 @@
 """
 Main pipeline: webhook task → clone → branch → map → plan → implement → validate (loop) → deliver.
-Phase 3: validation loop. Phase 4: commit, push, PR.
+Phase 3: validation loop. Phase 4: commit, push, PR. PR-comment tasks run the incremental pipeline in pr_feedback.
+Stages run on the io / llm / cpu executor pools; the calling worker thread only sequences them.
 """
 
 import logging
 import shutil
-import uuid
 from pathlib import Path
 
 from ..config import get_settings
@@ -14,113 +14,166 @@ from ..services.git import (
     clone_repo,
     create_feature_branch,
     get_clone_url,
-    get_git_provider,
     commit,
+    has_changes as workspace_has_changes,
     push,
 )
-from ..services.codebase_map import build_map
+from ..services.branch_state import save_branch_state
+from ..services.git.mirror import ensure_mirror, mirror_path
+from ..services.symbol_index import build_repo_map
 from ..services.planner import create_plan
 from ..services.implementer import implement
-from ..services.validator import run_validation
-from ..utils.idempotency import idempotency_release
+from ..utils.deadline import Deadline
+from ..utils.idempotency import idempotency_release, lease_heartbeat
 from ..utils.logging import log_task
+from ..utils.metrics import span
+from ..utils.profiling import profile_run
+from ..utils.progress import ProgressReporter
+from .delivery import commit_message, enqueue_delivery, open_pr
+from .executors import run_in
+from .pr_feedback import run_pr_feedback
+from .validation_loop import validate_with_self_heal
+from .workspace import provision_workspace, run_path, workspace
 
 logger = logging.getLogger(__name__)
 
 
-def _pr_body(task: TaskContext) -> str:
-    """Build PR description from task (F6.4)."""
-    parts = [f"**Ticket:** {task.ticket_id}", f"**Title:** {task.title or '(no title)'}", ""]
-    if task.description:
-        parts.append("## Description\n")
-        parts.append(task.description.strip())
-        parts.append("")
-    if task.acceptance_criteria:
-        parts.append("## Acceptance criteria")
-        for c in task.acceptance_criteria:
-            parts.append(f"- {c}")
-    return "\n".join(parts)
+def run_work_dir(task: TaskContext) -> Path:
+    """Workspace of a ticket run: <workspace_base>/runs/<repo>_<task_id>_<ticket>."""
+    return run_path(f"{task.repo_name}_{task.task_id}_{task.ticket_id.replace('#', '').replace('!', '')}")
+
+
+def _checkout(task: TaskContext, work_dir: Path) -> str:
+    """Check out the base branch (from the mirror, or clone) and create the feature branch. Returns the branch."""
+    settings = get_settings()
+    clone_url = get_clone_url(task)
+    mirror: Path | None = None
+    if settings.repo_mirrors_enabled:
+        try:
+            mirror = ensure_mirror(clone_url, mirror_path(task))
+            provision_workspace(mirror, work_dir, task.default_branch or None)
+        except RuntimeError as e:
+            logger.warning("[%s] Mirror checkout failed, cloning instead: %s", task.ticket_id, e)
+            mirror = None
+            shutil.rmtree(work_dir, ignore_errors=True)
+    if mirror is None:
+        clone_repo(clone_url, work_dir, branch=task.default_branch or None)
+    return create_feature_branch(work_dir, task)
+
+
+def _deliver(task: TaskContext, work_dir: Path, branch_name: str) -> dict:
+    """Commit, push and open the PR (F6). Returns the provider's PR dict."""
+    commit(work_dir, commit_message(task))
+    push(work_dir, branch_name)
+    return open_pr(task, branch_name)
+
+
+def can_deliver() -> bool:
+    """Whether a run can open a PR: an LLM key (changes were made) and a provider token."""
+    settings = get_settings()
+    return bool(settings.anthropic_api_key and (settings.github_token or settings.gitlab_token))
+
+
+def finish_undelivered(reporter: ProgressReporter, validation_passed: bool, no_changes: bool, planned: bool) -> None:
+    """Terminal state for a run that opened no PR."""
+    settings = get_settings()
+    if validation_passed and not (settings.github_token or settings.gitlab_token):
+        reporter.finish("skipped", reason="no GITHUB_TOKEN / GITLAB_TOKEN")
+    elif no_changes or validation_passed:
+        reporter.finish("no_changes")
+    elif planned:
+        reporter.finish("validation_failed")
+    else:
+        reporter.finish("skipped", reason="no ANTHROPIC_API_KEY")
+
+
+def finish_timed_out(task: TaskContext, reporter: ProgressReporter, deadline: Deadline, error: BaseException) -> None:
+    """Report a run that ran out of budget (whatever the killed operation raised)."""
+    log_task(logger, task.ticket_id, "Pipeline timed out", seconds=deadline.seconds, error=type(error).__name__, run_id=task.task_id)
+    reporter.finish("timed_out", error=f"Task deadline of {deadline.seconds:g}s exceeded ({type(error).__name__})")
 
 
 def run_pipeline(task: TaskContext) -> None:
     """
     Run the full pipeline: clone → branch → map → plan → implement → validate (retry) → commit → push → PR.
     Cleans up workspace in finally. Delivery (F6) only when validation passes (F5.6).
+    The idempotency lease (task.lease_token) is kept alive by heartbeat for the whole run and released at the end;
+    with delivery_mode=outbox it passes to the outbox item and is released when the PR is open.
+    Progress (stage, attempt, durations, tokens) is published for GET /api/tasks/{task.task_id}.
+    The run has a task_timeout_seconds deadline: stages start only within it, git / LLM / validation calls
+    get the remaining budget, and a run that exceeds it ends as timed_out.
     """
-    run_id = str(uuid.uuid4())[:8]
+    reporter = ProgressReporter(task)
+    deadline = Deadline(get_settings().task_timeout_seconds)
+    try:
+        with (
+            lease_heartbeat(task.ticket_id, task.repo_full_name, task.lease_token),
+            reporter.activate(),
+            deadline.activate(),
+        ):
+            try:
+                with span("pipeline") as sp, profile_run(task):
+                    sp.set(task_id=task.task_id, ticket_id=task.ticket_id, repo=task.repo_full_name)
+                    if task.pr_comments:
+                        run_pr_feedback(task, reporter)
+                    else:
+                        _run_pipeline(task, reporter)
+            except Exception as e:
+                if not deadline.expired():
+                    raise
+                finish_timed_out(task, reporter, deadline, e)
+    finally:
+        idempotency_release(task.ticket_id, task.repo_full_name, task.lease_token)
+
+
+def _run_pipeline(task: TaskContext, reporter: ProgressReporter) -> None:
+    run_id = task.task_id
     log_task(logger, task.ticket_id, "Pipeline started", run_id=run_id)
 
-    base = Path(get_settings().workspace_base)
-    base.mkdir(parents=True, exist_ok=True)
-    work_dir = base / f"{task.repo_name}_{run_id}_{task.ticket_id.replace('#', '').replace('!', '')}"
     settings = get_settings()
     branch_name: str | None = None
     repo_map = ""
     plan = None
     validation_passed = False
+    no_changes = False
 
-    try:
-        clone_url = get_clone_url(task)
-        clone_repo(clone_url, work_dir, branch=task.default_branch or None)
-        branch_name = create_feature_branch(work_dir, task)
+    with workspace(run_work_dir(task)) as work_dir:
+        with reporter.stage("clone"):
+            branch_name = run_in("io", _checkout, task, work_dir)
         log_task(logger, task.ticket_id, "Clone and branch ready", branch=branch_name, run_id=run_id)
 
         if not settings.anthropic_api_key:
             logger.info("[%s] Phase 2 skipped (no ANTHROPIC_API_KEY)", task.ticket_id)
         else:
-            repo_map = build_map(work_dir)
+            with reporter.stage("map"):
+                repo_map = run_in("cpu", build_repo_map, work_dir)
             log_task(logger, task.ticket_id, "Codebase map built", run_id=run_id)
-            plan = create_plan(task, repo_map)
+            with reporter.stage("plan"):
+                plan = run_in("llm", create_plan, task, repo_map)
             log_task(logger, task.ticket_id, "Plan created", steps=len(plan.steps), run_id=run_id)
-            implement(work_dir, task, repo_map, plan)
+            with reporter.stage("implement"):
+                run_in("llm", implement, work_dir, task, repo_map, plan)
             log_task(logger, task.ticket_id, "Implementation applied", run_id=run_id)
 
             # Phase 3: validation loop (F5.4, F5.5)
-            for attempt in range(settings.max_validation_retries + 1):
-                result = run_validation(work_dir, timeout=min(300, settings.task_timeout_seconds))
-                if result.success:
-                    validation_passed = True
-                    log_task(logger, task.ticket_id, "Validation passed", attempt=attempt + 1, run_id=run_id)
-                    break
-                log_task(logger, task.ticket_id, "Validation failed, self-heal attempt", attempt=attempt + 1, run_id=run_id)
-                if attempt < settings.max_validation_retries and plan and plan.steps:
-                    implement(work_dir, task, repo_map, plan, feedback=result.feedback)
-                else:
-                    logger.warning("[%s] Validation failed after max retries; skipping PR", task.ticket_id)
-                    break
+            validation_passed, no_changes = validate_with_self_heal(work_dir, task, repo_map, plan, reporter, run_id)
 
         # Phase 4: deliver only when validation passed and we have code changes (Phase 2 ran)
-        has_changes = False
-        if validation_passed and branch_name and settings.anthropic_api_key and (settings.github_token or settings.gitlab_token):
-            # Only commit/push/PR if there are actual changes (F6)
-            try:
-                from ..services.git.clone import _run_git
-                r = _run_git(work_dir, "status", "--porcelain")
-                has_changes = bool(r.stdout and r.stdout.strip())
-            except Exception:
-                has_changes = True  # assume changes if check fails
-        if not has_changes and validation_passed and branch_name:
+        # Only commit/push/PR if there are actual changes (F6)
+        has_changes = bool(validation_passed and branch_name and can_deliver() and workspace_has_changes(work_dir))
+        if not has_changes and (validation_passed or no_changes) and branch_name:
             log_task(logger, task.ticket_id, "Skipping PR: no changes to commit", run_id=run_id)
-        if has_changes:
-            commit_message = f"{task.ticket_id}: {task.title or 'Implement task'}"[:200]
-            commit(work_dir, commit_message)
-            push(work_dir, branch_name)
-            provider = get_git_provider(task.provider)
-            pr = provider.create_pull_request(
-                repo_owner=task.repo_owner,
-                repo_name=task.repo_name,
-                head_branch=branch_name,
-                base_branch=task.default_branch or "main",
-                title=f"{task.ticket_id}: {task.title or 'Implement task'}"[:256],
-                body=_pr_body(task),
-                reviewer_logins=[task.reporter] if task.reporter else None,
-                labels=[settings.pr_label_ai_generated] if settings.pr_label_ai_generated else None,
-            )
+        if has_changes and settings.delivery_mode == "outbox":
+            # Push + PR happen in the delivery worker; the workspace is freed as soon as the commit is bundled.
+            with reporter.stage("bundle"):
+                item_id = run_in("io", enqueue_delivery, task, work_dir, branch_name, repo_map, plan)
+            reporter.hand_off("delivering", outbox_id=item_id)
+        elif has_changes:
+            with reporter.stage("deliver"):
+                pr = run_in("io", _deliver, task, work_dir, branch_name)
             log_task(logger, task.ticket_id, "PR created", pr_url=pr.get("url"), run_id=run_id)
-    finally:
-        if work_dir.exists():
-            try:
-                shutil.rmtree(work_dir, ignore_errors=True)
-            except Exception as e:
-                logger.warning("Cleanup workspace %s: %s", work_dir, e)
-        idempotency_release(task.ticket_id, task.repo_full_name)
+            # Review comments on this PR reuse the map and plan instead of rebuilding them (F7).
+            save_branch_state(task, branch_name, repo_map, plan)
+            reporter.finish("succeeded", pr_url=pr.get("url"))
+        else:
+            finish_undelivered(reporter, validation_passed, no_changes, planned=plan is not None)
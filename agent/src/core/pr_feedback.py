@@ -0,0 +1,127 @@
+"""
+PR-comment pipeline (F7): incremental run on an existing agent PR.
+Checks out the PR branch from the repo's warm mirror (worktree, no clone), reuses the repo map and plan
+saved when the PR was delivered, sends only the review comments + branch diff to the implementer,
+then validates and pushes to the same branch.
+"""
+
+import logging
+from pathlib import Path
+
+from ..config import get_settings
+from ..models.events import PRCommentPayload
+from ..models.plan import ImplementationPlan, PlanStep
+from ..models.task import GitProvider, TaskContext
+from ..services.branch_state import load_branch_state, save_branch_state
+from ..services.git import commit, get_clone_url, get_git_provider, has_changes, push
+from ..services.git.clone import BRANCH_PREFIX, _run_git
+from ..services.git.mirror import ensure_mirror, mirror_path, mirror_worktree
+from ..services.implementer import apply_review_feedback
+from ..services.symbol_index import build_repo_map
+from ..utils.logging import log_task
+from ..utils.progress import ProgressReporter
+from .executors import run_in
+from .validation_loop import validate_with_self_heal
+from .workspace import run_path, workspace
+
+logger = logging.getLogger(__name__)
+
+_MAX_DIFF_CHARS = 20000
+
+
+def comment_task(comment: PRCommentPayload) -> TaskContext:
+    """Task for a PR comment. ticket_id is the PR ("#12" / "!12"), so leases and debouncing are per PR."""
+    provider = GitProvider(comment.provider)
+    prefix = "!" if provider == GitProvider.GITLAB else "#"
+    return TaskContext(
+        ticket_id=f"{prefix}{comment.pr_number}",
+        provider=provider,
+        repo_owner=comment.repo_owner,
+        repo_name=comment.repo_name,
+        repo_full_name=comment.repo_full_name,
+        default_branch=comment.pr_base_branch or "main",
+        pr_comments=[comment],
+    )
+
+
+def merge_comments(pending: TaskContext, new: TaskContext) -> TaskContext:
+    """Debounce merge: a review with several comments becomes one run addressing all of them."""
+    new.pr_comments = pending.pr_comments + new.pr_comments
+    return new
+
+
+def _branch_diff(work_dir: Path, base_branch: str) -> tuple[str, list[str]]:
+    """Diff of the PR branch against its merge base with origin/<base_branch>, and the files it touches."""
+    base = f"refs/remotes/origin/{base_branch}...HEAD"
+    r = _run_git(work_dir, "diff", base)
+    diff = r.stdout if r.returncode == 0 else ""
+    if len(diff) > _MAX_DIFF_CHARS:
+        diff = diff[:_MAX_DIFF_CHARS] + "\n... (diff truncated)"
+    r = _run_git(work_dir, "diff", "--name-only", "--diff-filter=d", base)
+    files = [f for f in (r.stdout or "").splitlines() if f.strip()] if r.returncode == 0 else []
+    return diff, files
+
+
+def run_pr_feedback(task: TaskContext, reporter: ProgressReporter) -> None:
+    """Address task.pr_comments on the PR branch. Called by run_pipeline (lease and progress are handled there)."""
+    run_id = task.task_id
+    settings = get_settings()
+    first = task.pr_comments[0]
+    log_task(logger, task.ticket_id, "PR feedback started", comments=len(task.pr_comments), run_id=run_id)
+
+    with reporter.stage("resolve"):
+        pr = run_in("io", get_git_provider(task.provider).get_pull_request, task.repo_owner, task.repo_name, first.pr_number)
+    branch = pr["head_branch"]
+    comments = [c for c in task.pr_comments if not (pr["author"] and c.comment_author == pr["author"])]
+    skip_reason = None
+    if not branch.startswith(BRANCH_PREFIX):
+        skip_reason = f"not an agent branch ({branch})"
+    elif pr["state"] not in ("open", "opened"):
+        skip_reason = f"PR is {pr['state']}"
+    elif not comments:
+        skip_reason = "comments by the PR author"
+    elif not settings.anthropic_api_key:
+        skip_reason = "no ANTHROPIC_API_KEY"
+    if skip_reason:
+        log_task(logger, task.ticket_id, "PR feedback skipped", reason=skip_reason, run_id=run_id)
+        reporter.finish("skipped", reason=skip_reason)
+        return
+
+    mirror = mirror_path(task)
+    with workspace(run_path(f"{task.repo_name}_{run_id}_pr{first.pr_number}")) as work_dir:
+        with reporter.stage("checkout"):
+            run_in("io", ensure_mirror, get_clone_url(task), mirror)
+            run_in("io", mirror_worktree, mirror, work_dir, branch)
+        log_task(logger, task.ticket_id, "Branch checked out from mirror", branch=branch, run_id=run_id)
+
+        state = load_branch_state(task, branch)
+        if state is not None:
+            task = task.model_copy(update={"title": state.title, "description": state.description})
+        else:
+            task = task.model_copy(update={"title": pr["title"], "description": pr["body"]})
+        diff, files = _branch_diff(work_dir, pr["base_branch"])
+        with reporter.stage("map"):
+            repo_map = state.repo_map if state and state.repo_map else run_in("cpu", build_repo_map, work_dir)
+        plan = state.plan if state and state.plan.steps else ImplementationPlan(
+            steps=[PlanStep(file_path=f, action="modify", reason="changed in this PR") for f in files]
+        )
+        focus = list(dict.fromkeys(files + [c.file_path for c in comments if c.file_path]))
+        log_task(logger, task.ticket_id, "Branch state loaded", cached=state is not None, files=len(focus), run_id=run_id)
+
+        with reporter.stage("implement"):
+            run_in("llm", apply_review_feedback, work_dir, task, repo_map, comments, diff, focus)
+        passed, no_changes = validate_with_self_heal(work_dir, task, repo_map, plan, reporter, run_id)
+
+        if passed and has_changes(work_dir):
+            # task.ticket_id is the PR reference; commits and the saved state keep the original ticket.
+            ticket = state.ticket_id if state and state.ticket_id else task.ticket_id
+            with reporter.stage("deliver"):
+                run_in("io", commit, work_dir, f"{ticket}: address review feedback"[:200])
+                run_in("io", push, work_dir, branch)
+            save_branch_state(task.model_copy(update={"ticket_id": ticket}), branch, repo_map, plan)
+            log_task(logger, task.ticket_id, "Review feedback pushed", branch=branch, pr_url=pr["url"], run_id=run_id)
+            reporter.finish("succeeded", pr_url=pr["url"])
+        elif no_changes or passed:
+            reporter.finish("no_changes")
+        else:
+            reporter.finish("validation_failed")
@@ -0,0 +1,118 @@
+"""
+Speculative self-heal (F5.4, F5.5): K fix candidates generated and validated concurrently,
+each in its own linked worktree of the workspace. The first candidate to pass wins; the rest are cancelled
+and abandoned (they clean up their worktrees when their in-flight call returns).
+"""
+
+import contextvars
+import logging
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from ..models.plan import ImplementationPlan
+from ..models.task import TaskContext
+from ..services.git.clone import add_worktree, checkout_tree, remove_worktree, snapshot_commit, tree_hash
+from ..services.implementer import implement
+from ..services.validator import ValidationResult, run_validation
+from ..utils.deadline import deadline_suspended
+from ..utils.logging import log_task
+from .executors import run_in
+
+logger = logging.getLogger(__name__)
+
+
+def speculative_self_heal(
+    work_dir: Path,
+    task: TaskContext,
+    repo_map: str,
+    plan: ImplementationPlan,
+    feedback: str,
+    *,
+    candidates: int,
+    timeout: int,
+) -> ValidationResult | None:
+    """
+    Generate `candidates` fixes for feedback in parallel worktrees and validate each.
+    The passing candidate's tree (or, if none passes, the first one to finish) is checked out into work_dir,
+    so the next run_validation on work_dir is a cache hit. Returns that candidate's result, or None if
+    no candidate produced a result (work_dir is then unchanged).
+    """
+    work_dir = Path(work_dir)
+    snapshot = snapshot_commit(work_dir)
+    if not snapshot:
+        logger.warning("[%s] Could not snapshot workspace; falling back to sequential self-heal", task.ticket_id)
+        return None
+
+    spec_root = work_dir.parent / f"{work_dir.name}.spec"
+    cancel = threading.Event()
+    lock = threading.Lock()
+    active = [candidates]
+
+    def cleanup(wt: Path | None) -> None:
+        # Each candidate removes its own worktree (its tree object stays in the shared object store),
+        # and the last one removes spec_root, so losers never hold up the winner.
+        with deadline_suspended():
+            if wt is not None:
+                remove_worktree(work_dir, wt)
+            with lock:
+                active[0] -= 1
+                last = active[0] == 0
+            if last:
+                shutil.rmtree(spec_root, ignore_errors=True)
+
+    def attempt(i: int) -> tuple[str, ValidationResult] | None:
+        wt: Path | None = None
+        try:
+            if cancel.is_set():
+                return None
+            wt = spec_root / f"c{i}"
+            add_worktree(work_dir, wt, snapshot)
+            run_in("llm", implement, wt, task, repo_map, plan, feedback=feedback, cancel=cancel)
+            if cancel.is_set():
+                return None
+            tree = tree_hash(wt)
+            result = run_in("cpu", run_validation, wt, timeout=timeout, tree=tree, cancel=cancel)
+            if cancel.is_set() and not result.success:
+                return None
+            return tree or "", result
+        finally:
+            cleanup(wt)
+
+    def skipped(fut: Future) -> None:
+        if fut.cancelled():
+            cleanup(None)  # never started, so attempt() won't clean up
+
+    winner: tuple[str, ValidationResult] | None = None
+    fallback: tuple[str, ValidationResult] | None = None
+    pool = ThreadPoolExecutor(max_workers=candidates, thread_name_prefix="speculate")
+    try:
+        # Each candidate runs in a copy of our context so token usage is attributed to this task.
+        futures = {pool.submit(contextvars.copy_context().run, attempt, i): i for i in range(candidates)}
+        for fut in futures:
+            fut.add_done_callback(skipped)
+        for fut in as_completed(futures):
+            try:
+                outcome = fut.result()
+            except Exception as e:
+                logger.warning("[%s] Speculative candidate %s failed: %s", task.ticket_id, futures[fut], e)
+                continue
+            if outcome is None or not outcome[0]:
+                continue
+            if outcome[1].success:
+                winner = outcome
+                log_task(logger, task.ticket_id, "Speculative candidate passed", candidate=futures[fut])
+                break
+            if fallback is None:
+                fallback = outcome
+    finally:
+        # First to pass wins: losers' in-flight LLM calls and validations are abandoned, not awaited.
+        cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    chosen = winner or fallback
+    if chosen is None:
+        return None
+    checkout_tree(work_dir, chosen[0])
+    return chosen[1]
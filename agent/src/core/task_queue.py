@@ -0,0 +1,341 @@
+"""
+Task queue between API ingress and pipeline workers.
+memory: in-process (API runs the workers). sqlite: file under workspace_base shared by processes on one host.
+redis: shared across hosts. The API only enqueues; `python -m src.worker` processes dequeue and run pipelines.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Any, NamedTuple
+
+from ..config import get_settings
+from ..models.task import TaskContext
+
+logger = logging.getLogger(__name__)
+
+_WAIT_SAMPLES = 200
+_REDIS_REQUEUE_INTERVAL = 30.0
+
+# Move claims older than ARGV[1] from processing (KEYS[1]) back to the head of pending (KEYS[2]).
+# KEYS[3] maps item id -> claim time; a claim without one (worker died right after BLMOVE) is stamped ARGV[2].
+_REQUEUE_LUA = """
+local moved = 0
+for _, raw in ipairs(redis.call("lrange", KEYS[1], 0, -1)) do
+    local id = string.match(raw, '"id":%s*"([^"]+)"')
+    local claimed = id and redis.call("hget", KEYS[3], id)
+    if id and not claimed then
+        redis.call("hset", KEYS[3], id, ARGV[2])
+    elseif not id or tonumber(claimed) < tonumber(ARGV[1]) then
+        redis.call("lrem", KEYS[1], 1, raw)
+        redis.call("rpush", KEYS[2], raw)
+        if id then
+            redis.call("hdel", KEYS[3], id)
+        end
+        moved = moved + 1
+    end
+end
+return moved
+"""
+
+
+class QueuedTask(NamedTuple):
+    id: str
+    task: TaskContext
+    enqueued_at: float
+
+
+class TaskQueue(ABC):
+    """FIFO of pipeline tasks with claim/ack semantics and basic wait-time stats."""
+
+    @abstractmethod
+    def put(self, task: TaskContext) -> str:
+        """Enqueue task; returns the queue item id."""
+        ...
+
+    @abstractmethod
+    def get(self, timeout: float = 1.0) -> QueuedTask | None:
+        """Claim the oldest task, waiting up to timeout seconds. None if the queue stayed empty."""
+        ...
+
+    @abstractmethod
+    def done(self, item: QueuedTask) -> None:
+        """Acknowledge a claimed task (finished, successfully or not)."""
+        ...
+
+    @abstractmethod
+    def depth(self) -> int:
+        """Tasks waiting to be claimed."""
+        ...
+
+    @abstractmethod
+    def running(self) -> int:
+        """Tasks claimed and not yet acknowledged."""
+        ...
+
+    @abstractmethod
+    def pending(self) -> list[TaskContext]:
+        """Tasks waiting to be claimed, oldest first."""
+        ...
+
+    @abstractmethod
+    def wait_samples(self) -> list[float]:
+        """Recent queue wait times (enqueue → claim), seconds."""
+        ...
+
+    def stats(self) -> dict[str, Any]:
+        waits = self.wait_samples()
+        return {
+            "depth": self.depth(),
+            "running": self.running(),
+            "wait_avg_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "wait_max_seconds": round(max(waits), 3) if waits else 0.0,
+        }
+
+
+class MemoryTaskQueue(TaskQueue):
+    def __init__(self) -> None:
+        self._q: Queue[QueuedTask] = Queue()
+        self._running: set[str] = set()
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._lock = threading.Lock()
+
+    def put(self, task: TaskContext) -> str:
+        item = QueuedTask(uuid.uuid4().hex, task, time.time())
+        self._q.put(item)
+        return item.id
+
+    def get(self, timeout: float = 1.0) -> QueuedTask | None:
+        try:
+            item = self._q.get(timeout=timeout)
+        except Empty:
+            return None
+        with self._lock:
+            self._running.add(item.id)
+            self._waits.append(time.time() - item.enqueued_at)
+        return item
+
+    def done(self, item: QueuedTask) -> None:
+        with self._lock:
+            self._running.discard(item.id)
+
+    def depth(self) -> int:
+        return self._q.qsize()
+
+    def running(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+    def pending(self) -> list[TaskContext]:
+        with self._q.mutex:
+            return [item.task for item in self._q.queue]
+
+    def wait_samples(self) -> list[float]:
+        with self._lock:
+            return list(self._waits)
+
+
+class SqliteTaskQueue(TaskQueue):
+    """SQLite-backed queue; safe across processes on one host. Claims from dead workers are requeued."""
+
+    def __init__(self, path: str | Path, poll_interval: float = 0.5) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " id TEXT PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL,"
+                " enqueued_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, enqueued_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, task: TaskContext) -> str:
+        item_id = uuid.uuid4().hex
+        self._conn().execute(
+            "INSERT INTO tasks (id, payload, state, enqueued_at) VALUES (?, ?, 'queued', ?)",
+            (item_id, task.model_dump_json(), time.time()),
+        )
+        return item_id
+
+    def _requeue_stale(self, conn: sqlite3.Connection) -> None:
+        stale_before = time.time() - 2 * get_settings().task_timeout_seconds
+        conn.execute(
+            "UPDATE tasks SET state = 'queued', started_at = NULL WHERE state = 'running' AND started_at < ?",
+            (stale_before,),
+        )
+
+    def _claim(self) -> QueuedTask | None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._requeue_stale(conn)
+            row = conn.execute(
+                "SELECT id, payload, enqueued_at FROM tasks WHERE state = 'queued' ORDER BY enqueued_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE tasks SET state = 'running', started_at = ? WHERE id = ?", (time.time(), row[0]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return QueuedTask(row[0], TaskContext.model_validate_json(row[1]), row[2])
+
+    def get(self, timeout: float = 1.0) -> QueuedTask | None:
+        deadline = time.monotonic() + timeout
+        while True:
+            item = self._claim()
+            if item is not None or time.monotonic() >= deadline:
+                return item
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+
+    def done(self, item: QueuedTask) -> None:
+        conn = self._conn()
+        conn.execute("UPDATE tasks SET state = 'done', finished_at = ? WHERE id = ?", (time.time(), item.id))
+        conn.execute("DELETE FROM tasks WHERE state = 'done' AND finished_at < ?", (time.time() - 86400,))
+
+    def depth(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM tasks WHERE state = 'queued'").fetchone()[0]
+
+    def running(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM tasks WHERE state = 'running'").fetchone()[0]
+
+    def pending(self) -> list[TaskContext]:
+        rows = self._conn().execute("SELECT payload FROM tasks WHERE state = 'queued' ORDER BY enqueued_at").fetchall()
+        return [TaskContext.model_validate_json(r[0]) for r in rows]
+
+    def wait_samples(self) -> list[float]:
+        rows = self._conn().execute(
+            "SELECT started_at - enqueued_at FROM tasks WHERE started_at IS NOT NULL ORDER BY started_at DESC LIMIT ?",
+            (_WAIT_SAMPLES,),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+
+class RedisTaskQueue(TaskQueue):
+    """
+    Redis list queue: LPUSH to enqueue, BLMOVE into a processing list to claim, LREM to ack.
+    Claim times are kept in a hash; claims from dead workers are requeued like the sqlite queue's.
+    """
+
+    def __init__(self, url: str | None = None, client: Any = None, prefix: str = "ai-dev-agent:queue") -> None:
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("Install redis: pip install redis") from e
+            client = redis.Redis.from_url(url or get_settings().redis_url)
+        self._client = client
+        self._pending = f"{prefix}:pending"
+        self._processing = f"{prefix}:processing"
+        self._waits = f"{prefix}:waits"
+        self._claims = f"{prefix}:claims"
+        self._requeue = client.register_script(_REQUEUE_LUA)
+        self._next_requeue = 0.0
+        # Exact raw entries of claimed items, needed for LREM on ack.
+        self._claimed: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, task: TaskContext) -> str:
+        item_id = uuid.uuid4().hex
+        raw = json.dumps({"id": item_id, "enqueued_at": time.time(), "task": task.model_dump(mode="json")})
+        self._client.lpush(self._pending, raw)
+        return item_id
+
+    def _requeue_stale(self) -> None:
+        now = time.time()
+        if now < self._next_requeue:
+            return
+        self._next_requeue = now + _REDIS_REQUEUE_INTERVAL
+        stale_before = now - 2 * get_settings().task_timeout_seconds
+        moved = self._requeue(keys=[self._processing, self._pending, self._claims], args=[stale_before, now])
+        if moved:
+            logger.warning("Requeued %s stale task claims", moved)
+
+    def get(self, timeout: float = 1.0) -> QueuedTask | None:
+        self._requeue_stale()
+        raw = self._client.blmove(self._pending, self._processing, max(timeout, 0.01), "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        pipe = self._client.pipeline()
+        pipe.hset(self._claims, data["id"], time.time())
+        pipe.lpush(self._waits, time.time() - data["enqueued_at"])
+        pipe.ltrim(self._waits, 0, _WAIT_SAMPLES - 1)
+        pipe.execute()
+        item = QueuedTask(data["id"], TaskContext.model_validate(data["task"]), data["enqueued_at"])
+        with self._lock:
+            self._claimed[item.id] = raw
+        return item
+
+    def done(self, item: QueuedTask) -> None:
+        with self._lock:
+            raw = self._claimed.pop(item.id, None)
+        if raw is not None:
+            pipe = self._client.pipeline()
+            pipe.lrem(self._processing, 1, raw)
+            pipe.hdel(self._claims, item.id)
+            pipe.execute()
+
+    def depth(self) -> int:
+        return int(self._client.llen(self._pending))
+
+    def running(self) -> int:
+        return int(self._client.llen(self._processing))
+
+    def pending(self) -> list[TaskContext]:
+        raws = self._client.lrange(self._pending, 0, -1)
+        return [TaskContext.model_validate(json.loads(raw)["task"]) for raw in reversed(raws)]
+
+    def wait_samples(self) -> list[float]:
+        return [float(x) for x in self._client.lrange(self._waits, 0, -1)]
+
+
+_queue: TaskQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_task_queue() -> TaskQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                settings = get_settings()
+                if settings.task_queue_backend == "sqlite":
+                    path = settings.task_queue_path or str(Path(settings.workspace_base) / "task_queue.sqlite3")
+                    _queue = SqliteTaskQueue(path)
+                elif settings.task_queue_backend == "redis":
+                    _queue = RedisTaskQueue()
+                else:
+                    _queue = MemoryTaskQueue()
+    return _queue
+
+
+def set_task_queue(queue: TaskQueue | None) -> None:
+    """Override the queue (tests, benchmarks); None resets to the configured backend."""
+    global _queue
+    with _queue_lock:
+        _queue = queue
+
+
+def enqueue_task(task: TaskContext) -> str:
+    """Hand a parsed, deduplicated task to the workers."""
+    return get_task_queue().put(task)
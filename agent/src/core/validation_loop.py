@@ -0,0 +1,68 @@
+"""
+Validation loop (F5.4, F5.5) shared by the ticket and PR-comment pipelines:
+validate the workspace, self-heal from feedback, and stop early when edits are no-ops.
+"""
+
+import logging
+from pathlib import Path
+from typing import NamedTuple
+
+from ..config import get_settings
+from ..models.plan import ImplementationPlan
+from ..models.task import TaskContext
+from ..services.git import head_tree, tree_hash
+from ..services.implementer import implement
+from ..services.validator import run_validation
+from ..utils.logging import log_task
+from ..utils.progress import ProgressReporter
+from .executors import run_in
+from .speculative import speculative_self_heal
+
+logger = logging.getLogger(__name__)
+
+
+class LoopOutcome(NamedTuple):
+    passed: bool
+    no_changes: bool
+
+
+def validate_with_self_heal(
+    work_dir: Path,
+    task: TaskContext,
+    repo_map: str,
+    plan: ImplementationPlan | None,
+    reporter: ProgressReporter,
+    run_id: str,
+) -> LoopOutcome:
+    """Validate, self-healing up to max_validation_retries times. no_changes: workspace equals HEAD."""
+    settings = get_settings()
+    base_tree = head_tree(work_dir)
+    for attempt in range(settings.max_validation_retries + 1):
+        reporter.set_attempt(attempt + 1)
+        tree = tree_hash(work_dir)
+        if tree and tree == base_tree:
+            # Edits were no-ops (or reverted everything): nothing to validate or deliver.
+            log_task(logger, task.ticket_id, "Workspace unchanged from base; skipping validation", attempt=attempt + 1, run_id=run_id)
+            return LoopOutcome(False, True)
+        with reporter.stage("validate"):
+            result = run_in("cpu", run_validation, work_dir, timeout=min(300, settings.task_timeout_seconds), tree=tree)
+        if result.success:
+            log_task(logger, task.ticket_id, "Validation passed", attempt=attempt + 1, run_id=run_id)
+            return LoopOutcome(True, False)
+        log_task(logger, task.ticket_id, "Validation failed, self-heal attempt", attempt=attempt + 1, cached=result.cached, run_id=run_id)
+        if attempt < settings.max_validation_retries and plan and plan.steps:
+            with reporter.stage("self_heal"):
+                healed = None
+                if settings.speculative_candidates > 1:
+                    # Adopted candidate tree is already validated: next iteration is a cache hit.
+                    healed = speculative_self_heal(
+                        work_dir, task, repo_map, plan, result.feedback,
+                        candidates=settings.speculative_candidates,
+                        timeout=min(300, settings.task_timeout_seconds),
+                    )
+                if healed is None:
+                    run_in("llm", implement, work_dir, task, repo_map, plan, feedback=result.feedback)
+        else:
+            logger.warning("[%s] Validation failed after max retries; skipping PR", task.ticket_id)
+            break
+    return LoopOutcome(False, False)
@@ -0,0 +1,123 @@
+"""
+Repo warmup (F2): keep mirrors, the symbol index and dependency envs current ahead of tickets.
+Push webhooks (and the optional periodic refresh of warm_repos) request a refresh; one background thread
+runs them, coalescing repeated requests for the same repo, so a ticket's clone + map stages only fetch
+and read what changed since the last push.
+"""
+
+import logging
+import threading
+import time
+
+from ..config import get_settings
+from ..models.task import GitProvider, TaskContext
+from ..services.dep_cache import prebuild_from_git
+from ..services.git import get_clone_url
+from ..services.git.mirror import ensure_mirror, mirror_path, mirror_ref
+from ..services.symbol_index import get_symbol_index
+from ..utils.logging import log_task
+
+logger = logging.getLogger(__name__)
+
+
+def warm_task(provider: str, repo_full_name: str, default_branch: str = "") -> TaskContext:
+    """Minimal task context addressing a repo (mirror path, clone URL). Empty default_branch = remote HEAD."""
+    owner, _, name = repo_full_name.rpartition("/")
+    return TaskContext(
+        ticket_id="warmup",
+        provider=GitProvider(provider),
+        repo_owner=owner,
+        repo_name=name,
+        repo_full_name=repo_full_name,
+        default_branch=default_branch,
+    )
+
+
+def parse_warm_repo(spec: str) -> TaskContext | None:
+    """'owner/repo' (default git_provider) or 'gitlab:group/repo' → task context; None if malformed."""
+    provider, sep, full = spec.strip().partition(":")
+    if not sep:
+        provider, full = get_settings().git_provider, spec.strip()
+    if provider not in ("github", "gitlab") or "/" not in full:
+        logger.warning("Ignoring malformed warm_repos entry %r", spec)
+        return None
+    return warm_task(provider, full)
+
+
+def is_warm_repo(provider: str, repo_full_name: str) -> bool:
+    """Whether pushes for this repo should refresh it (any repo when warm_repos is empty)."""
+    configured = get_settings().warm_repos
+    if not configured:
+        return True
+    for spec in configured:
+        task = parse_warm_repo(spec)
+        if task and task.provider.value == provider and task.repo_full_name == repo_full_name:
+            return True
+    return False
+
+
+def warm_repo(task: TaskContext) -> None:
+    """Fetch the mirror, index the default branch's blobs and prebuild its dependency envs."""
+    settings = get_settings()
+    started = time.monotonic()
+    mirror = ensure_mirror(get_clone_url(task), mirror_path(task))
+    rev = mirror_ref(task.default_branch or None)
+    indexed = get_symbol_index().index_tree(mirror, rev) if settings.symbol_index_enabled else 0
+    envs = prebuild_from_git(mirror, rev) if settings.dep_cache_enabled else 0
+    log_task(
+        logger, task.repo_full_name, "Repo warmed",
+        rev=rev, new_blobs=indexed, dep_envs=envs, seconds=round(time.monotonic() - started, 2),
+    )
+
+
+class Refresher:
+    """Background warmup worker; requests for the same repo made while one is pending collapse into one."""
+
+    def __init__(self) -> None:
+        self._pending: dict[tuple[str, str], TaskContext] = {}
+        self._cond = threading.Condition()
+
+    def request(self, task: TaskContext) -> None:
+        with self._cond:
+            self._pending[(task.provider.value, task.repo_full_name)] = task
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _request_configured(self) -> None:
+        for spec in get_settings().warm_repos:
+            task = parse_warm_repo(spec)
+            if task is not None:
+                self.request(task)
+
+    def _loop(self, stop: threading.Event) -> None:
+        interval = get_settings().warm_refresh_interval_seconds
+        next_periodic = time.monotonic() if interval > 0 else None
+        while not stop.is_set():
+            if next_periodic is not None and time.monotonic() >= next_periodic:
+                self._request_configured()
+                next_periodic = time.monotonic() + interval
+            with self._cond:
+                if not self._pending:
+                    self._cond.wait(timeout=1.0)
+                task = self._pending.pop(next(iter(self._pending))) if self._pending else None
+            if task is None:
+                continue
+            try:
+                warm_repo(task)
+            except Exception as e:
+                logger.warning("Warmup of %s failed: %s", task.repo_full_name, e)
+
+    def start(self, stop: threading.Event) -> threading.Thread:
+        thread = threading.Thread(target=self._loop, args=(stop,), name="repo-warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+_refresher = Refresher()
+
+
+def get_refresher() -> Refresher:
+    return _refresher
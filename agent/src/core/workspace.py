@@ -0,0 +1,314 @@
+"""
+Workspace manager (F2.1): provisioning of run workspaces and their cleanup off the hot path.
+Runs live under workspace_base/runs/<name>, flocked for the run's lifetime. Releasing a workspace renames it
+into workspace_base/.trash (constant time, however many files it has); the reaper thread deletes the trash,
+prunes the mirrors' stale worktree entries, moves orphaned runs (lock free: their process died) to the trash
+and enforces WORKSPACE_QUOTA_BYTES.
+On filesystems with reflinks (btrfs, XFS, ...), mirror checkouts are copied from a per-commit template with
+`cp --reflink`, sharing data blocks instead of writing every file, and reuse the template's index so the
+first status doesn't rehash the tree. Hardlinked templates would be corrupted by in-place edits, and
+overlayfs needs mount privileges, so other filesystems get a plain worktree checkout.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from ..config import get_settings
+from ..services.dep_cache import _dir_size
+from ..services.git.clone import _run_git, git_dir, remove_worktree
+from ..services.git.mirror import MIRRORS_DIRNAME, lock_path, mirror_checkout, mirror_ref
+from ..utils.deadline import remaining_timeout
+from ..utils.filelock import file_lock
+
+logger = logging.getLogger(__name__)
+
+RUNS_DIRNAME = "runs"
+TRASH_DIRNAME = ".trash"
+TEMPLATES_DIRNAME = "templates"
+_REFLINK_FLAG = "--reflink=always"
+_ORPHAN_GRACE_SECONDS = 60.0
+_SPEC_SUFFIX = ".spec"  # speculative candidates' worktrees, owned by the run of the same name
+
+_reflink_ok: bool | None = None
+_probe_lock = threading.Lock()
+
+
+def _base() -> Path:
+    return Path(get_settings().workspace_base)
+
+
+def run_path(name: str) -> Path:
+    """Workspace location for a run: <workspace_base>/runs/<name>."""
+    runs = _base() / RUNS_DIRNAME
+    runs.mkdir(parents=True, exist_ok=True)
+    return runs / name
+
+
+def _run_lock(path: Path) -> Path:
+    return path.with_name(path.name + ".lock")
+
+
+def release_workspace(path: Path) -> None:
+    """Move path into the trash for the reaper to delete (deletes it in place if the rename fails)."""
+    if not path.exists():
+        return
+    trash = _base() / TRASH_DIRNAME
+    trash.mkdir(parents=True, exist_ok=True)
+    try:
+        os.rename(path, trash / f"{path.name}-{uuid.uuid4().hex[:6]}")
+    except OSError as e:
+        logger.warning("Moving workspace %s to trash failed, deleting in place: %s", path, e)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def workspace(path: Path) -> Iterator[Path]:
+    """Hold path for a run (the reaper leaves it alone) and release it afterwards."""
+    lock = _run_lock(path)
+    with file_lock(lock):
+        try:
+            yield path
+        finally:
+            release_workspace(path)
+            lock.unlink(missing_ok=True)
+
+
+def _reflink_supported() -> bool:
+    """Whether cp can reflink within workspace_base (probed once per process)."""
+    global _reflink_ok
+    with _probe_lock:
+        if _reflink_ok is None:
+            root = _base() / TEMPLATES_DIRNAME
+            root.mkdir(parents=True, exist_ok=True)
+            src = root / f".probe-{os.getpid()}"
+            dst = src.with_suffix(".copy")
+            try:
+                src.write_bytes(b"reflink probe")
+                r = subprocess.run(["cp", _REFLINK_FLAG, str(src), str(dst)], capture_output=True, timeout=30)
+                _reflink_ok = r.returncode == 0
+            except (OSError, subprocess.SubprocessError):
+                _reflink_ok = False
+            finally:
+                src.unlink(missing_ok=True)
+                dst.unlink(missing_ok=True)
+            logger.info("Reflink workspace copies %s under %s", "enabled" if _reflink_ok else "unavailable", root)
+        return _reflink_ok
+
+
+def templates_enabled() -> bool:
+    mode = get_settings().workspace_provisioning
+    if mode == "worktree":
+        return False
+    return mode == "reflink" or _reflink_supported()
+
+
+def _template_path(mirror: Path, commit: str) -> Path:
+    """<workspace_base>/templates/<provider>/<owner>__<name>/<commit>"""
+    return _base() / TEMPLATES_DIRNAME / mirror.parent.name / mirror.name.removesuffix(".git") / commit
+
+
+def _ensure_template(mirror: Path, commit: str) -> Path:
+    """Checked-out worktree of commit to copy workspaces from; built once across processes."""
+    template = _template_path(mirror, commit)
+    with file_lock(_run_lock(template)):
+        if git_dir(template) is None:
+            shutil.rmtree(template, ignore_errors=True)  # partial build from a crashed process
+            template.parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(lock_path(mirror)):
+                # Copies get new inodes and ctimes; compare mtime + size only so the copied index stays valid.
+                _run_git(mirror, "config", "core.checkStat", "minimal")
+                _run_git(mirror, "config", "core.trustctime", "false")
+                r = _run_git(mirror, "worktree", "add", "--detach", str(template), commit)
+            if r.returncode != 0:
+                raise RuntimeError(f"Git worktree add (template) failed: {r.stderr or r.stdout}")
+            logger.info("Built workspace template %s", template)
+    os.utime(template)  # last use, for eviction
+    return template
+
+
+def _copy_from_template(mirror: Path, path: Path, branch: str | None) -> None:
+    r = _run_git(mirror, "rev-parse", "--verify", f"{mirror_ref(branch)}^{{commit}}")
+    if r.returncode != 0:
+        raise RuntimeError(f"Unknown ref {mirror_ref(branch)}: {r.stderr or r.stdout}")
+    commit = r.stdout.strip()
+    template = _ensure_template(mirror, commit)
+    with file_lock(lock_path(mirror)):
+        r = _run_git(mirror, "worktree", "add", "--no-checkout", "--detach", str(path), commit)
+    if r.returncode != 0:
+        raise RuntimeError(f"Git worktree add failed: {r.stderr or r.stdout}")
+    entries = [str(p) for p in template.iterdir() if p.name != ".git"]
+    if entries:
+        r = subprocess.run(
+            ["cp", "-a", _REFLINK_FLAG, *entries, str(path)],
+            capture_output=True, text=True, timeout=remaining_timeout(600),
+        )
+        if r.returncode != 0:
+            raise RuntimeError(f"Reflink copy failed: {r.stderr}")
+    source, target = git_dir(template), git_dir(path)
+    if source is None or target is None:
+        raise RuntimeError("Template or workspace git dir not found")
+    shutil.copyfile(source / "index", target / "index")
+
+
+def provision_workspace(mirror: Path, path: Path, branch: str | None) -> None:
+    """Detached checkout of origin/<branch> at path: reflink copy of the commit's template, else mirror_checkout."""
+    if templates_enabled():
+        try:
+            _copy_from_template(mirror, path, branch)
+            return
+        except (RuntimeError, OSError, subprocess.SubprocessError) as e:
+            logger.warning("Template copy for %s failed, checking out instead: %s", path.name, e)
+            remove_worktree(mirror, path)
+    mirror_checkout(mirror, path, branch)
+
+
+class WorkspaceReaper:
+    """Background deletion of released, orphaned and evicted workspaces; tracks usage against the quota."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._usage: int | None = None
+        self._last: dict[str, Any] = {}
+
+    def over_quota(self) -> bool:
+        quota = get_settings().workspace_quota_bytes
+        return bool(quota and self._usage is not None and self._usage > quota)
+
+    def stats(self) -> dict[str, Any]:
+        trash = _base() / TRASH_DIRNAME
+        return {
+            "trash_entries": sum(1 for _ in trash.iterdir()) if trash.is_dir() else 0,
+            "usage_bytes": self._usage,
+            "quota_bytes": get_settings().workspace_quota_bytes or None,
+            "last_reap": self._last,
+        }
+
+    def _move_orphans(self) -> int:
+        runs = _base() / RUNS_DIRNAME
+        if not runs.is_dir():
+            return 0
+        moved = 0
+        now = time.time()
+        for path in runs.iterdir():
+            if not path.is_dir():
+                continue
+            try:
+                if now - path.stat().st_mtime < _ORPHAN_GRACE_SECONDS:
+                    continue
+            except OSError:
+                continue
+            owner = path.with_name(path.name.removesuffix(_SPEC_SUFFIX))
+            with file_lock(_run_lock(owner), blocking=False) as free:
+                if not free or not path.exists():
+                    continue
+                logger.warning("Reaping orphaned workspace %s", path.name)
+                release_workspace(path)
+            if not owner.exists():
+                _run_lock(owner).unlink(missing_ok=True)
+            moved += 1
+        return moved
+
+    def _evict_templates(self, all_idle: bool) -> int:
+        """Trash templates idle for longer than a task can run: all of them, or all but each repo's newest."""
+        root = _base() / TEMPLATES_DIRNAME
+        if not root.is_dir():
+            return 0
+        grace = get_settings().task_timeout_seconds
+        now = time.time()
+        evicted = 0
+        for repo in (r for provider in root.iterdir() if provider.is_dir() for r in provider.iterdir()):
+            if not repo.is_dir():
+                continue
+            templates = sorted((t for t in repo.iterdir() if t.is_dir()), key=lambda t: t.stat().st_mtime, reverse=True)
+            for template in templates if all_idle else templates[1:]:
+                if now - template.stat().st_mtime < grace:
+                    continue
+                with file_lock(_run_lock(template), blocking=False) as free:
+                    if not free:
+                        continue
+                    release_workspace(template)
+                _run_lock(template).unlink(missing_ok=True)
+                evicted += 1
+        return evicted
+
+    def _empty_trash(self) -> int:
+        trash = _base() / TRASH_DIRNAME
+        if not trash.is_dir():
+            return 0
+        deleted = 0
+        for path in trash.iterdir():
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            deleted += 1
+        return deleted
+
+    def _prune_mirrors(self) -> None:
+        """Drop worktree entries whose directories were trashed (frees their branches for new worktrees)."""
+        for mirror in (_base() / MIRRORS_DIRNAME).glob("*/*.git"):
+            with file_lock(lock_path(mirror)):
+                _run_git(mirror, "worktree", "prune")
+
+    def _measure(self) -> int:
+        base = _base()
+        return sum(_dir_size(base / d) for d in (RUNS_DIRNAME, TEMPLATES_DIRNAME, TRASH_DIRNAME) if (base / d).is_dir())
+
+    def reap_once(self) -> dict[str, Any]:
+        with self._lock:
+            started = time.monotonic()
+            orphans = self._move_orphans()
+            evicted = self._evict_templates(all_idle=False)
+            deleted = self._empty_trash()
+            quota = get_settings().workspace_quota_bytes
+            if quota:
+                self._usage = self._measure()
+                if self._usage > quota:
+                    evicted += self._evict_templates(all_idle=True)
+                    deleted += self._empty_trash()
+                    self._usage = self._measure()
+                    if self._usage > quota:
+                        logger.warning("Workspaces use %.0f MB, over the %.0f MB quota", self._usage / 1e6, quota / 1e6)
+            if deleted:
+                self._prune_mirrors()
+            self._last = {
+                "orphans": orphans,
+                "templates_evicted": evicted,
+                "deleted": deleted,
+                "seconds": round(time.monotonic() - started, 3),
+                "at": time.time(),
+            }
+            return self._last
+
+    def _loop(self, stop: threading.Event) -> None:
+        interval = get_settings().workspace_reap_interval_seconds
+        while not stop.is_set():
+            try:
+                self.reap_once()
+            except Exception:
+                logger.exception("Workspace reaper iteration failed")
+            stop.wait(interval)
+
+    def start(self, stop: threading.Event) -> threading.Thread:
+        """Start the reaper thread (once per process; later calls return the running thread)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, args=(stop,), name="workspace-reaper", daemon=True)
+                self._thread.start()
+            return self._thread
+
+
+_reaper = WorkspaceReaper()
+
+
+def get_workspace_reaper() -> WorkspaceReaper:
+    return _reaper
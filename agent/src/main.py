@@ -1,19 +1,48 @@
-"""FastAPI application entry. Run: uvicorn src.main:app --reload (from agent/)."""
+"""
+FastAPI application entry. Run: uvicorn src.main:app --reload (from agent/).
+With API_RUN_WORKERS=true (default) pipelines run in this process; otherwise run `python -m src.worker` separately.
+"""
+
+import threading
+from contextlib import asynccontextmanager
 
 import uvicorn
 
 from .api.routes import api_router
 from .config import get_settings
+from .core.warmup import get_refresher
+from .core.workspace import get_workspace_reaper
 from .utils.logging import configure_logging
+from .worker import start_workers
 from fastapi import FastAPI
 
 settings = get_settings()
-configure_logging(level=settings.log_level, debug=settings.debug)
+configure_logging(
+    level=settings.log_level, debug=settings.debug,
+    log_format=settings.log_format, queue_size=settings.log_queue_size,
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    stop = threading.Event()
+    if settings.api_run_workers or settings.task_queue_backend == "memory":
+        concurrency = settings.async_worker_concurrency if settings.worker_mode == "async" else settings.worker_concurrency
+        start_workers(concurrency, stop)
+    get_refresher().start(stop)
+    # Also without local workers: admission needs current quota usage.
+    get_workspace_reaper().start(stop)
+    try:
+        yield
+    finally:
+        stop.set()
+
 
 app = FastAPI(
     title=settings.app_name,
     version="0.1.0",
     description="Autonomous AI Development Agent — Jira/Git ticket to PR",
+    lifespan=lifespan,
 )
 
 app.include_router(api_router)
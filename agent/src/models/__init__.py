@@ -1,7 +1,7 @@
 """Domain and API models."""
 
 from .task import TaskContext, GitProvider, WebhookTaskPayload
-from .events import PRCommentPayload
+from .events import PRCommentPayload, PipelineEvent, PushEvent, TaskStatus
 from .plan import ImplementationPlan, PlanStep
 
 __all__ = [
@@ -9,6 +9,9 @@ __all__ = [
     "GitProvider",
     "WebhookTaskPayload",
     "PRCommentPayload",
+    "PipelineEvent",
+    "PushEvent",
+    "TaskStatus",
     "ImplementationPlan",
     "PlanStep",
 ]
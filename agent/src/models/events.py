@@ -1,4 +1,4 @@
-"""Event models for webhooks (e.g. PR comments)."""
+"""Event models for webhooks (PR comments, pushes) and pipeline progress (task status API)."""
 
 from pydantic import BaseModel, Field
 
@@ -20,3 +20,53 @@ class PRCommentPayload(BaseModel):
     file_path: str | None = None
     line_number: int | None = None
     raw: dict = Field(default_factory=dict)
+
+
+class PushEvent(BaseModel):
+    """Parsed push webhook (F2: keeps mirrors and indexes warm)."""
+
+    provider: str = Field(..., description="github | gitlab")
+    repo_owner: str = ""
+    repo_name: str = ""
+    repo_full_name: str = ""
+    branch: str = Field(..., description="Pushed branch (refs/heads/ stripped)")
+    default_branch: str = ""
+    after: str = Field(default="", description="New head commit SHA")
+
+
+class PipelineEvent(BaseModel):
+    """Progress event published by run_pipeline (stage transitions, attempts, terminal state)."""
+
+    task_id: str
+    seq: int = Field(..., description="Per-task sequence number (monotonic)")
+    type: str = Field(..., description="state | stage_started | stage_finished | stage_failed | attempt")
+    stage: str | None = None
+    state: str | None = None
+    attempt: int | None = None
+    duration_seconds: float | None = None
+    detail: dict = Field(default_factory=dict)
+    timestamp: float
+
+
+class TaskStatus(BaseModel):
+    """Current view of a task for GET /api/tasks/{task_id}."""
+
+    task_id: str
+    ticket_id: str
+    repo_full_name: str
+    state: str = Field(
+        default="queued",
+        description="queued | running | delivering | succeeded | no_changes | validation_failed | skipped | failed | cancelled | timed_out",
+    )
+    stage: str | None = Field(default=None, description="Stage currently running (clone, map, plan, ...)")
+    attempt: int = Field(default=0, description="Validation attempt number")
+    stage_durations: dict[str, float] = Field(default_factory=dict, description="Seconds spent per stage")
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    pr_url: str | None = None
+    error: str | None = None
+    created_at: float
+    updated_at: float
+    started_at: float | None = Field(default=None, description="When a worker started the run (queue wait = started_at - created_at)")
+    finished_at: float | None = None
@@ -1,10 +1,13 @@
 """Task and webhook payload models (F1.2, F1.3)."""
 
+import uuid
 from enum import Enum
 from typing import Any
 
 from pydantic import BaseModel, Field
 
+from .events import PRCommentPayload
+
 
 class GitProvider(str, Enum):
     GITHUB = "github"
@@ -14,6 +17,10 @@ class GitProvider(str, Enum):
 class TaskContext(BaseModel):
     """Structured task context extracted from webhook (F1.3)."""
 
+    task_id: str = Field(
+        default_factory=lambda: str(uuid.uuid4())[:8],
+        description="ID of this run (GET /api/tasks/{task_id})",
+    )
     ticket_id: str = Field(..., description="Ticket/issue ID")
     title: str = Field(default="", description="Ticket title")
     description: str = Field(default="", description="Ticket body/description")
@@ -27,6 +34,11 @@ class TaskContext(BaseModel):
     repo_full_name: str = Field(..., description="e.g. owner/repo or group/repo")
     default_branch: str = Field(default="main")
     raw_payload: dict[str, Any] = Field(default_factory=dict, description="Original payload for traceability")
+    lease_token: str | None = Field(default=None, description="Idempotency lease owner token (F1.6)")
+    pr_comments: list[PRCommentPayload] = Field(
+        default_factory=list, description="Review comments to address (PR-comment runs, F7); empty for tickets"
+    )
+    profile: bool = Field(default=False, description="Profile this run (X-Agent-Profile webhook header)")
 
 
 class WebhookTaskPayload(BaseModel):
@@ -1,20 +1,24 @@
 """Domain services: webhook parsing, git, codebase map, planner, implementer, validator."""
 
-from .webhook_parser import parse_task_payload, parse_github_issue, parse_gitlab_issue
+from .webhook_parser import parse_task_payload, parse_github_issue, parse_gitlab_issue, parse_pr_comment_payload
 from .codebase_map import build_map
-from .planner import create_plan
-from .implementer import implement
-from .llm import chat
+from .planner import create_plan, create_plan_async
+from .implementer import implement, implement_async
+from .llm import chat, chat_async
 from .validator import run_validation, ValidationResult
 
 __all__ = [
     "parse_task_payload",
     "parse_github_issue",
     "parse_gitlab_issue",
+    "parse_pr_comment_payload",
     "build_map",
     "create_plan",
+    "create_plan_async",
     "implement",
+    "implement_async",
     "chat",
+    "chat_async",
     "run_validation",
     "ValidationResult",
 ]
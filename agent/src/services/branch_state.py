@@ -0,0 +1,78 @@
+"""
+Per-branch pipeline state (F7): repo map, plan and ticket context saved when a PR is delivered,
+so PR-comment runs reuse them instead of re-mapping and re-planning.
+Stored as JSON under workspace_base/branch-state/<provider>/<owner>__<name>/<branch>.json.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from ..config import get_settings
+from ..models.plan import ImplementationPlan
+from ..models.task import TaskContext
+
+logger = logging.getLogger(__name__)
+
+STATE_DIRNAME = "branch-state"
+
+
+class BranchState(NamedTuple):
+    ticket_id: str
+    title: str
+    description: str
+    repo_map: str
+    plan: ImplementationPlan
+    updated_at: float
+
+
+def _state_path(task: TaskContext, branch: str) -> Path:
+    owner = task.repo_owner.replace("/", "__")
+    safe_branch = re.sub(r"[^A-Za-z0-9._-]+", "_", branch)
+    return (
+        Path(get_settings().workspace_base) / STATE_DIRNAME / task.provider.value
+        / f"{owner}__{task.repo_name}" / f"{safe_branch}.json"
+    )
+
+
+def save_branch_state(task: TaskContext, branch: str, repo_map: str, plan: ImplementationPlan | None) -> None:
+    """Persist map + plan for branch (atomic replace). Failures are logged, never raised."""
+    path = _state_path(task, branch)
+    data = {
+        "ticket_id": task.ticket_id,
+        "title": task.title,
+        "description": task.description,
+        "repo_map": repo_map,
+        "plan": (plan or ImplementationPlan()).model_dump(),
+        "updated_at": time.time(),
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not save branch state %s: %s", path, e)
+
+
+def load_branch_state(task: TaskContext, branch: str) -> BranchState | None:
+    path = _state_path(task, branch)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return BranchState(
+            ticket_id=data.get("ticket_id", ""),
+            title=data.get("title", ""),
+            description=data.get("description", ""),
+            repo_map=data.get("repo_map", ""),
+            plan=ImplementationPlan.model_validate(data.get("plan") or {}),
+            updated_at=float(data.get("updated_at", 0)),
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable branch state %s: %s", path, e)
+        return None
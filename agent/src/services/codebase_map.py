@@ -7,6 +7,7 @@ Lightweight: no aider dependency; regex-based extraction for common languages.
 import logging
 import re
 from pathlib import Path
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
@@ -61,16 +62,19 @@ def _extract_symbols(content: str, ext: str) -> list[str]:
     return symbols
 
 
-def build_map(work_dir: Path, max_file_lines: int = 2000, max_map_chars: int = 30000) -> str:
-    """
-    Build a semantic map of the codebase under work_dir.
-    Returns a single string: file tree + per-file symbols (classes, top-level functions).
-    Truncates per-file content and total map size to stay within context limits.
-    """
-    work_dir = Path(work_dir)
-    if not work_dir.is_dir():
-        return ""
+def is_mapped_path(rel: Path) -> bool:
+    """Whether a repo-relative path appears in the map (not under a skipped dir; source or doc/config file)."""
+    if any(_should_skip_dir(part) for part in rel.parts[:-1]) or _should_skip_dir(rel.name):
+        return False
+    return rel.suffix in SOURCE_EXT or rel.suffix in (".md", ".json", ".yaml", ".yml", ".toml")
 
+
+def render_map(
+    tree_parts: list[str],
+    symbols_for: Callable[[str], list[str]],
+    max_map_chars: int = 30000,
+) -> str:
+    """Render file tree + per-file symbols; symbols_for(rel_path) is called for source files only."""
     lines: list[str] = []
     total_chars = 0
 
@@ -82,21 +86,6 @@ def build_map(work_dir: Path, max_file_lines: int = 2000, max_map_chars: int = 3
         total_chars += len(s)
         return True
 
-    # File tree (relative paths only)
-    tree_parts: list[str] = []
-    for p in sorted(work_dir.rglob("*")):
-        if not p.is_file():
-            continue
-        try:
-            rel = p.relative_to(work_dir)
-        except ValueError:
-            continue
-        parts = rel.parts
-        if any(_should_skip_dir(parts[i]) for i in range(len(parts))):
-            continue
-        if p.suffix not in SOURCE_EXT and p.suffix not in (".md", ".json", ".yaml", ".yml", ".toml"):
-            continue
-        tree_parts.append(str(rel))
     add("## Repository structure\n")
     for f in sorted(tree_parts)[:500]:
         if not add(f + "\n"):
@@ -108,15 +97,9 @@ def build_map(work_dir: Path, max_file_lines: int = 2000, max_map_chars: int = 3
     for rel_str in sorted(tree_parts):
         if total_chars >= max_map_chars:
             break
-        fpath = work_dir / rel_str
-        if fpath.suffix not in SOURCE_EXT:
+        if Path(rel_str).suffix not in SOURCE_EXT:
             continue
-        try:
-            raw = fpath.read_text(encoding="utf-8", errors="replace")
-        except Exception as e:
-            logger.debug("Skip reading %s: %s", rel_str, e)
-            continue
-        symbols = _extract_symbols(raw, fpath.suffix)
+        symbols = symbols_for(rel_str)
         if not symbols:
             continue
         block = f"### {rel_str}\n  " + ", ".join(symbols) + "\n"
@@ -124,3 +107,37 @@ def build_map(work_dir: Path, max_file_lines: int = 2000, max_map_chars: int = 3
             break
 
     return "".join(lines)
+
+
+def build_map(work_dir: Path, max_file_lines: int = 2000, max_map_chars: int = 30000) -> str:
+    """
+    Build a semantic map of the codebase under work_dir.
+    Returns a single string: file tree + per-file symbols (classes, top-level functions).
+    Truncates per-file content and total map size to stay within context limits.
+    """
+    work_dir = Path(work_dir)
+    if not work_dir.is_dir():
+        return ""
+
+    # File tree (relative paths only)
+    tree_parts: list[str] = []
+    for p in sorted(work_dir.rglob("*")):
+        if not p.is_file():
+            continue
+        try:
+            rel = p.relative_to(work_dir)
+        except ValueError:
+            continue
+        if is_mapped_path(rel):
+            tree_parts.append(str(rel))
+
+    def symbols_for(rel_str: str) -> list[str]:
+        fpath = work_dir / rel_str
+        try:
+            raw = fpath.read_text(encoding="utf-8", errors="replace")
+        except Exception as e:
+            logger.debug("Skip reading %s: %s", rel_str, e)
+            return []
+        return _extract_symbols(raw, fpath.suffix)
+
+    return render_map(tree_parts, symbols_for, max_map_chars)
@@ -0,0 +1,408 @@
+"""
+Dependency environment cache for validation (F5.1, F5.2).
+Builds a virtualenv or node_modules once per lockfile hash under workspace_base/.dep-cache,
+attaches it to a workspace by symlink, and evicts least-recently-used entries over a disk budget.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tomllib
+from pathlib import Path
+from typing import NamedTuple
+
+from ..config import get_settings
+from ..utils.deadline import remaining_timeout
+from ..utils.filelock import file_lock
+from ..utils.process import run_bounded
+from ..utils.sandbox import Sandbox
+from .git.clone import _run_git, git_common_dir
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIRNAME = ".dep-cache"
+_COMPLETE = ".complete"
+_FAILED = ".failed"
+_FAILED_RETRY_SECONDS = 3600
+
+# Optional-dependency groups installed alongside [project].dependencies (test tooling lives there).
+_PY_EXTRA_GROUPS = ("dev", "test", "tests", "testing")
+
+_NODE_LOCKFILES = {
+    "package-lock.json": ["npm", "ci", "--no-audit", "--no-fund"],
+    "npm-shrinkwrap.json": ["npm", "ci", "--no-audit", "--no-fund"],
+    "yarn.lock": ["yarn", "install", "--frozen-lockfile"],
+    "pnpm-lock.yaml": ["pnpm", "install", "--frozen-lockfile"],
+}
+
+
+# pip options that include another file, resolved relative to the including file.
+_REQ_INCLUDE = re.compile(r"^(?:-r|-c|--requirement|--constraint)(?:\s*=\s*|\s+)(\S+)")
+# The repo itself (".", ".[extras]", "-e ."): its pyproject.toml dependencies are installed instead.
+_SELF_INSTALL = re.compile(r"^(?:(?:-e|--editable)(?:\s*=\s*|\s+))?\.(?:/)?(?:\[[^\]]*\])?$")
+_LOCAL_PATH = re.compile(r"^(?:(?:-e|--editable)(?:\s*=\s*|\s+))?(?:\.|/|file:)")
+
+
+class DepSpec(NamedTuple):
+    kind: str  # "python" | "node"
+    key: str
+    inputs: list[Path]
+    root: Path
+
+
+def _cache_root() -> Path:
+    return Path(get_settings().workspace_base) / CACHE_DIRNAME
+
+
+def _hash_inputs(kind: str, root: Path, files: list[Path], salt: str = "") -> str:
+    h = hashlib.sha256(f"{kind}\0{salt}\0".encode())
+    for f in sorted(files, key=lambda p: p.relative_to(root).as_posix()):
+        h.update(f.relative_to(root).as_posix().encode() + b"\0")
+        h.update(f.read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()[:24]
+
+
+def is_manifest(name: str) -> bool:
+    """Root-level file that feeds detect_specs (its content determines the cache key)."""
+    return (
+        (name.startswith("requirements") and name.endswith(".txt"))
+        or name in ("pyproject.toml", "poetry.lock", "package.json")
+        or name in _NODE_LOCKFILES
+    )
+
+
+def _requirement_lines(path: Path) -> list[str]:
+    lines = []
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        line = line.split(" #", 1)[0].strip()
+        if line and not line.startswith("#"):
+            lines.append(line)
+    return lines
+
+
+def requirement_includes(path: Path) -> list[str]:
+    """Files path includes with -r / -c, as written (relative to path's directory)."""
+    return [m.group(1) for m in map(_REQ_INCLUDE.match, _requirement_lines(path)) if m]
+
+
+def _requirement_files(work_dir: Path, roots: list[Path], has_pyproject: bool) -> tuple[list[Path], list[str]]:
+    """
+    roots plus every file they include (recursively), and the lines a cache entry cannot install:
+    includes that are missing or outside work_dir, and local-path / editable installs other than the repo itself.
+    """
+    base = work_dir.resolve()
+    files: list[Path] = []
+    problems: list[str] = []
+    pending = list(roots)
+    while pending:
+        path = pending.pop(0)
+        if path in files:
+            continue
+        files.append(path)
+        for line in _requirement_lines(path):
+            include = _REQ_INCLUDE.match(line)
+            if include:
+                target = (path.parent / include.group(1)).resolve()
+                if not target.is_relative_to(base) or not target.is_file():
+                    problems.append(f"{path.name}: {line}")
+                else:
+                    pending.append(work_dir / target.relative_to(base))
+            elif _SELF_INSTALL.match(line):
+                if not has_pyproject:
+                    problems.append(f"{path.name}: {line}")
+            elif _LOCAL_PATH.match(line):
+                problems.append(f"{path.name}: {line}")
+    return files, problems
+
+
+def detect_specs(work_dir: Path) -> list[DepSpec]:
+    """Find lockfiles / manifests at the repo root and derive one cache key per ecosystem."""
+    work_dir = Path(work_dir)
+    specs: list[DepSpec] = []
+
+    py_inputs, problems = _requirement_files(
+        work_dir, sorted(work_dir.glob("requirements*.txt")), (work_dir / "pyproject.toml").is_file()
+    )
+    for name in ("pyproject.toml", "poetry.lock"):
+        if (work_dir / name).is_file():
+            py_inputs.append(work_dir / name)
+    if problems:
+        # Installing a subset would validate against the wrong environment; use the host's tools instead.
+        logger.info("Not caching the Python env (unresolvable requirements: %s)", "; ".join(problems[:3]))
+    elif _is_poetry_project(work_dir) and not shutil.which("poetry"):
+        # Its dependencies are only in [tool.poetry] / poetry.lock; [project].dependencies would be an empty env.
+        logger.info("Not caching the Python env (Poetry project, poetry CLI not installed)")
+    elif py_inputs:
+        salt = f"py{sys.version_info.major}.{sys.version_info.minor}|" + ",".join(get_settings().dep_cache_python_extras)
+        specs.append(DepSpec("python", _hash_inputs("python", work_dir, py_inputs, salt), py_inputs, work_dir))
+
+    pkg = work_dir / "package.json"
+    if pkg.is_file():
+        locks = [work_dir / n for n in _NODE_LOCKFILES if (work_dir / n).is_file()]
+        if locks:
+            inputs = [pkg, locks[0]]
+            specs.append(DepSpec("node", _hash_inputs("node", work_dir, inputs), inputs, work_dir))
+        else:
+            logger.debug("package.json without lockfile; not caching node_modules")
+    return specs
+
+
+def _is_poetry_project(work_dir: Path) -> bool:
+    """poetry.lock at the root, or a pyproject.toml declaring [tool.poetry] dependencies."""
+    if (work_dir / "poetry.lock").is_file():
+        return True
+    try:
+        data = tomllib.loads((work_dir / "pyproject.toml").read_text(encoding="utf-8"))
+    except (OSError, tomllib.TOMLDecodeError):
+        return False
+    poetry = (data.get("tool") or {}).get("poetry") or {}
+    return bool(poetry.get("dependencies") or poetry.get("group"))
+
+
+def _pyproject_requirements(pyproject: Path) -> list[str]:
+    try:
+        data = tomllib.loads(pyproject.read_text(encoding="utf-8"))
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        logger.debug("Could not parse %s: %s", pyproject, e)
+        return []
+    project = data.get("project") or {}
+    reqs = list(project.get("dependencies") or [])
+    optional = project.get("optional-dependencies") or {}
+    for group in _PY_EXTRA_GROUPS:
+        reqs.extend(optional.get(group) or [])
+    return reqs
+
+
+def _run_install(cmd: list[str], cwd: Path, entry: Path, env_extra: dict[str, str] | None = None) -> bool:
+    settings = get_settings()
+    try:
+        with Sandbox.from_settings() as sandbox:
+            timeout = remaining_timeout(settings.dep_install_timeout_seconds)
+            env = sandbox.env(env_extra)
+            r = run_bounded(
+                sandbox.wrap(cmd, env, timeout),
+                cwd,
+                timeout=timeout,
+                env=env,
+                max_output_bytes=settings.validation_output_max_bytes,
+                log_path=entry / "install.log",
+            )
+    except FileNotFoundError:
+        logger.info("Dependency install skipped, command not found: %s", cmd[0])
+        return False
+    if r.returncode != 0:
+        logger.warning("Dependency install failed (%s): %s", " ".join(cmd), (r.stderr or r.stdout)[-2000:])
+        return False
+    return True
+
+
+def _venv_env(venv: Path) -> dict[str, str]:
+    return {"VIRTUAL_ENV": str(venv), "PATH": f"{venv / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"}
+
+
+def _build_python(spec: DepSpec, entry: Path) -> bool:
+    venv = entry / "venv"
+    if not _run_install([sys.executable, "-m", "venv", str(venv)], entry, entry):
+        return False
+    pip = [str(venv / "bin" / "python"), "-m", "pip", "install", "--disable-pip-version-check", "-q"]
+    env = _venv_env(venv)
+    requirements = [f for f in spec.inputs if f.name not in ("pyproject.toml", "poetry.lock") or f.parent != spec.root]
+    reqdir = entry / "requirements"
+    for f in requirements:
+        # Copy with the repo layout so -r / -c includes resolve. An install of the repo itself would point into
+        # a workspace that is about to be deleted; its pyproject.toml dependencies are installed below instead.
+        kept = [ln for ln in _requirement_lines(f) if not _SELF_INSTALL.match(ln)]
+        dest = reqdir / f.relative_to(spec.root)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text("\n".join(kept) + "\n", encoding="utf-8")
+    for f in requirements:
+        if f.parent == spec.root and f.name.startswith("requirements"):
+            if not _run_install(pip + ["-r", f.name], reqdir, entry, env):
+                return False
+    names = {f.name for f in spec.inputs if f.parent == spec.root}
+    reqs: list[str] = []
+    if _is_poetry_project(spec.root):
+        # detect_specs only caches Poetry projects when the poetry CLI is installed.
+        exported = entry / "poetry-requirements.txt"
+        export = ["poetry", "export", "--with", "dev", "-f", "requirements.txt", "--without-hashes", "-o", str(exported)]
+        if not _run_install(export, spec.root, entry):
+            return False
+        if not _run_install(pip + ["-r", str(exported)], entry, entry, env):
+            return False
+    elif "pyproject.toml" in names:
+        reqs.extend(_pyproject_requirements(spec.root / "pyproject.toml"))
+    reqs.extend(get_settings().dep_cache_python_extras)
+    if reqs and not _run_install(pip + reqs, entry, entry, env):
+        return False
+    return True
+
+
+def _build_node(spec: DepSpec, entry: Path) -> bool:
+    pkg, lock = spec.inputs
+    shutil.copy2(pkg, entry / pkg.name)
+    shutil.copy2(lock, entry / lock.name)
+    return _run_install(_NODE_LOCKFILES[lock.name], entry, entry)
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def ensure_environment(spec: DepSpec) -> Path | None:
+    """Return the cache entry for spec, building it (once, across processes) if missing."""
+    root = _cache_root()
+    entry = root / f"{spec.kind}-{spec.key}"
+    marker = entry / _COMPLETE
+    if marker.is_file():
+        os.utime(marker)
+        return entry
+    with file_lock(root / f"{entry.name}.lock"):
+        if marker.is_file():
+            os.utime(marker)
+            return entry
+        failed = entry / _FAILED
+        if failed.is_file() and time.time() - failed.stat().st_mtime < _FAILED_RETRY_SECONDS:
+            return None
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        entry.mkdir(parents=True)
+        started = time.monotonic()
+        builder = _build_python if spec.kind == "python" else _build_node
+        if not builder(spec, entry):
+            shutil.rmtree(entry, ignore_errors=True)
+            entry.mkdir(parents=True, exist_ok=True)
+            failed.touch()
+            return None
+        size = _dir_size(entry)
+        marker.write_text(json.dumps({"size": size, "built_at": time.time()}), encoding="utf-8")
+        logger.info(
+            "Built %s dependency env %s (%.1f MB) in %.1fs",
+            spec.kind, spec.key, size / 1e6, time.monotonic() - started,
+        )
+    evict(keep={entry.name})
+    return entry
+
+
+def evict(keep: set[str] | None = None) -> None:
+    """Delete least-recently-used entries until the cache fits dep_cache_max_bytes."""
+    settings = get_settings()
+    root = _cache_root()
+    if not root.is_dir():
+        return
+    grace = settings.task_timeout_seconds  # an entry used this recently may still be attached to a running task
+    entries: list[tuple[float, int, Path]] = []
+    for entry in root.iterdir():
+        marker = entry / _COMPLETE
+        if not entry.is_dir() or not marker.is_file():
+            continue
+        try:
+            size = int(json.loads(marker.read_text(encoding="utf-8")).get("size", 0))
+        except (OSError, ValueError):
+            size = _dir_size(entry)
+        entries.append((marker.stat().st_mtime, size, entry))
+    total = sum(size for _, size, _ in entries)
+    now = time.time()
+    for last_used, size, entry in sorted(entries):
+        if total <= settings.dep_cache_max_bytes:
+            break
+        if entry.name in (keep or set()) or now - last_used < grace:
+            continue
+        with file_lock(root / f"{entry.name}.lock", blocking=False) as acquired:
+            if not acquired:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        logger.info("Evicted dependency env %s (%.1f MB)", entry.name, size / 1e6)
+
+
+def _exclude_from_git(work_dir: Path, patterns: list[str]) -> None:
+    """Keep attached links out of `git status` / commits via .git/info/exclude."""
+    git_dir = git_common_dir(work_dir)
+    if git_dir is None:
+        return
+    exclude = git_dir / "info" / "exclude"
+    exclude.parent.mkdir(exist_ok=True)
+    existing = exclude.read_text(encoding="utf-8").splitlines() if exclude.is_file() else []
+    missing = [p for p in patterns if p not in existing]
+    if missing:
+        with open(exclude, "a", encoding="utf-8") as fh:
+            fh.write("\n".join(missing) + "\n")
+
+
+def _link(link: Path, target: Path) -> bool:
+    if link.is_symlink():
+        if Path(os.readlink(link)) == target:
+            return True
+        link.unlink()
+    elif link.exists():
+        logger.debug("%s already exists in workspace; not attaching cached env", link.name)
+        return False
+    link.symlink_to(target, target_is_directory=True)
+    return True
+
+
+def prebuild_from_git(repo_dir: Path, rev: str) -> int:
+    """
+    Build the dependency envs rev needs without checking it out (warmup from a bare mirror):
+    root manifests and the requirement files they include are read from git into a scratch dir,
+    which yields the same cache keys as a workspace. Returns the number of envs ready.
+    """
+    repo_dir = Path(repo_dir)
+    r = _run_git(repo_dir, "ls-tree", "--name-only", rev)
+    if r.returncode != 0:
+        return 0
+    names = [n for n in r.stdout.splitlines() if is_manifest(n)]
+    if not names:
+        return 0
+    with tempfile.TemporaryDirectory(prefix="agent-deps-") as tmp:
+        root = Path(tmp)
+        pending = [(n, n.startswith("requirements")) for n in names]
+        while pending:
+            name, is_requirements = pending.pop(0)
+            dest = (root / name).resolve()
+            if dest.exists() or not dest.is_relative_to(root.resolve()):
+                continue
+            # Bytes, not text: the cache key hashes exact file contents.
+            blob = _run_git(repo_dir, "show", f"{rev}:{dest.relative_to(root.resolve()).as_posix()}", text=False)
+            if blob.returncode != 0:
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(blob.stdout)
+            if is_requirements:
+                base = dest.parent.relative_to(root.resolve())
+                pending.extend(((base / include).as_posix(), True) for include in requirement_includes(dest))
+        return sum(ensure_environment(spec) is not None for spec in detect_specs(root))
+
+
+def prepare_dependencies(work_dir: Path) -> dict[str, str]:
+    """
+    Attach cached dependency environments to work_dir (building them on first use).
+    Returns env overrides (PATH, VIRTUAL_ENV) for validation commands; empty if nothing was attached.
+    """
+    work_dir = Path(work_dir)
+    env: dict[str, str] = {}
+    for spec in detect_specs(work_dir):
+        entry = ensure_environment(spec)
+        if entry is None:
+            continue
+        if spec.kind == "python":
+            if _link(work_dir / ".venv", entry / "venv"):
+                _exclude_from_git(work_dir, ["/.venv"])
+                env.update(_venv_env(entry / "venv"))
+        elif _link(work_dir / "node_modules", entry / "node_modules"):
+            _exclude_from_git(work_dir, ["/node_modules"])
+    return env
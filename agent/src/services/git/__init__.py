@@ -1,14 +1,20 @@
 """Git operations: clone, branch, commit, push, PR (F2, F6)."""
 
 from .provider import GitProviderInterface, get_git_provider
-from .clone import clone_repo, create_feature_branch, get_clone_url, commit, push
+from .backend import GitBackend, get_git_backend
+from .clone import clone_repo, create_feature_branch, get_clone_url, commit, has_changes, push, tree_hash, head_tree
 
 __all__ = [
     "GitProviderInterface",
     "get_git_provider",
+    "GitBackend",
+    "get_git_backend",
     "clone_repo",
     "create_feature_branch",
     "get_clone_url",
     "commit",
+    "has_changes",
     "push",
+    "tree_hash",
+    "head_tree",
 ]
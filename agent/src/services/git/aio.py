@@ -0,0 +1,164 @@
+"""
+Async git operations for the asyncio pipeline (F2.1–F2.3, F6.1, F6.2).
+Same behaviour as clone.py / mirror.py, but git runs via asyncio.create_subprocess_exec so a waiting task
+holds no thread. Cancelling the awaiting task kills the git process. With an in-process GitBackend,
+status and commit run on a thread instead (no process to spawn).
+"""
+
+import asyncio
+import logging
+import os
+import subprocess
+from pathlib import Path
+
+from ...config import get_settings
+from ...models.task import TaskContext
+from ...utils.deadline import remaining_timeout
+from ...utils.filelock import async_file_lock
+from ...utils.metrics import GIT_SECONDS, span
+from .backend import get_git_backend
+from .clone import commit, feature_branch_name, has_changes
+from .mirror import (
+    FETCH_REFSPEC,
+    check_not_failed,
+    failed_marker,
+    initial_fetch_failed,
+    lock_path,
+    mirror_ref,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def run_git_async(
+    cwd: Path, *args: str, env: dict[str, str] | None = None, timeout: float = 120
+) -> subprocess.CompletedProcess:
+    """Async _run_git: text output, exit code -1 on timeout. The process is killed if the caller is cancelled."""
+    full_env = {**os.environ, **(env or {}), "GIT_TERMINAL_PROMPT": "0"}
+    timeout = remaining_timeout(timeout)
+    with span("git", GIT_SECONDS, command=args[0]) as sp:
+        proc = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=full_env,
+        )
+        try:
+            out, err = await asyncio.wait_for(proc.communicate(), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if proc.returncode is None:
+                proc.kill()
+                await asyncio.shield(proc.wait())
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            sp.outcome = "error"
+            return subprocess.CompletedProcess(["git", *args], -1, "", f"git {args[0]} timed out after {timeout}s")
+        if proc.returncode != 0:
+            sp.outcome = "error"
+        return subprocess.CompletedProcess(
+            ["git", *args], proc.returncode, out.decode(errors="replace"), err.decode(errors="replace")
+        )
+
+
+async def clone_repo_async(clone_url: str, work_dir: Path, branch: str | None = None) -> None:
+    """Async clone_repo (shallow, single branch)."""
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    if any(work_dir.iterdir()):
+        raise FileExistsError(f"Workspace not empty: {work_dir}")
+    args = ["clone", "--depth=50", "--single-branch"]
+    if branch:
+        args.extend(["--branch", branch])
+    r = await run_git_async(work_dir.parent, *args, clone_url, str(work_dir))
+    if r.returncode != 0:
+        logger.error("Clone failed: %s %s", r.stderr, r.stdout)
+        raise RuntimeError(f"Git clone failed: {r.stderr or r.stdout}")
+
+
+async def create_feature_branch_async(work_dir: Path, task: TaskContext) -> str:
+    """Async create_feature_branch: ai/<ticket>-<slug> from origin/<base> (HEAD if the fetch fails)."""
+    base = task.default_branch or "main"
+    branch_name = feature_branch_name(task)
+    r = await run_git_async(work_dir, "fetch", "origin", base)
+    if r.returncode == 0:
+        r = await run_git_async(work_dir, "checkout", "-B", branch_name, f"origin/{base}")
+    else:
+        logger.debug("Fetch origin/%s failed (%s), creating branch from HEAD", base, r.stderr or r.stdout)
+        r = await run_git_async(work_dir, "checkout", "-B", branch_name)
+    if r.returncode != 0:
+        raise RuntimeError(f"Git checkout failed: {r.stderr or r.stdout}")
+    return branch_name
+
+
+async def has_changes_async(work_dir: Path) -> bool:
+    """Uncommitted changes in the workspace (assumed True if git status fails)."""
+    if get_git_backend().in_process(work_dir):
+        return await asyncio.to_thread(has_changes, work_dir)
+    r = await run_git_async(work_dir, "status", "--porcelain")
+    return r.returncode != 0 or bool(r.stdout.strip())
+
+
+async def commit_async(work_dir: Path, message: str) -> None:
+    """Async commit: stage all changes and commit (F6.1)."""
+    if get_git_backend().in_process(work_dir):
+        return await asyncio.to_thread(commit, work_dir, message)
+    r = await run_git_async(work_dir, "add", "-A")
+    if r.returncode != 0:
+        raise RuntimeError(f"Git add failed: {r.stderr or r.stdout}")
+    r = await run_git_async(work_dir, "commit", "-m", message)
+    if r.returncode != 0:
+        if "nothing to commit" in r.stdout or "nothing to commit" in r.stderr:
+            logger.info("Nothing to commit (working tree clean)")
+            return
+        raise RuntimeError(f"Git commit failed: {r.stderr or r.stdout}")
+
+
+async def push_async(work_dir: Path, branch_name: str) -> None:
+    """Async push of branch to origin (F6.2)."""
+    r = await run_git_async(work_dir, "push", "origin", branch_name)
+    if r.returncode != 0:
+        logger.error("Push failed: %s %s", r.stderr, r.stdout)
+        raise RuntimeError(f"Git push failed: {r.stderr or r.stdout}")
+
+
+async def ensure_mirror_async(clone_url: str, mirror: Path) -> Path:
+    """Async ensure_mirror: create or fetch the bare mirror under the same per-mirror lock."""
+    mirror = Path(mirror)
+    async with async_file_lock(lock_path(mirror)):
+        created = not (mirror / "HEAD").is_file()
+        if created:
+            check_not_failed(mirror)
+            mirror.mkdir(parents=True, exist_ok=True)
+            r = await run_git_async(mirror, "init", "--bare", "--quiet")
+            if r.returncode != 0:
+                raise RuntimeError(f"Git init mirror failed: {r.stderr or r.stdout}")
+            await run_git_async(mirror, "remote", "add", "origin", clone_url)
+            await run_git_async(mirror, "config", "remote.origin.fetch", FETCH_REFSPEC)
+            logger.info("Created mirror %s", mirror)
+        else:
+            await run_git_async(mirror, "remote", "set-url", "origin", clone_url)
+        if created:
+            timeout = get_settings().mirror_initial_fetch_timeout_seconds
+            r = await run_git_async(mirror, "fetch", "--prune", "--quiet", "origin", timeout=timeout)
+            if r.returncode != 0:
+                raise await asyncio.to_thread(initial_fetch_failed, mirror, r.stderr or r.stdout)
+            failed_marker(mirror).unlink(missing_ok=True)
+        else:
+            r = await run_git_async(mirror, "fetch", "--prune", "--quiet", "origin")
+            if r.returncode != 0:
+                raise RuntimeError(f"Git fetch mirror failed: {r.stderr or r.stdout}")
+        r = await run_git_async(mirror, "rev-parse", "--verify", "--quiet", "refs/remotes/origin/HEAD")
+        if r.returncode != 0:
+            await run_git_async(mirror, "remote", "set-head", "origin", "--auto")
+        await run_git_async(mirror, "worktree", "prune")
+    return mirror
+
+
+async def mirror_checkout_async(mirror: Path, path: Path, branch: str | None) -> None:
+    """Async mirror_checkout: detached worktree at origin/<branch>."""
+    async with async_file_lock(lock_path(Path(mirror))):
+        r = await run_git_async(Path(mirror), "worktree", "add", "--detach", str(path), mirror_ref(branch))
+    if r.returncode != 0:
+        raise RuntimeError(f"Git worktree add failed: {r.stderr or r.stdout}")
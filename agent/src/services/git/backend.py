@@ -0,0 +1,258 @@
+"""
+Pluggable backend for local git operations (F2.3, F6.1): status, stage + commit, branch checkout, write-tree.
+The CLI backend spawns `git` per command. The pygit2 backend runs them in-process through libgit2, with
+no fork/exec per call; any libgit2 error falls back to the CLI for that call. Network operations (clone,
+fetch, push) and worktrees always use the CLI.
+libgit2's status / add scale worse than git's on large trees (about 2x slower at 2k files, 3x at 20k), so
+GIT_BACKEND=auto uses pygit2 only for workspaces with fewer than GIT_INPROCESS_MAX_FILES tracked files,
+where process spawn dominates, and the CLI above that.
+"""
+
+import functools
+import logging
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from ...config import get_settings
+from .clone import _run_git, git_dir
+
+logger = logging.getLogger(__name__)
+
+
+class GitBackend(ABC):
+    """Local (no network) git operations on a workspace."""
+
+    name: str = ""
+
+    def in_process(self, work_dir: Path) -> bool:
+        """True when operations on work_dir run in this process (no git subprocess)."""
+        return False
+
+    @abstractmethod
+    def has_changes(self, work_dir: Path) -> bool:
+        """Uncommitted changes, tracked or untracked (not ignored). True if the check fails."""
+
+    @abstractmethod
+    def commit_all(self, work_dir: Path, message: str) -> bool:
+        """Stage all changes (`add -A`) and commit on the current branch. False if there was nothing to commit."""
+
+    @abstractmethod
+    def checkout_branch(self, work_dir: Path, branch: str, start_point: str | None = None) -> None:
+        """`checkout -B branch [start_point]`: create or reset the branch and check it out."""
+
+    @abstractmethod
+    def write_tree(self, work_dir: Path) -> str | None:
+        """Tree hash of the working tree as `add -A && write-tree` would give, leaving the index untouched."""
+
+    @abstractmethod
+    def head_tree(self, work_dir: Path) -> str | None:
+        """Tree hash of HEAD."""
+
+
+class CliGitBackend(GitBackend):
+    name = "cli"
+
+    def has_changes(self, work_dir: Path) -> bool:
+        r = _run_git(Path(work_dir), "status", "--porcelain")
+        return r.returncode != 0 or bool(r.stdout.strip())
+
+    def commit_all(self, work_dir: Path, message: str) -> bool:
+        work_dir = Path(work_dir)
+        r = _run_git(work_dir, "add", "-A")
+        if r.returncode != 0:
+            raise RuntimeError(f"Git add failed: {r.stderr or r.stdout}")
+        r = _run_git(work_dir, "commit", "-m", message)
+        if r.returncode != 0:
+            if "nothing to commit" in (r.stdout or "") or "nothing to commit" in (r.stderr or ""):
+                return False
+            raise RuntimeError(f"Git commit failed: {r.stderr or r.stdout}")
+        return True
+
+    def checkout_branch(self, work_dir: Path, branch: str, start_point: str | None = None) -> None:
+        args = ["checkout", "-B", branch] + ([start_point] if start_point else [])
+        r = _run_git(Path(work_dir), *args)
+        if r.returncode != 0:
+            raise RuntimeError(f"Git checkout failed: {r.stderr or r.stdout}")
+
+    def write_tree(self, work_dir: Path) -> str | None:
+        work_dir = Path(work_dir)
+        index = work_dir / ".git" / "index"
+        if not (work_dir / ".git").is_dir():
+            # Linked worktree: .git is a file pointing at the per-worktree git dir.
+            r = _run_git(work_dir, "rev-parse", "--path-format=absolute", "--git-path", "index")
+            if r.returncode == 0 and r.stdout.strip():
+                index = Path(r.stdout.strip())
+        with tempfile.TemporaryDirectory(prefix="agent-index-") as tmp:
+            tmp_index = Path(tmp) / "index"
+            if index.is_file():
+                shutil.copyfile(index, tmp_index)
+            env = {"GIT_INDEX_FILE": str(tmp_index)}
+            r = _run_git(work_dir, "add", "-A", env=env)
+            if r.returncode != 0:
+                logger.debug("write-tree add failed: %s", r.stderr)
+                return None
+            r = _run_git(work_dir, "write-tree", env=env)
+        if r.returncode != 0:
+            logger.debug("write-tree failed: %s", r.stderr)
+            return None
+        return r.stdout.strip() or None
+
+    def head_tree(self, work_dir: Path) -> str | None:
+        r = _run_git(Path(work_dir), "rev-parse", "HEAD^{tree}")
+        return r.stdout.strip() if r.returncode == 0 else None
+
+
+def _cli_fallback(method):
+    """Run the pygit2 implementation; on a libgit2 error, repeat the call with the CLI backend."""
+
+    @functools.wraps(method)
+    def wrapper(self: "Pygit2GitBackend", work_dir: Path, *args, **kwargs):
+        try:
+            return method(self, Path(work_dir), *args, **kwargs)
+        except (self.pygit2.GitError, KeyError, ValueError) as e:
+            logger.debug("pygit2 %s failed in %s (%s); using git CLI", method.__name__, work_dir, e)
+            return getattr(self._cli, method.__name__)(work_dir, *args, **kwargs)
+
+    return wrapper
+
+
+class Pygit2GitBackend(GitBackend):
+    name = "pygit2"
+
+    def __init__(self) -> None:
+        try:
+            import pygit2
+        except ImportError as e:
+            raise ImportError("Install pygit2: pip install pygit2") from e
+        self.pygit2 = pygit2
+        self._cli = CliGitBackend()
+
+    def in_process(self, work_dir: Path) -> bool:
+        return True
+
+    def _repo(self, work_dir: Path):
+        # Cheap to open; one per call keeps index state from leaking between callers and threads.
+        return self.pygit2.Repository(str(work_dir))
+
+    def _signature(self, repo, role: str):
+        """Identity from GIT_<ROLE>_NAME / _EMAIL like the CLI, else user.name / user.email from config."""
+        name = os.environ.get(f"GIT_{role}_NAME")
+        email = os.environ.get(f"GIT_{role}_EMAIL")
+        if not (name and email):
+            default = repo.default_signature  # KeyError without user.name / user.email
+            name, email = name or default.name, email or default.email
+        return self.pygit2.Signature(name, email)
+
+    @_cli_fallback
+    def has_changes(self, work_dir: Path) -> bool:
+        return bool(self._repo(work_dir).status(untracked_files="normal"))
+
+    @_cli_fallback
+    def commit_all(self, work_dir: Path, message: str) -> bool:
+        repo = self._repo(work_dir)
+        index = repo.index
+        index.add_all()
+        index.write()
+        tree = index.write_tree()
+        parents = [] if repo.head_is_unborn else [repo.head.target]
+        if parents and repo[parents[0]].tree_id == tree:
+            return False
+        repo.create_commit(
+            "HEAD", self._signature(repo, "AUTHOR"), self._signature(repo, "COMMITTER"), message, tree, parents
+        )
+        return True
+
+    @_cli_fallback
+    def checkout_branch(self, work_dir: Path, branch: str, start_point: str | None = None) -> None:
+        repo = self._repo(work_dir)
+        target = repo.revparse_single(start_point or "HEAD").peel(self.pygit2.Commit)
+        ref = repo.branches.local.create(branch, target, force=True)
+        # Plain SAFE like the CLI: the default also recreates files deleted in the working tree.
+        repo.checkout(ref, strategy=self.pygit2.enums.CheckoutStrategy.SAFE)
+
+    @_cli_fallback
+    def write_tree(self, work_dir: Path) -> str | None:
+        index = self._repo(work_dir).index
+        index.add_all()  # in memory only; the on-disk index is not written
+        return str(index.write_tree())
+
+    @_cli_fallback
+    def head_tree(self, work_dir: Path) -> str | None:
+        return str(self._repo(work_dir).head.peel(self.pygit2.Tree).id)
+
+
+def index_entries(work_dir: Path) -> int | None:
+    """Tracked file count from the index header (None if there is no readable index)."""
+    directory = git_dir(work_dir)
+    if directory is None:
+        return None
+    try:
+        with open(directory / "index", "rb") as f:
+            header = f.read(12)
+    except OSError:
+        return None
+    if len(header) < 12 or header[:4] != b"DIRC":
+        return None
+    return struct.unpack(">I", header[8:12])[0]
+
+
+class AutoGitBackend(GitBackend):
+    """pygit2 for small workspaces, the CLI for large ones (see module docstring)."""
+
+    name = "auto"
+
+    def __init__(self, max_files: int) -> None:
+        self.max_files = max_files
+        self._cli = CliGitBackend()
+        self._inproc = Pygit2GitBackend()
+
+    def _pick(self, work_dir: Path) -> GitBackend:
+        entries = index_entries(work_dir)
+        return self._inproc if entries is not None and entries < self.max_files else self._cli
+
+    def in_process(self, work_dir: Path) -> bool:
+        return self._pick(work_dir) is self._inproc
+
+    def has_changes(self, work_dir: Path) -> bool:
+        return self._pick(work_dir).has_changes(work_dir)
+
+    def commit_all(self, work_dir: Path, message: str) -> bool:
+        return self._pick(work_dir).commit_all(work_dir, message)
+
+    def checkout_branch(self, work_dir: Path, branch: str, start_point: str | None = None) -> None:
+        return self._pick(work_dir).checkout_branch(work_dir, branch, start_point)
+
+    def write_tree(self, work_dir: Path) -> str | None:
+        return self._pick(work_dir).write_tree(work_dir)
+
+    def head_tree(self, work_dir: Path) -> str | None:
+        return self._pick(work_dir).head_tree(work_dir)
+
+
+_backend: GitBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_git_backend() -> GitBackend:
+    """Process-wide backend per GIT_BACKEND (auto falls back to the CLI when pygit2 is not installed)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            settings = get_settings()
+            choice = settings.git_backend
+            if choice == "cli":
+                _backend = CliGitBackend()
+            elif choice == "pygit2":
+                _backend = Pygit2GitBackend()
+            else:
+                try:
+                    _backend = AutoGitBackend(settings.git_inprocess_max_files)
+                except ImportError:
+                    _backend = CliGitBackend()
+            logger.info("Git backend: %s", _backend.name)
+        return _backend
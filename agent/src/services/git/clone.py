@@ -1,20 +1,27 @@
 """
 Clone and branch operations (F2.1–F2.3).
-Uses GitPython or subprocess git; clone URL can include token for private repos.
+Network operations use subprocess git; local ones (status, commit, checkout, write-tree) go through the
+configured GitBackend. Clone URL can include token for private repos.
 """
 
 import logging
 import os
 import re
+import shutil
 import subprocess
 from pathlib import Path
 from typing import Any
 
 from ...config import get_settings
 from ...models.task import TaskContext
+from ...utils.deadline import remaining_timeout
+from ...utils.metrics import GIT_SECONDS, span
 
 logger = logging.getLogger(__name__)
 
+# Feature branches created by the agent; PR-comment runs only act on these.
+BRANCH_PREFIX = "ai/"
+
 
 def get_clone_url(task: TaskContext) -> str:
     """
@@ -39,16 +46,34 @@ def get_clone_url(task: TaskContext) -> str:
     return f"https://github.com/{owner}/{name}.git"
 
 
-def _run_git(cwd: Path, *args: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess:
+def _backend():
+    from .backend import get_git_backend  # backend.py imports _run_git from here
+
+    return get_git_backend()
+
+
+def _run_git(
+    cwd: Path,
+    *args: str,
+    env: dict[str, str] | None = None,
+    text: bool = True,
+    timeout: float = 120,
+    input: str | bytes | None = None,
+) -> subprocess.CompletedProcess:
     full_env = {**os.environ, **(env or {}), "GIT_TERMINAL_PROMPT": "0"}
-    return subprocess.run(
-        ["git"] + list(args),
-        cwd=cwd,
-        capture_output=True,
-        text=True,
-        timeout=120,
-        env=full_env,
-    )
+    with span("git", GIT_SECONDS, command=args[0]) as sp:
+        r = subprocess.run(
+            ["git"] + list(args),
+            cwd=cwd,
+            input=input,
+            capture_output=True,
+            text=text,
+            timeout=remaining_timeout(timeout),
+            env=full_env,
+        )
+        if r.returncode != 0:
+            sp.outcome = "error"
+        return r
 
 
 def clone_repo(clone_url: str, work_dir: Path, branch: str | None = None) -> None:
@@ -76,40 +101,47 @@ def clone_repo(clone_url: str, work_dir: Path, branch: str | None = None) -> Non
         _run_git(work_dir, "checkout", branch)
 
 
+def feature_branch_name(task: TaskContext) -> str:
+    """ai/<ticket-id>-<slug> (slug from title, sanitized)."""
+    ticket_slug = re.sub(r"[^a-zA-Z0-9]+", "-", (task.ticket_id + " " + (task.title or ""))[:60]).strip("-") or "task"
+    return f"{BRANCH_PREFIX}{ticket_slug}"[:100]
+
+
 def create_feature_branch(work_dir: Path, task: TaskContext) -> str:
     """
     Create and checkout feature branch from default_branch.
     Branch name: ai/<ticket-id>-<slug> (slug from title, sanitized).
-    Returns the new branch name.
+    Returns the new branch name; raises RuntimeError if the checkout fails.
     Handles shallow clones: prefers origin/base, falls back to HEAD if fetch fails.
     """
     work_dir = Path(work_dir)
     base = task.default_branch or "main"
-    ticket_slug = re.sub(r"[^a-zA-Z0-9]+", "-", (task.ticket_id + " " + (task.title or ""))[:60]).strip("-") or "task"
-    branch_name = f"ai/{ticket_slug}"[:100]
+    branch_name = feature_branch_name(task)
 
     r = _run_git(work_dir, "fetch", "origin", base)
-    if r.returncode == 0:
-        _run_git(work_dir, "checkout", "-b", branch_name, f"origin/{base}")
-    else:
+    # -B: mirror worktrees share branches, so a branch left by an earlier run of this ticket is reset.
+    start_point = f"origin/{base}"
+    if r.returncode != 0:
         # Shallow clone or remote ref missing: create branch from current HEAD
         logger.debug("Fetch origin/%s failed (%s), creating branch from HEAD", base, r.stderr or r.stdout)
-        _run_git(work_dir, "checkout", "-b", branch_name)
+        start_point = None
+    # Raises on failure: later stages would otherwise commit on whatever branch is checked out.
+    _backend().checkout_branch(work_dir, branch_name, start_point)
     return branch_name
 
 
 def commit(work_dir: Path, message: str) -> None:
     """Stage all changes and commit (F6.1)."""
-    work_dir = Path(work_dir)
-    r = _run_git(work_dir, "add", "-A")
-    if r.returncode != 0:
-        raise RuntimeError(f"Git add failed: {r.stderr or r.stdout}")
-    r = _run_git(work_dir, "commit", "-m", message)
-    if r.returncode != 0:
-        if "nothing to commit" in (r.stdout or "") or "nothing to commit" in (r.stderr or ""):
-            logger.info("Nothing to commit (working tree clean)")
-            return
-        raise RuntimeError(f"Git commit failed: {r.stderr or r.stdout}")
+    if not _backend().commit_all(Path(work_dir), message):
+        logger.info("Nothing to commit (working tree clean)")
+
+
+def has_changes(work_dir: Path) -> bool:
+    """Uncommitted changes in the workspace (assumed True if the check fails)."""
+    try:
+        return _backend().has_changes(Path(work_dir))
+    except Exception:
+        return True
 
 
 def push(work_dir: Path, branch_name: str) -> None:
@@ -119,3 +151,88 @@ def push(work_dir: Path, branch_name: str) -> None:
     if r.returncode != 0:
         logger.error("Push failed: %s %s", r.stderr, r.stdout)
         raise RuntimeError(f"Git push failed: {r.stderr or r.stdout}")
+
+
+def tree_hash(work_dir: Path) -> str | None:
+    """
+    Hash of the working tree including untracked (non-ignored) files, as `git add -A && git write-tree`
+    would produce. Uses a throwaway index so the real index is left untouched. None if git fails.
+    """
+    return _backend().write_tree(Path(work_dir))
+
+
+def head_tree(work_dir: Path) -> str | None:
+    """Tree hash of HEAD (the base the feature branch started from)."""
+    return _backend().head_tree(Path(work_dir))
+
+
+# Identity for internal snapshot commits that never leave the workspace.
+_SNAPSHOT_ENV = {
+    "GIT_AUTHOR_NAME": "ai-dev-agent",
+    "GIT_AUTHOR_EMAIL": "ai-dev-agent@localhost",
+    "GIT_COMMITTER_NAME": "ai-dev-agent",
+    "GIT_COMMITTER_EMAIL": "ai-dev-agent@localhost",
+}
+
+
+def git_dir(work_dir: Path) -> Path | None:
+    """The workspace's own git directory without running git: <work_dir>/.git, or the per-worktree dir it points to."""
+    dot_git = Path(work_dir) / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    try:
+        line = dot_git.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not line.startswith("gitdir:"):
+        return None
+    path = Path(line[len("gitdir:"):].strip())
+    return path if path.is_absolute() else (Path(work_dir) / path).resolve()
+
+
+def git_common_dir(work_dir: Path) -> Path | None:
+    """The shared .git directory (differs from <work_dir>/.git for linked worktrees)."""
+    work_dir = Path(work_dir)
+    if (work_dir / ".git").is_dir():
+        return work_dir / ".git"
+    r = _run_git(work_dir, "rev-parse", "--git-common-dir")
+    if r.returncode != 0 or not r.stdout.strip():
+        return None
+    return (work_dir / r.stdout.strip()).resolve()
+
+
+def snapshot_commit(work_dir: Path) -> str | None:
+    """Commit object for the current working tree (tracked + untracked) on top of HEAD, without touching refs or index."""
+    tree = tree_hash(work_dir)
+    if not tree:
+        return None
+    r = _run_git(Path(work_dir), "commit-tree", tree, "-p", "HEAD", "-m", "agent snapshot", env=_SNAPSHOT_ENV)
+    if r.returncode != 0:
+        logger.warning("Snapshot commit failed: %s", r.stderr or r.stdout)
+        return None
+    return r.stdout.strip()
+
+
+def add_worktree(work_dir: Path, path: Path, commit_ish: str) -> None:
+    """Create a detached linked worktree of work_dir at path (shares the object store; no clone)."""
+    r = _run_git(Path(work_dir), "worktree", "add", "--detach", str(path), commit_ish)
+    if r.returncode != 0:
+        raise RuntimeError(f"Git worktree add failed: {r.stderr or r.stdout}")
+
+
+def remove_worktree(work_dir: Path, path: Path) -> None:
+    """Remove a linked worktree; falls back to deleting the directory and pruning."""
+    r = _run_git(Path(work_dir), "worktree", "remove", "--force", str(path))
+    if r.returncode != 0:
+        shutil.rmtree(path, ignore_errors=True)
+        _run_git(Path(work_dir), "worktree", "prune")
+
+
+def checkout_tree(work_dir: Path, tree: str) -> None:
+    """Make the working tree match tree exactly (adds, modifies and deletes files); HEAD is unchanged."""
+    work_dir = Path(work_dir)
+    r = _run_git(work_dir, "add", "-A")
+    if r.returncode == 0:
+        r = _run_git(work_dir, "read-tree", "-u", "--reset", tree)
+    if r.returncode != 0:
+        raise RuntimeError(f"Git read-tree failed: {r.stderr or r.stdout}")
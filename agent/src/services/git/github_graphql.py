@@ -0,0 +1,66 @@
+"""
+Minimal GitHub GraphQL client for PR delivery (F6.3, F6.4): one pooled, rate-paced requests session.
+GraphQL has its own rate-limit budget, so it gets its own pacer.
+"""
+
+import logging
+from typing import Any
+
+from ...utils.deadline import remaining_timeout
+from .ratelimit import PacedAdapter, RateLimitPacer
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_TIMEOUT = 30.0
+
+
+class GraphQLError(RuntimeError):
+    """Transport or HTTP failure, or an `errors` array in the GraphQL response."""
+
+
+def graphql_url(api_url: str) -> str:
+    """GraphQL endpoint for a REST base URL: api.github.com/graphql, or <host>/api/graphql on GitHub Enterprise."""
+    api_url = api_url.rstrip("/")
+    if api_url.endswith("/api/v3"):
+        return api_url[: -len("/v3")] + "/graphql"
+    return api_url + "/graphql"
+
+
+class GitHubGraphQL:
+    def __init__(self, api_url: str, token: str, pool_size: int = 10) -> None:
+        import requests
+
+        self.api_url = api_url.rstrip("/")
+        self.url = graphql_url(api_url)
+        self.pacer = RateLimitPacer("github-graphql")
+        self._session = requests.Session()
+        adapter = PacedAdapter(self.pacer, pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({"Authorization": f"bearer {token}", "Accept": "application/vnd.github+json"})
+
+    def execute(self, document: str, variables: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Run a query or mutation document; returns `data`. Raises GraphQLError if any field errored."""
+        timeout = remaining_timeout(_REQUEST_TIMEOUT)
+        try:
+            r = self._session.post(self.url, json={"query": document, "variables": variables or {}}, timeout=timeout)
+        except Exception as e:
+            raise GraphQLError(f"GraphQL request failed: {e}") from e
+        if r.status_code >= 400:
+            raise GraphQLError(f"GraphQL HTTP {r.status_code}: {r.text[:500]}")
+        payload = r.json()
+        if payload.get("errors"):
+            messages = "; ".join(str(err.get("message", err)) for err in payload["errors"])
+            raise GraphQLError(messages[:1000])
+        return payload.get("data") or {}
+
+    def rest(self, method: str, path: str, json: dict[str, Any] | None = None) -> dict[str, Any]:
+        """REST call on the same session (for what GraphQL can't do, e.g. creating labels)."""
+        timeout = remaining_timeout(_REQUEST_TIMEOUT)
+        try:
+            r = self._session.request(method, f"{self.api_url}{path}", json=json, timeout=timeout)
+        except Exception as e:
+            raise GraphQLError(f"REST {method} {path} failed: {e}") from e
+        if r.status_code >= 400:
+            raise GraphQLError(f"REST {method} {path} HTTP {r.status_code}: {r.text[:500]}")
+        return r.json() if r.content else {}
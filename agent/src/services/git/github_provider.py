@@ -1,29 +1,194 @@
-"""GitHub provider using PyGitHub (F6)."""
+"""
+GitHub provider using PyGitHub (F6).
+One instance per process (see get_git_provider): a pooled client, TTL caches for repo and label lookups,
+and calls paced on the X-RateLimit-* headers PyGithub records from each response.
+With github_delivery_mode=graphql, PRs are opened through GraphQL (REST is the fallback): createPullRequest,
+then labels and reviewers in one batched mutation. Node IDs are cached, so a warm delivery is two round trips.
+"""
 
 import logging
-from typing import Any
+import threading
+from typing import Any, Callable, TypeVar
 
 from ...config import get_settings
+from ...utils.ttl_cache import TTLCache
+from .github_graphql import GitHubGraphQL, GraphQLError
 from .provider import GitProviderInterface
+from .ratelimit import RateLimitPacer
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class GitHubProvider(GitProviderInterface):
     def __init__(self) -> None:
+        settings = get_settings()
         self._client = None
+        self._client_lock = threading.Lock()
+        self._pacer = RateLimitPacer("github")
+        self._repos: TTLCache[str, Any] = TTLCache(256, settings.provider_cache_ttl_seconds)
+        self._labels: TTLCache[tuple[str, str], bool] = TTLCache(1024, settings.provider_cache_ttl_seconds)
+        self._graphql: GitHubGraphQL | None = None
+        self._node_ids: TTLCache[tuple[str, ...], str] = TTLCache(4096, settings.provider_cache_ttl_seconds)
 
     def _get_client(self):
-        if self._client is None:
-            token = get_settings().github_token
-            if not token:
-                raise ValueError("github_token is not set (MANDATORY for GitHub)")
+        with self._client_lock:
+            if self._client is None:
+                token = get_settings().github_token
+                if not token:
+                    raise ValueError("github_token is not set (MANDATORY for GitHub)")
+                try:
+                    from github import Github
+                    self._client = Github(
+                        token,
+                        base_url=get_settings().github_api_url,
+                        pool_size=max(10, get_settings().stage_pool_io_workers),
+                    )
+                except ImportError as e:
+                    raise ImportError("Install PyGithub: pip install PyGithub") from e
+            return self._client
+
+    def _call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """One API call, paced; PyGithub keeps the last response's rate-limit headers on its requester."""
+        self._pacer.wait()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            requester = self._get_client().requester
+            remaining, limit = requester.rate_limiting
+            if limit >= 0:
+                self._pacer.observe(remaining, requester.rate_limiting_resettime)
+
+    def _get_repo(self, repo_owner: str, repo_name: str):
+        full_name = f"{repo_owner}/{repo_name}"
+        repo = self._repos.get(full_name)
+        if repo is None:
+            repo = self._call(self._get_client().get_repo, full_name)
+            self._repos.set(full_name, repo)
+        return repo
+
+    def _ensure_label(self, repo, label_name: str) -> None:
+        """Create the label once if the repo lacks it; known labels are cached instead of probed per PR."""
+        key = (repo.full_name, label_name)
+        if key in self._labels:
+            return
+        try:
+            self._call(repo.get_label, label_name)
+        except Exception:
+            try:
+                self._call(repo.create_label, label_name, "6f7370", "PR created by AI agent")
+            except Exception as e:
+                logger.warning("Could not create label %s: %s", label_name, e)
+                return
+        self._labels.set(key, True)
+
+    def _get_graphql(self) -> GitHubGraphQL:
+        with self._client_lock:
+            if self._graphql is None:
+                settings = get_settings()
+                if not settings.github_token:
+                    raise ValueError("github_token is not set (MANDATORY for GitHub)")
+                self._graphql = GitHubGraphQL(
+                    settings.github_api_url, settings.github_token, pool_size=max(10, settings.stage_pool_io_workers)
+                )
+            return self._graphql
+
+    def _resolve_node_ids(
+        self, repo_owner: str, repo_name: str, label_name: str, reviewer_logins: list[str]
+    ) -> tuple[str, str | None, list[str]]:
+        """(repository id, label id, reviewer user ids), from the cache or one query for whatever is missing."""
+        full_name = f"{repo_owner}/{repo_name}"
+        repo_key, label_key = ("repo", full_name), ("label", full_name, label_name)
+        user_keys = [("user", login) for login in reviewer_logins]
+        need_repo = repo_key not in self._node_ids or (label_name and label_key not in self._node_ids)
+        missing_users = [k for k in user_keys if k not in self._node_ids]
+        if need_repo or missing_users:
+            params = ["$owner: String!", "$name: String!", "$label: String!"] + [
+                f"$u{i}: String!" for i in range(len(missing_users))
+            ]
+            fields = ["repository(owner: $owner, name: $name) { id label(name: $label) { id } }"] + [
+                f"u{i}: user(login: $u{i}) {{ id }}" for i in range(len(missing_users))
+            ]
+            variables = {"owner": repo_owner, "name": repo_name, "label": label_name or ""}
+            variables.update({f"u{i}": key[1] for i, key in enumerate(missing_users)})
+            data = self._get_graphql().execute(f"query({', '.join(params)}) {{ {' '.join(fields)} }}", variables)
+            repo = data.get("repository") or {}
+            if not repo.get("id"):
+                raise GraphQLError(f"Repository {full_name} not found")
+            self._node_ids.set(repo_key, repo["id"])
+            if label_name and (repo.get("label") or {}).get("id"):
+                self._node_ids.set(label_key, repo["label"]["id"])
+            for i, key in enumerate(missing_users):
+                user_id = (data.get(f"u{i}") or {}).get("id")
+                if user_id:
+                    self._node_ids.set(key, user_id)
+                else:
+                    logger.warning("Reviewer %s not found; not requesting review", key[1])
+        label_id = self._node_ids.get(label_key) if label_name else None
+        if label_name and label_id is None:
+            # GraphQL cannot create labels; one REST call, then the id is cached like any other.
+            try:
+                created = self._get_graphql().rest(
+                    "POST", f"/repos/{full_name}/labels",
+                    {"name": label_name, "color": "6f7370", "description": "PR created by AI agent"},
+                )
+                label_id = created.get("node_id")
+                if label_id:
+                    self._node_ids.set(label_key, label_id)
+            except GraphQLError as e:
+                logger.warning("Could not create label %s: %s", label_name, e)
+        user_ids = [uid for uid in (self._node_ids.get(k) for k in user_keys) if uid]
+        return self._node_ids.get(repo_key) or "", label_id, user_ids
+
+    def _create_pull_request_graphql(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        head_branch: str,
+        base_branch: str,
+        title: str,
+        body: str,
+        reviewer_logins: list[str],
+        label_name: str,
+    ) -> dict[str, Any]:
+        """
+        createPullRequest, then one batched mutation for labels + reviewers (GraphQL can't set them on create).
+        Raises only before the PR exists; label/reviewer failures are logged.
+        """
+        client = self._get_graphql()
+        repo_id, label_id, user_ids = self._resolve_node_ids(repo_owner, repo_name, label_name, reviewer_logins)
+        data = client.execute(
+            "mutation($input: CreatePullRequestInput!) {"
+            " createPullRequest(input: $input) { pullRequest { id number url databaseId } } }",
+            {"input": {
+                "repositoryId": repo_id,
+                "baseRefName": base_branch,
+                "headRefName": head_branch,
+                "title": title,
+                "body": body,
+            }},
+        )
+        pr = data["createPullRequest"]["pullRequest"]
+        fields: list[str] = []
+        variables: dict[str, Any] = {"pr": pr["id"]}
+        if label_id:
+            fields.append(
+                "labels: addLabelsToLabelable(input: {labelableId: $pr, labelIds: $labels}) { clientMutationId }"
+            )
+            variables["labels"] = [label_id]
+        if user_ids:
+            fields.append(
+                "reviews: requestReviews(input: {pullRequestId: $pr, userIds: $users, union: true}) { clientMutationId }"
+            )
+            variables["users"] = user_ids
+        if fields:
+            params = ["$pr: ID!"] + (["$labels: [ID!]!"] if label_id else []) + (["$users: [ID!]!"] if user_ids else [])
             try:
-                from github import Github
-                self._client = Github(token)
-            except ImportError as e:
-                raise ImportError("Install PyGithub: pip install PyGithub") from e
-        return self._client
+                client.execute(f"mutation({', '.join(params)}) {{ {' '.join(fields)} }}", variables)
+            except GraphQLError as e:
+                logger.warning("Could not set labels/reviewers on %s: %s", pr["url"], e)
+        return {"url": pr["url"], "number": pr["number"], "id": pr["databaseId"]}
 
     def create_pull_request(
         self,
@@ -36,9 +201,17 @@ class GitHubProvider(GitProviderInterface):
         reviewer_logins: list[str] | None = None,
         labels: list[str] | None = None,
     ) -> dict[str, Any]:
-        gh = self._get_client()
-        repo = gh.get_repo(f"{repo_owner}/{repo_name}")
-        pr = repo.create_pull(
+        label_name = (get_settings().pr_label_ai_generated or "ai-generated").strip()
+        if get_settings().github_delivery_mode == "graphql":
+            try:
+                return self._create_pull_request_graphql(
+                    repo_owner, repo_name, head_branch, base_branch, title, body, reviewer_logins or [], label_name
+                )
+            except (GraphQLError, KeyError, TypeError, ValueError) as e:
+                logger.warning("GraphQL PR creation failed, falling back to REST: %s", e)
+        repo = self._get_repo(repo_owner, repo_name)
+        pr = self._call(
+            repo.create_pull,
             title=title,
             body=body,
             head=head_branch,
@@ -46,24 +219,47 @@ class GitHubProvider(GitProviderInterface):
         )
         if reviewer_logins:
             try:
-                pr.create_review_request(reviewers=reviewer_logins)
+                self._call(pr.create_review_request, reviewers=reviewer_logins)
             except Exception as e:
                 logger.warning("Could not set reviewers: %s", e)
-        label_name = (get_settings().pr_label_ai_generated or "ai-generated").strip()
         if label_name:
+            self._ensure_label(repo, label_name)
             try:
-                repo.get_label(label_name)
-            except Exception:
-                try:
-                    repo.create_label(label_name, "6f7370", "PR created by AI agent")
-                except Exception as e:
-                    logger.warning("Could not create label %s: %s", label_name, e)
-            try:
-                pr.add_to_labels(label_name)
+                self._call(pr.add_to_labels, label_name)
             except Exception as e:
                 logger.warning("Could not add label: %s", e)
         return {"url": pr.html_url, "number": pr.number, "id": pr.id}
 
+    def find_open_pull_request(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        head_branch: str,
+    ) -> dict[str, Any] | None:
+        repo = self._get_repo(repo_owner, repo_name)
+        pulls = self._call(repo.get_pulls, state="open", head=f"{repo_owner}:{head_branch}")
+        for pr in self._call(pulls.get_page, 0):
+            return {"url": pr.html_url, "number": pr.number, "id": pr.id}
+        return None
+
+    def get_pull_request(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        pr_number: int,
+    ) -> dict[str, Any]:
+        pr = self._call(self._get_repo(repo_owner, repo_name).get_pull, pr_number)
+        return {
+            "url": pr.html_url,
+            "number": pr.number,
+            "head_branch": pr.head.ref,
+            "base_branch": pr.base.ref,
+            "author": pr.user.login if pr.user else "",
+            "title": pr.title or "",
+            "body": pr.body or "",
+            "state": pr.state,
+        }
+
     def add_label_to_pr(
         self,
         repo_owner: str,
@@ -71,10 +267,8 @@ class GitHubProvider(GitProviderInterface):
         pr_number: int,
         label: str,
     ) -> None:
-        gh = self._get_client()
-        repo = gh.get_repo(f"{repo_owner}/{repo_name}")
-        pr = repo.get_pull(pr_number)
+        pr = self._call(self._get_repo(repo_owner, repo_name).get_pull, pr_number)
         try:
-            pr.add_to_labels(label)
+            self._call(pr.add_to_labels, label)
         except Exception as e:
             logger.warning("Could not add label to PR: %s", e)
@@ -1,10 +1,17 @@
-"""GitLab provider using python-gitlab (F6)."""
+"""
+GitLab provider using python-gitlab (F6).
+One instance per process (see get_git_provider): a pooled requests session paced on the RateLimit-* headers,
+and a TTL cache for project lookups.
+"""
 
 import logging
+import threading
 from typing import Any
 
 from ...config import get_settings
+from ...utils.ttl_cache import TTLCache
 from .provider import GitProviderInterface
+from .ratelimit import PacedAdapter, RateLimitPacer
 
 logger = logging.getLogger(__name__)
 
@@ -12,25 +19,37 @@ logger = logging.getLogger(__name__)
 class GitLabProvider(GitProviderInterface):
     def __init__(self) -> None:
         self._client = None
+        self._client_lock = threading.Lock()
+        self._pacer = RateLimitPacer("gitlab")
+        self._projects: TTLCache[str, Any] = TTLCache(256, get_settings().provider_cache_ttl_seconds)
 
     def _get_client(self):
-        if self._client is None:
-            token = get_settings().gitlab_token
-            url = get_settings().gitlab_url or "https://gitlab.com"
-            if not token:
-                raise ValueError("gitlab_token is not set (MANDATORY for GitLab)")
-            try:
-                import gitlab
-                self._client = gitlab.Gitlab(url, private_token=token)
-                self._client.auth()
-            except ImportError as e:
-                raise ImportError("Install python-gitlab: pip install python-gitlab") from e
-        return self._client
+        with self._client_lock:
+            if self._client is None:
+                token = get_settings().gitlab_token
+                url = get_settings().gitlab_url or "https://gitlab.com"
+                if not token:
+                    raise ValueError("gitlab_token is not set (MANDATORY for GitLab)")
+                try:
+                    import gitlab
+                    import requests
+                except ImportError as e:
+                    raise ImportError("Install python-gitlab: pip install python-gitlab") from e
+                # No auth() round trip: a bad token surfaces as 401 on the first real call.
+                pool = max(10, get_settings().stage_pool_io_workers)
+                session = requests.Session()
+                session.mount("https://", PacedAdapter(self._pacer, pool_connections=pool, pool_maxsize=pool))
+                session.mount("http://", PacedAdapter(self._pacer, pool_connections=pool, pool_maxsize=pool))
+                self._client = gitlab.Gitlab(url, private_token=token, session=session)
+            return self._client
 
     def _get_project(self, repo_owner: str, repo_name: str):
-        gl = self._get_client()
         full_path = f"{repo_owner}/{repo_name}"
-        return gl.projects.get(full_path)
+        project = self._projects.get(full_path)
+        if project is None:
+            project = self._get_client().projects.get(full_path)
+            self._projects.set(full_path, project)
+        return project
 
     def create_pull_request(
         self,
@@ -64,6 +83,35 @@ class GitLabProvider(GitProviderInterface):
                 logger.warning("Could not set assignees: %s", e)
         return {"url": mr.web_url, "number": mr.iid, "id": mr.id}
 
+    def find_open_pull_request(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        head_branch: str,
+    ) -> dict[str, Any] | None:
+        project = self._get_project(repo_owner, repo_name)
+        for mr in project.mergerequests.list(state="opened", source_branch=head_branch, per_page=1, get_all=False):
+            return {"url": mr.web_url, "number": mr.iid, "id": mr.id}
+        return None
+
+    def get_pull_request(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        pr_number: int,
+    ) -> dict[str, Any]:
+        mr = self._get_project(repo_owner, repo_name).mergerequests.get(pr_number)
+        return {
+            "url": mr.web_url,
+            "number": mr.iid,
+            "head_branch": mr.source_branch,
+            "base_branch": mr.target_branch,
+            "author": (mr.author or {}).get("username", ""),
+            "title": mr.title or "",
+            "body": mr.description or "",
+            "state": mr.state,
+        }
+
     def add_label_to_pr(
         self,
         repo_owner: str,
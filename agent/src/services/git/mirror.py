@@ -0,0 +1,114 @@
+"""
+Persistent bare mirrors under workspace_base/mirrors (F2.1).
+One mirror per repo is kept warm and fetched incrementally; runs check out linked worktrees from it
+instead of cloning. Branches are fetched to refs/remotes/origin/* so a branch checked out in a worktree
+never blocks the next fetch. The first fetch of a new mirror (full history) gets its own, longer budget;
+if it fails the partial mirror is removed and <mirror>.failed makes tickets clone instead for a while.
+"""
+
+import logging
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from ...config import get_settings
+from ...models.task import TaskContext
+from ...utils.filelock import file_lock
+from .clone import _run_git
+
+logger = logging.getLogger(__name__)
+
+MIRRORS_DIRNAME = "mirrors"
+FETCH_REFSPEC = "+refs/heads/*:refs/remotes/origin/*"
+
+
+def mirror_path(task: TaskContext) -> Path:
+    """Mirror location for task's repo: <workspace_base>/mirrors/<provider>/<owner>__<name>.git"""
+    owner = task.repo_owner.replace("/", "__")
+    return Path(get_settings().workspace_base) / MIRRORS_DIRNAME / task.provider.value / f"{owner}__{task.repo_name}.git"
+
+
+def lock_path(mirror: Path) -> Path:
+    """File lock serializing git operations on mirror across processes."""
+    return mirror.with_name(mirror.name + ".lock")
+
+
+def failed_marker(mirror: Path) -> Path:
+    """<mirror>.failed: written when the initial fetch fails; its mtime starts the retry window."""
+    return mirror.with_name(mirror.name + ".failed")
+
+
+def check_not_failed(mirror: Path) -> None:
+    """Raise RuntimeError while a recent initial fetch of mirror failed (callers fall back to cloning)."""
+    failed = failed_marker(mirror)
+    if failed.is_file() and time.time() - failed.stat().st_mtime < get_settings().mirror_failed_retry_seconds:
+        raise RuntimeError(f"Mirror {mirror.name} failed its initial fetch recently; not retrying yet")
+
+
+def initial_fetch_failed(mirror: Path, reason: str) -> RuntimeError:
+    """Drop the partial mirror and mark it failed; returns the error to raise."""
+    shutil.rmtree(mirror, ignore_errors=True)
+    failed_marker(mirror).touch()
+    logger.warning("Initial fetch of mirror %s failed; cloning instead for now: %s", mirror, reason)
+    return RuntimeError(f"Git fetch mirror failed: {reason}")
+
+
+def ensure_mirror(clone_url: str, mirror: Path) -> Path:
+    """Create the bare mirror if missing, otherwise fetch (prune) all branches. Serialized per mirror across processes."""
+    mirror = Path(mirror)
+    with file_lock(lock_path(mirror)):
+        created = not (mirror / "HEAD").is_file()
+        if created:
+            check_not_failed(mirror)
+            mirror.mkdir(parents=True, exist_ok=True)
+            r = _run_git(mirror, "init", "--bare", "--quiet")
+            if r.returncode != 0:
+                raise RuntimeError(f"Git init mirror failed: {r.stderr or r.stdout}")
+            _run_git(mirror, "remote", "add", "origin", clone_url)
+            _run_git(mirror, "config", "remote.origin.fetch", FETCH_REFSPEC)
+            logger.info("Created mirror %s", mirror)
+        else:
+            # Keep credentials current (tokens rotate).
+            _run_git(mirror, "remote", "set-url", "origin", clone_url)
+        if created:
+            timeout = get_settings().mirror_initial_fetch_timeout_seconds
+            try:
+                r = _run_git(mirror, "fetch", "--prune", "--quiet", "origin", timeout=timeout)
+            except subprocess.TimeoutExpired:
+                raise initial_fetch_failed(mirror, f"timed out after {timeout}s") from None
+            if r.returncode != 0:
+                raise initial_fetch_failed(mirror, r.stderr or r.stdout)
+            failed_marker(mirror).unlink(missing_ok=True)
+        else:
+            r = _run_git(mirror, "fetch", "--prune", "--quiet", "origin")
+            if r.returncode != 0:
+                raise RuntimeError(f"Git fetch mirror failed: {r.stderr or r.stdout}")
+        if _run_git(mirror, "rev-parse", "--verify", "--quiet", "refs/remotes/origin/HEAD").returncode != 0:
+            _run_git(mirror, "remote", "set-head", "origin", "--auto")
+        _run_git(mirror, "worktree", "prune")
+    return mirror
+
+
+def mirror_ref(branch: str | None) -> str:
+    """Ref of branch as fetched into the mirror; the remote's default branch when branch is empty."""
+    return f"refs/remotes/origin/{branch}" if branch else "refs/remotes/origin/HEAD"
+
+
+def mirror_checkout(mirror: Path, path: Path, branch: str | None) -> None:
+    """Detached worktree at origin/<branch> (the ticket pipeline then creates its feature branch)."""
+    with file_lock(lock_path(Path(mirror))):
+        r = _run_git(Path(mirror), "worktree", "add", "--detach", str(path), mirror_ref(branch))
+    if r.returncode != 0:
+        raise RuntimeError(f"Git worktree add failed: {r.stderr or r.stdout}")
+
+
+def mirror_worktree(mirror: Path, path: Path, branch: str) -> None:
+    """
+    Check out branch (as fetched from origin) into a new linked worktree at path, on a local branch of the
+    same name so commits can be pushed with `git push origin <branch>`.
+    """
+    with file_lock(lock_path(Path(mirror))):
+        r = _run_git(Path(mirror), "worktree", "add", "-B", branch, str(path), mirror_ref(branch))
+    if r.returncode != 0:
+        raise RuntimeError(f"Git worktree add failed: {r.stderr or r.stdout}")
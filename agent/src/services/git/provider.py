@@ -4,6 +4,7 @@ Concrete: GitHub (PyGitHub), GitLab (python-gitlab).
 """
 
 import logging
+import threading
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -30,6 +31,26 @@ class GitProviderInterface(ABC):
         """Create PR/MR. Returns dict with 'url', 'number', 'id'."""
         ...
 
+    @abstractmethod
+    def find_open_pull_request(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        head_branch: str,
+    ) -> dict[str, Any] | None:
+        """Open PR/MR whose head is head_branch, as dict with 'url', 'number', 'id'; None if there is none."""
+        ...
+
+    @abstractmethod
+    def get_pull_request(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        pr_number: int,
+    ) -> dict[str, Any]:
+        """Fetch PR/MR. Returns dict with 'url', 'number', 'head_branch', 'base_branch', 'author', 'title', 'body', 'state'."""
+        ...
+
     @abstractmethod
     def add_label_to_pr(
         self,
@@ -42,12 +63,25 @@ class GitProviderInterface(ABC):
         ...
 
 
+_providers: dict[GitProviderEnum, GitProviderInterface] = {}
+_providers_lock = threading.Lock()
+
+
 def get_git_provider(provider: GitProviderEnum) -> GitProviderInterface:
-    """Return concrete provider for GitHub or GitLab."""
-    if provider == GitProviderEnum.GITHUB:
-        from .github_provider import GitHubProvider
-        return GitHubProvider()
-    if provider == GitProviderEnum.GITLAB:
-        from .gitlab_provider import GitLabProvider
-        return GitLabProvider()
-    raise ValueError(f"Unknown provider: {provider}")
+    """Return the process-wide provider for GitHub or GitLab (shared client, caches and rate-limit pacing)."""
+    instance = _providers.get(provider)
+    if instance is not None:
+        return instance
+    with _providers_lock:
+        instance = _providers.get(provider)
+        if instance is None:
+            if provider == GitProviderEnum.GITHUB:
+                from .github_provider import GitHubProvider
+                instance = GitHubProvider()
+            elif provider == GitProviderEnum.GITLAB:
+                from .gitlab_provider import GitLabProvider
+                instance = GitLabProvider()
+            else:
+                raise ValueError(f"Unknown provider: {provider}")
+            _providers[provider] = instance
+    return instance
@@ -0,0 +1,102 @@
+"""
+Proactive pacing against Git host rate limits (F6).
+Providers report the remaining quota and reset time from response headers: GitHub uses X-RateLimit-Remaining /
+X-RateLimit-Reset, GitLab uses RateLimit-Remaining / RateLimit-Reset, and both send Retry-After on secondary
+limits. Once the quota drops below provider_rate_limit_reserve, the remaining calls are spread evenly until
+the reset time, so concurrent tasks slow down gradually instead of all hitting 403/429 together.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Mapping
+
+from requests.adapters import HTTPAdapter
+
+from ...config import get_settings
+from ...utils.deadline import remaining_timeout
+
+logger = logging.getLogger(__name__)
+
+_MAX_WAIT_SECONDS = 300.0
+
+
+def _header(headers: Mapping[str, str], *names: str) -> float | None:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+class RateLimitPacer:
+    """Shared per provider client; thread-safe."""
+
+    def __init__(self, name: str, reserve: int | None = None) -> None:
+        self.name = name
+        self.reserve = get_settings().provider_rate_limit_reserve if reserve is None else reserve
+        self._lock = threading.Lock()
+        self._remaining: float | None = None
+        self._reset_at = 0.0  # unix time
+        self._blocked_until = 0.0  # unix time (Retry-After)
+
+    def observe(self, remaining: float | None, reset_at: float | None, retry_after: float | None = None) -> None:
+        with self._lock:
+            if remaining is not None:
+                self._remaining = remaining
+            if reset_at:
+                self._reset_at = reset_at
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.time() + retry_after)
+                logger.warning("%s asked to retry after %ss", self.name, retry_after)
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        self.observe(
+            _header(headers, "X-RateLimit-Remaining", "RateLimit-Remaining"),
+            _header(headers, "X-RateLimit-Reset", "RateLimit-Reset"),
+            _header(headers, "Retry-After"),
+        )
+
+    def delay(self) -> float:
+        """Seconds to wait before the next call (0 while the quota is above the reserve)."""
+        now = time.time()
+        with self._lock:
+            if self._blocked_until > now:
+                return min(_MAX_WAIT_SECONDS, self._blocked_until - now)
+            if self._remaining is None or self._reset_at <= now or self._remaining > self.reserve:
+                return 0.0
+            window = self._reset_at - now
+            if self._remaining < 1:
+                return min(_MAX_WAIT_SECONDS, window)
+            # Claim this call's share of the remaining quota so concurrent callers queue behind it.
+            self._remaining -= 1
+            return min(_MAX_WAIT_SECONDS, window / (self._remaining + 1))
+
+    def wait(self) -> None:
+        """Sleep for delay(), within the current task's deadline."""
+        delay = self.delay()
+        if delay > 0:
+            logger.info("%s rate limit low; pacing %.1fs", self.name, delay)
+            time.sleep(remaining_timeout(delay))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"remaining": self._remaining, "reset_at": self._reset_at or None}
+
+
+class PacedAdapter(HTTPAdapter):
+    """requests adapter that waits on the pacer before each request and feeds it the response headers."""
+
+    def __init__(self, pacer: RateLimitPacer, **kwargs: Any) -> None:
+        self.pacer = pacer
+        super().__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):  # type: ignore[override]
+        self.pacer.wait()
+        response = super().send(request, *args, **kwargs)
+        self.pacer.observe_headers(response.headers)
+        return response
@@ -1,20 +1,23 @@
 """
-Implementation service (F4.2–F4.5).
-Uses Claude to generate edits from task + map + plan; applies edits to workspace.
+Implementation service (F4.2–F4.5, F7.2).
+Uses Claude to generate edits from task + map + plan (or from PR review comments + diff); applies edits to workspace.
 No aider dependency: we parse EDIT_FILE blocks and write/update files directly.
 """
 
 import logging
 import re
+import threading
 from pathlib import Path
 
+from ..models.events import PRCommentPayload
 from ..models.task import TaskContext
 from ..models.plan import ImplementationPlan
-from .llm import chat
+from .llm import chat, chat_async
 from .prompts import (
     IMPLEMENTATION_SYSTEM,
     IMPLEMENTATION_USER_TEMPLATE,
     IMPLEMENTATION_FEEDBACK_APPENDIX,
+    PR_COMMENT_USER_TEMPLATE,
 )
 
 logger = logging.getLogger(__name__)
@@ -71,22 +74,13 @@ def _apply_edits(work_dir: Path, raw_response: str) -> list[str]:
     return applied
 
 
-def implement(
+def _implementation_prompt(
     work_dir: Path,
     task: TaskContext,
     repo_map: str,
     plan: ImplementationPlan,
-    feedback: str | None = None,
-) -> list[str]:
-    """
-    Generate implementation from task + map + plan; apply edits to work_dir (F4.2–F4.5).
-    If feedback is set (self-heal), append validation feedback and ask for fixes (F5.4).
-    Returns list of file paths that were created or modified.
-    """
-    if not plan.steps and not feedback:
-        logger.info("No plan steps; skipping implementation")
-        return []
-
+    feedback: str | None,
+) -> str:
     plan_text = plan.summary or ""
     for s in plan.steps:
         plan_text += f"\n- {s.file_path}: {s.action} — {s.reason}"
@@ -103,13 +97,98 @@ def implement(
     )
     if feedback:
         user_msg += IMPLEMENTATION_FEEDBACK_APPENDIX.format(feedback=feedback)
+    return user_msg
+
+
+def implement(
+    work_dir: Path,
+    task: TaskContext,
+    repo_map: str,
+    plan: ImplementationPlan,
+    feedback: str | None = None,
+    cancel: threading.Event | None = None,
+) -> list[str]:
+    """
+    Generate implementation from task + map + plan; apply edits to work_dir (F4.2–F4.5).
+    If feedback is set (self-heal), append validation feedback and ask for fixes (F5.4).
+    If cancel is already set, no LLM request is made and nothing is applied.
+    Returns list of file paths that were created or modified.
+    """
+    if not plan.steps and not feedback:
+        logger.info("No plan steps; skipping implementation")
+        return []
+    if cancel is not None and cancel.is_set():
+        return []
 
     raw = chat(
         system=IMPLEMENTATION_SYSTEM,
-        user_message=user_msg,
+        user_message=_implementation_prompt(work_dir, task, repo_map, plan, feedback),
+        max_tokens=16384,
+    )
+    if cancel is not None and cancel.is_set():
+        return []
+
+    applied = _apply_edits(work_dir, raw)
+    logger.info("Applied edits to %s files: %s", len(applied), applied)
+    return applied
+
+
+async def implement_async(
+    work_dir: Path,
+    task: TaskContext,
+    repo_map: str,
+    plan: ImplementationPlan,
+    feedback: str | None = None,
+) -> list[str]:
+    """implement on the async LLM client (edits are applied the same way)."""
+    if not plan.steps and not feedback:
+        logger.info("No plan steps; skipping implementation")
+        return []
+
+    raw = await chat_async(
+        system=IMPLEMENTATION_SYSTEM,
+        user_message=_implementation_prompt(work_dir, task, repo_map, plan, feedback),
         max_tokens=16384,
     )
 
     applied = _apply_edits(work_dir, raw)
     logger.info("Applied edits to %s files: %s", len(applied), applied)
     return applied
+
+
+def _format_comments(comments: list[PRCommentPayload]) -> str:
+    parts: list[str] = []
+    for c in comments:
+        where = ""
+        if c.file_path:
+            where = f" on {c.file_path}" + (f" line {c.line_number}" if c.line_number else "")
+        parts.append(f"- @{c.comment_author or 'reviewer'}{where}:\n{c.comment_body.strip()}")
+    return "\n".join(parts)
+
+
+def apply_review_feedback(
+    work_dir: Path,
+    task: TaskContext,
+    repo_map: str,
+    comments: list[PRCommentPayload],
+    diff: str,
+    files: list[str],
+) -> list[str]:
+    """
+    Apply PR review comments (F7.2): send only the comments, the branch diff and the touched files
+    (instead of the full plan context). Returns list of file paths that were created or modified.
+    """
+    file_contents = "\n".join(f"### {f}\n{_read_file_safe(work_dir, f)}\n" for f in files) or "(none)"
+    user_msg = PR_COMMENT_USER_TEMPLATE.format(
+        ticket_id=task.ticket_id,
+        title=task.title or "(no title)",
+        description=task.description or "(no description)",
+        diff=diff or "(empty diff)",
+        comments=_format_comments(comments),
+        repo_map=repo_map or "(no map)",
+        file_contents=file_contents,
+    )
+    raw = chat(system=IMPLEMENTATION_SYSTEM, user_message=user_msg, max_tokens=16384)
+    applied = _apply_edits(work_dir, raw)
+    logger.info("Applied review edits to %s files: %s", len(applied), applied)
+    return applied
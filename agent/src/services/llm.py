@@ -3,23 +3,78 @@ LLM service: Anthropic Claude (F4.1).
 Configurable model; API key from settings (MANDATORY for Phase 2+).
 """
 
+import asyncio
 import logging
+import threading
+import weakref
 from typing import Any
 
 from ..config import get_settings
+from ..utils.deadline import remaining_timeout
+from ..utils.metrics import LLM_REQUESTS, LLM_SECONDS, LLM_TOKENS, Span, span
+from ..utils.progress import record_llm_usage
 
 logger = logging.getLogger(__name__)
 
+_REQUEST_TIMEOUT = 600.0  # the SDK default; capped by the task's remaining budget
 
-def _get_client():
+
+_client: Any = None
+_client_lock = threading.Lock()
+# One AsyncAnthropic (and httpx connection pool) per event loop; its connections are bound to that loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _api_key() -> str:
     api_key = get_settings().anthropic_api_key
     if not api_key:
         raise ValueError("anthropic_api_key is not set (MANDATORY for Phase 2+)")
-    try:
-        from anthropic import Anthropic
-        return Anthropic(api_key=api_key)
-    except ImportError as e:
-        raise ImportError("Install anthropic: pip install anthropic") from e
+    return api_key
+
+
+def _get_client():
+    """Process-wide Anthropic client (shared connection pool across threads)."""
+    global _client
+    api_key = _api_key()
+    with _client_lock:
+        if _client is None or _client.api_key != api_key:
+            try:
+                from anthropic import Anthropic
+            except ImportError as e:
+                raise ImportError("Install anthropic: pip install anthropic") from e
+            _client = Anthropic(api_key=api_key)
+        return _client
+
+
+def _get_async_client():
+    """AsyncAnthropic shared by all requests on the running event loop."""
+    api_key = _api_key()
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.api_key != api_key:
+            try:
+                from anthropic import AsyncAnthropic
+            except ImportError as e:
+                raise ImportError("Install anthropic: pip install anthropic") from e
+            client = AsyncAnthropic(api_key=api_key)
+            _async_clients[loop] = client
+        return client
+
+
+def _record_usage(resp: Any, model: str, sp: Span) -> None:
+    """Token usage to the current task, the token / stop-reason counters and the request's span."""
+    stop_reason = getattr(resp, "stop_reason", None) or "unknown"
+    LLM_REQUESTS.inc(model=model, stop_reason=stop_reason)
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        record_llm_usage(input_tokens, output_tokens)
+        LLM_TOKENS.inc(input_tokens, model=model, direction="input")
+        LLM_TOKENS.inc(output_tokens, model=model, direction="output")
+        sp.set(input_tokens=input_tokens, output_tokens=output_tokens)
+    sp.set(stop_reason=stop_reason)
 
 
 def chat(
@@ -36,12 +91,15 @@ def chat(
     settings = get_settings()
     model = model or settings.anthropic_model
     client = _get_client()
-    resp = client.messages.create(
-        model=model,
-        max_tokens=max_tokens,
-        system=system,
-        messages=[{"role": "user", "content": user_message}],
-    )
+    with span("llm", LLM_SECONDS, model=model) as sp:
+        resp = client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=system,
+            timeout=remaining_timeout(_REQUEST_TIMEOUT),
+            messages=[{"role": "user", "content": user_message}],
+        )
+        _record_usage(resp, model, sp)
     text = ""
     for block in resp.content:
         if hasattr(block, "text"):
@@ -63,12 +121,43 @@ def chat_multi(
     settings = get_settings()
     model = model or settings.anthropic_model
     client = _get_client()
-    resp = client.messages.create(
-        model=model,
-        max_tokens=max_tokens,
-        system=system,
-        messages=messages,
-    )
+    with span("llm", LLM_SECONDS, model=model) as sp:
+        resp = client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=system,
+            timeout=remaining_timeout(_REQUEST_TIMEOUT),
+            messages=messages,
+        )
+        _record_usage(resp, model, sp)
+    text = ""
+    for block in resp.content:
+        if hasattr(block, "text"):
+            text += block.text
+    return text.strip()
+
+
+async def chat_async(
+    system: str,
+    user_message: str,
+    *,
+    model: str | None = None,
+    max_tokens: int = 8192,
+) -> str:
+    """
+    chat() on AsyncAnthropic, for the asyncio pipeline: the request holds no thread while waiting,
+    and cancelling the awaiting task aborts it.
+    """
+    model = model or get_settings().anthropic_model
+    with span("llm", LLM_SECONDS, model=model) as sp:
+        resp = await _get_async_client().messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=system,
+            timeout=remaining_timeout(_REQUEST_TIMEOUT),
+            messages=[{"role": "user", "content": user_message}],
+        )
+        _record_usage(resp, model, sp)
     text = ""
     for block in resp.content:
         if hasattr(block, "text"):
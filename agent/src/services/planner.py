@@ -8,7 +8,7 @@ import re
 
 from ..models.task import TaskContext
 from ..models.plan import ImplementationPlan, PlanStep
-from .llm import chat
+from .llm import chat, chat_async
 from .prompts import PLANNING_SYSTEM, PLANNING_USER_TEMPLATE
 
 logger = logging.getLogger(__name__)
@@ -23,18 +23,14 @@ RE_STEP = re.compile(
 RE_SUMMARY = re.compile(r"(?m)^\s*SUMMARY:\s*(.+?)\Z", re.DOTALL | re.IGNORECASE)
 
 
-def create_plan(task: TaskContext, repo_map: str) -> ImplementationPlan:
-    """
-    Call Claude with task + repo_map; parse response into ImplementationPlan (F3.1, F3.2).
-    Plan is stored in returned object for traceability (F3.3).
-    """
+def _plan_prompt(task: TaskContext, repo_map: str) -> str:
     acceptance_section = ""
     if task.acceptance_criteria:
         acceptance_section = "Acceptance criteria:\n" + "\n".join(
             f"- {c}" for c in task.acceptance_criteria
         )
 
-    user_msg = PLANNING_USER_TEMPLATE.format(
+    return PLANNING_USER_TEMPLATE.format(
         ticket_id=task.ticket_id,
         title=task.title or "(no title)",
         description=task.description or "(no description)",
@@ -42,7 +38,8 @@ def create_plan(task: TaskContext, repo_map: str) -> ImplementationPlan:
         repo_map=repo_map or "(no map)",
     )
 
-    raw = chat(system=PLANNING_SYSTEM, user_message=user_msg, max_tokens=4096)
+
+def _parse_plan(raw: str) -> ImplementationPlan:
     steps: list[PlanStep] = []
     for m in RE_STEP.finditer(raw):
         file_path = m.group(1).strip()
@@ -58,3 +55,18 @@ def create_plan(task: TaskContext, repo_map: str) -> ImplementationPlan:
         summary = sm.group(1).strip().split("\n")[0]
 
     return ImplementationPlan(steps=steps, summary=summary)
+
+
+def create_plan(task: TaskContext, repo_map: str) -> ImplementationPlan:
+    """
+    Call Claude with task + repo_map; parse response into ImplementationPlan (F3.1, F3.2).
+    Plan is stored in returned object for traceability (F3.3).
+    """
+    raw = chat(system=PLANNING_SYSTEM, user_message=_plan_prompt(task, repo_map), max_tokens=4096)
+    return _parse_plan(raw)
+
+
+async def create_plan_async(task: TaskContext, repo_map: str) -> ImplementationPlan:
+    """create_plan on the async LLM client."""
+    raw = await chat_async(system=PLANNING_SYSTEM, user_message=_plan_prompt(task, repo_map), max_tokens=4096)
+    return _parse_plan(raw)
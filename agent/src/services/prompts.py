@@ -1,4 +1,4 @@
-"""System and user prompts for planning and implementation (F3.4, F4.2)."""
+"""System and user prompts for planning, implementation and review feedback (F3.4, F4.2, F7.2)."""
 
 PLANNING_SYSTEM = """You are an expert software engineer. Your job is to produce a concise implementation plan only—no code.
 
@@ -71,3 +71,28 @@ IMPLEMENTATION_FEEDBACK_APPENDIX = """
 {feedback}
 
 Apply minimal edits to fix the above. Output EDIT_FILE blocks only."""
+
+PR_COMMENT_USER_TEMPLATE = """## Task
+Ticket: {ticket_id}
+Title: {title}
+
+Description:
+{description}
+
+## Pull request diff (already implemented on this branch)
+```diff
+{diff}
+```
+
+## Reviewer comments to address
+{comments}
+
+## Repository map (for context)
+{repo_map}
+
+## Relevant file contents (current branch state)
+{file_contents}
+
+## Instructions
+Address the reviewer comments with minimal edits on top of the current branch. Do not redo or revert unrelated work.
+Output EDIT_FILE blocks only. Use exact relative paths."""
@@ -0,0 +1,200 @@
+"""
+Incremental symbol index (F2.4): symbols extracted once per git blob (content hash + extension) and kept in
+SQLite under workspace_base/index. A repo map for any commit only reads blobs not seen before, so after the
+first ticket (or a push-webhook warmup) mapping a repo costs a `git ls-tree` and one indexed query.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator
+
+from ..config import get_settings
+from .codebase_map import SOURCE_EXT, _extract_symbols, build_map, is_mapped_path, render_map
+from .git.clone import _run_git
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIRNAME = "index"
+_MAX_BLOB_BYTES = 1024 * 1024  # larger files are generated/vendored more often than not; map them without symbols
+_QUERY_CHUNK = 500
+_BLOB_BATCH_BYTES = 32 * 1024 * 1024  # blob contents read (and held) per `cat-file --batch` call
+
+
+def ls_tree(repo_dir: Path, rev: str = "HEAD") -> list[tuple[str, str]]:
+    """(path, blob sha) for every regular file in rev. Empty if git fails."""
+    r = _run_git(repo_dir, "ls-tree", "-r", "-z", "--full-tree", rev, text=False)
+    if r.returncode != 0:
+        logger.debug("ls-tree %s failed: %s", rev, r.stderr.decode(errors="replace"))
+        return []
+    entries: list[tuple[str, str]] = []
+    for record in r.stdout.split(b"\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition(b"\t")
+        mode, kind, sha = meta.split(b" ")
+        if kind == b"blob" and mode != b"120000":
+            entries.append((path.decode("utf-8", errors="replace"), sha.decode()))
+    return entries
+
+
+def _cat_file(repo_dir: Path, mode: str, shas: list[str]) -> bytes:
+    r = _run_git(repo_dir, "cat-file", mode, input=("\n".join(shas) + "\n").encode(), text=False, timeout=300)
+    if r.returncode != 0:
+        raise RuntimeError(f"git cat-file {mode} failed: {r.stderr.decode(errors='replace')[:500]}")
+    return r.stdout
+
+
+def _read_blobs(repo_dir: Path, shas: list[str]) -> Iterator[dict[str, bytes]]:
+    """
+    Contents of blobs, in batches of at most _BLOB_BATCH_BYTES (a first warmup reads the whole repo).
+    Blobs over _MAX_BLOB_BYTES come back empty without being read; missing ones are left out.
+    """
+    if not shas:
+        return
+    sizes: dict[str, int] = {}
+    for line in _cat_file(repo_dir, "--batch-check", shas).splitlines():
+        header = line.split(b" ")
+        if len(header) == 3:  # not "<sha> missing"
+            sizes[header[0].decode()] = int(header[2])
+    large = {sha: b"" for sha, size in sizes.items() if size > _MAX_BLOB_BYTES}
+    if large:
+        yield large
+    batch: list[str] = []
+    batch_bytes = 0
+    for sha, size in sizes.items():
+        if size > _MAX_BLOB_BYTES:
+            continue
+        if batch and batch_bytes + size > _BLOB_BATCH_BYTES:
+            yield _parse_batch(_cat_file(repo_dir, "--batch", batch))
+            batch, batch_bytes = [], 0
+        batch.append(sha)
+        batch_bytes += size
+    if batch:
+        yield _parse_batch(_cat_file(repo_dir, "--batch", batch))
+
+
+def _parse_batch(out: bytes) -> dict[str, bytes]:
+    blobs: dict[str, bytes] = {}
+    pos = 0
+    while pos < len(out):
+        eol = out.index(b"\n", pos)
+        header = out[pos:eol].split(b" ")
+        pos = eol + 1
+        if len(header) != 3:  # "<sha> missing"
+            continue
+        size = int(header[2])
+        blobs[header[0].decode()] = out[pos:pos + size]
+        pos += size + 1
+    return blobs
+
+
+class SymbolIndex:
+    """(blob sha, extension) → symbols. Safe to share between threads and processes (SQLite WAL)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS symbols (sha TEXT NOT NULL, ext TEXT NOT NULL, symbols TEXT NOT NULL,"
+            " PRIMARY KEY (sha, ext))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], list[str]]:
+        found: dict[tuple[str, str], list[str]] = {}
+        shas = sorted({sha for sha, _ in keys})
+        conn = self._conn()
+        for i in range(0, len(shas), _QUERY_CHUNK):
+            chunk = shas[i:i + _QUERY_CHUNK]
+            rows = conn.execute(
+                f"SELECT sha, ext, symbols FROM symbols WHERE sha IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for sha, ext, symbols in rows:
+                found[(sha, ext)] = json.loads(symbols)
+        return {k: found[k] for k in keys if k in found}
+
+    def store(self, items: dict[tuple[str, str], list[str]]) -> None:
+        if items:
+            self._conn().executemany(
+                "INSERT OR REPLACE INTO symbols (sha, ext, symbols) VALUES (?, ?, ?)",
+                [(sha, ext, json.dumps(symbols)) for (sha, ext), symbols in items.items()],
+            )
+
+    def symbols(self, repo_dir: Path, keys: list[tuple[str, str]]) -> tuple[dict[tuple[str, str], list[str]], int]:
+        """Symbols for keys, extracting (and storing) the ones not indexed yet. Returns (symbols, newly indexed)."""
+        known = self.lookup(keys)
+        missing = [k for k in dict.fromkeys(keys) if k not in known]
+        exts: dict[str, list[str]] = {}
+        for sha, ext in missing:
+            exts.setdefault(sha, []).append(ext)
+        indexed = 0
+        for blobs in _read_blobs(repo_dir, sorted(exts)):
+            new: dict[tuple[str, str], list[str]] = {}
+            for sha, raw in blobs.items():
+                text = raw.decode("utf-8", errors="replace")
+                for ext in exts[sha]:
+                    new[(sha, ext)] = _extract_symbols(text, ext)
+            self.store(new)
+            known.update(new)
+            indexed += len(new)
+        return known, indexed
+
+    def index_tree(self, repo_dir: Path, rev: str = "HEAD") -> int:
+        """Index all source blobs of rev (warmup). Returns the number of newly indexed blobs."""
+        keys = [(sha, Path(p).suffix) for p, sha in ls_tree(repo_dir, rev) if Path(p).suffix in SOURCE_EXT]
+        return self.symbols(repo_dir, keys)[1]
+
+
+_index: SymbolIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_symbol_index() -> SymbolIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SymbolIndex(Path(get_settings().workspace_base) / INDEX_DIRNAME / "symbols.sqlite3")
+    return _index
+
+
+def build_indexed_map(work_dir: Path, rev: str = "HEAD", max_map_chars: int = 30000) -> str | None:
+    """
+    Same output as build_map for the committed tree at rev, with symbols served from the index.
+    None if work_dir is not a git checkout or its blobs can't be read (callers fall back to build_map).
+    """
+    entries = [(p, sha) for p, sha in ls_tree(Path(work_dir), rev) if is_mapped_path(Path(p))]
+    if not entries:
+        return None
+    keys_by_path = {p: (sha, Path(p).suffix) for p, sha in entries if Path(p).suffix in SOURCE_EXT}
+    try:
+        symbols, new = get_symbol_index().symbols(Path(work_dir), list(keys_by_path.values()))
+    except RuntimeError as e:
+        logger.warning("Symbol index read failed for %s, mapping from files: %s", work_dir, e)
+        return None
+    logger.debug("Indexed map for %s: %s files, %s newly indexed blobs", work_dir, len(entries), new)
+    return render_map(
+        [p for p, _ in entries],
+        lambda rel: symbols.get(keys_by_path[rel], []),
+        max_map_chars,
+    )
+
+
+def build_repo_map(work_dir: Path) -> str:
+    """Repo map for a fresh checkout: from the index when enabled, else (or outside git) by walking files."""
+    if get_settings().symbol_index_enabled:
+        indexed = build_indexed_map(work_dir)
+        if indexed is not None:
+            return indexed
+    return build_map(work_dir)
@@ -3,13 +3,22 @@ Validation and self-correction (F5.1–F5.6).
 Run repo linter and tests; format output as structured feedback for the LLM.
 """
 
+import hashlib
 import json
 import logging
-import os
-import subprocess
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import NamedTuple
 
+from ..config import get_settings
+from ..utils.deadline import remaining_timeout
+from ..utils.metrics import VALIDATION_SECONDS, span
+from ..utils.process import run_bounded
+from ..utils.sandbox import Sandbox
+from .dep_cache import prepare_dependencies
+from .git.clone import tree_hash
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,29 +31,90 @@ class ValidationResult(NamedTuple):
     test_code: int | None
     test_out: str
     test_err: str
+    cached: bool = False
+
+
+# Results memoized by (workspace tree hash, dependency cache on/off); identical trees skip re-running.
+# The tree covers the manifests, so it also fixes the detected commands and the cached dependency env.
+_result_cache: OrderedDict[tuple[str, bool], ValidationResult] = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+# Detected (lint, test) commands by (manifest digest, PATH): self-heal attempts change sources, not manifests,
+# so the tool probes (ruff / pyflakes / pytest --version) run once per manifest set and environment.
+_DETECTION_MANIFESTS = ("package.json", "pyproject.toml", "setup.cfg", "setup.py", "Makefile")
+_COMMANDS_CACHE_SIZE = 64
+_commands_cache: OrderedDict[tuple[str, str], tuple[list[str] | None, list[str] | None]] = OrderedDict()
+
+
+def _cache_get(key: tuple) -> ValidationResult | None:
+    with _result_cache_lock:
+        hit = _result_cache.get(key)
+        if hit is not None:
+            _result_cache.move_to_end(key)
+        return hit
 
 
-def _run_cmd(cwd: Path, cmd: list[str], timeout: int = 300) -> tuple[int, str, str]:
-    """Run command; return (exit_code, stdout, stderr)."""
-    try:
-        r = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            env=os.environ.copy(),
-        )
-        return r.returncode, r.stdout or "", r.stderr or ""
-    except subprocess.TimeoutExpired:
-        return -1, "", "Command timed out"
-    except FileNotFoundError:
-        return -1, "", f"Command not found: {cmd[0]}"
-    except Exception as e:
-        return -1, "", str(e)
-
-
-def _detect_commands(work_dir: Path) -> tuple[list[str] | None, list[str] | None]:
+def _cache_put(key: tuple, result: ValidationResult) -> None:
+    limit = get_settings().validation_cache_size
+    if limit <= 0:
+        return
+    with _result_cache_lock:
+        _result_cache[key] = result
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > limit:
+            _result_cache.popitem(last=False)
+
+
+def _log_path(cwd: Path, name: str | None) -> Path | None:
+    """Full command output goes under .git/ so it never shows up as a workspace change."""
+    git_dir = Path(cwd) / ".git"
+    if not name or not git_dir.is_dir():
+        return None
+    return git_dir / "agent-logs" / f"{name}.log"
+
+
+def _run_cmd(
+    cwd: Path,
+    cmd: list[str],
+    timeout: int = 300,
+    log_name: str | None = None,
+    env: dict[str, str] | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[int, str, str]:
+    """
+    Run command in a sandbox with bounded output capture; return (exit_code, stdout, stderr).
+    timeout is capped by the task's remaining budget (DeadlineExceeded propagates when it is spent).
+    """
+    timeout = remaining_timeout(timeout)
+    with span("validation", VALIDATION_SECONDS, step=log_name or "probe") as sp:
+        sp.set(command=" ".join(cmd)[:200])
+        try:
+            with Sandbox.from_settings() as sandbox:
+                sandbox_env = sandbox.env(env)
+                r = run_bounded(
+                    sandbox.wrap(cmd, sandbox_env, timeout),
+                    cwd,
+                    timeout=timeout,
+                    env=sandbox_env,
+                    max_output_bytes=get_settings().validation_output_max_bytes,
+                    log_path=_log_path(cwd, log_name),
+                    cancel=cancel,
+                )
+            sp.set(exit_code=r.returncode)
+            if r.returncode != 0:
+                sp.outcome = "error"
+            return r.returncode, r.stdout, r.stderr
+        except FileNotFoundError:
+            sp.outcome = "error"
+            return -1, "", f"Command not found: {cmd[0]}"
+        except Exception as e:
+            sp.outcome = "error"
+            return -1, "", str(e)
+
+
+def _detect_commands(
+    work_dir: Path, env: dict[str, str] | None = None
+) -> tuple[list[str] | None, list[str] | None]:
     """
     Detect lint and test commands by convention (F5.1, F5.2).
     Returns (lint_cmd, test_cmd); each is argv or None if not detected.
@@ -78,14 +148,14 @@ def _detect_commands(work_dir: Path) -> tuple[list[str] | None, list[str] | None
         lint_cmd = None
         if (work_dir / "pyproject.toml").is_file():
             lint_cmd = ["ruff", "check", "."]
-            code, _, _ = _run_cmd(work_dir, ["ruff", "--version"], timeout=5)
+            code, _, _ = _run_cmd(work_dir, ["ruff", "--version"], timeout=5, env=env)
             if code != 0:
                 lint_cmd = ["python", "-m", "pyflakes", "."]
-                code2, _, _ = _run_cmd(work_dir, ["python", "-m", "pyflakes", "--version"], timeout=5)
+                code2, _, _ = _run_cmd(work_dir, ["python", "-m", "pyflakes", "--version"], timeout=5, env=env)
                 if code2 != 0:
                     lint_cmd = None
         test_cmd = ["python", "-m", "pytest", "-v", "--tb=short"]
-        code, _, _ = _run_cmd(work_dir, ["python", "-m", "pytest", "--version"], timeout=5)
+        code, _, _ = _run_cmd(work_dir, ["python", "-m", "pytest", "--version"], timeout=5, env=env)
         if code != 0:
             test_cmd = ["python", "-m", "unittest", "discover", "-v"]
         return lint_cmd, test_cmd
@@ -105,23 +175,74 @@ def _detect_commands(work_dir: Path) -> tuple[list[str] | None, list[str] | None
     return None, None
 
 
-def run_validation(work_dir: Path, timeout: int = 300) -> ValidationResult:
+def _manifest_digest(work_dir: Path) -> str:
+    h = hashlib.sha256()
+    for name in _DETECTION_MANIFESTS:
+        path = work_dir / name
+        h.update(name.encode() + b"\0")
+        h.update(path.read_bytes() if path.is_file() else b"\1missing")
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _commands_for(work_dir: Path, env: dict[str, str]) -> tuple[list[str] | None, list[str] | None]:
+    """_detect_commands, memoized by manifest contents and the PATH the probes ran with."""
+    key = (_manifest_digest(work_dir), env.get("PATH", ""))
+    with _result_cache_lock:
+        hit = _commands_cache.get(key)
+        if hit is not None:
+            _commands_cache.move_to_end(key)
+            return hit
+    commands = _detect_commands(work_dir, env=env)
+    with _result_cache_lock:
+        _commands_cache[key] = commands
+        while len(_commands_cache) > _COMMANDS_CACHE_SIZE:
+            _commands_cache.popitem(last=False)
+    return commands
+
+
+def run_validation(
+    work_dir: Path,
+    timeout: int = 300,
+    tree: str | None = None,
+    cancel: threading.Event | None = None,
+) -> ValidationResult:
     """
     Run linter and tests; return success and formatted feedback (F5.1, F5.2, F5.3).
     Success only when both lint and test pass (or are skipped).
+    Results are cached by workspace tree hash (pass tree if already computed); a cache hit is returned
+    with cached=True without running anything, dependency setup and command detection included.
+    Setting cancel kills the running command (result then reports exit code -1).
     """
     work_dir = Path(work_dir)
-    lint_cmd, test_cmd = _detect_commands(work_dir)
+    settings = get_settings()
+    cache_key = None
+    if settings.validation_cache_size > 0:
+        tree = tree or tree_hash(work_dir)
+        if tree:
+            cache_key = (tree, settings.dep_cache_enabled)
+            hit = _cache_get(cache_key)
+            if hit is not None:
+                logger.info("Validation cache hit for tree %s (success=%s)", tree[:12], hit.success)
+                return hit._replace(cached=True)
+
+    env: dict[str, str] = {}
+    if settings.dep_cache_enabled:
+        try:
+            env = prepare_dependencies(work_dir)
+        except Exception as e:
+            logger.warning("Dependency environment unavailable, validating with host tools: %s", e)
+    lint_cmd, test_cmd = _commands_for(work_dir, env)
 
     linter_code, linter_out, linter_err = None, "", ""
     if lint_cmd:
-        linter_code, linter_out, linter_err = _run_cmd(work_dir, lint_cmd, timeout=timeout)
+        linter_code, linter_out, linter_err = _run_cmd(work_dir, lint_cmd, timeout=timeout, log_name="lint", env=env, cancel=cancel)
     else:
         logger.debug("No linter command detected; skipping lint")
 
     test_code, test_out, test_err = None, "", ""
     if test_cmd:
-        test_code, test_out, test_err = _run_cmd(work_dir, test_cmd, timeout=timeout)
+        test_code, test_out, test_err = _run_cmd(work_dir, test_cmd, timeout=timeout, log_name="test", env=env, cancel=cancel)
     else:
         logger.debug("No test command detected; skipping tests")
 
@@ -135,7 +256,7 @@ def run_validation(work_dir: Path, timeout: int = 300) -> ValidationResult:
         test_code, test_out, test_err,
         lint_cmd, test_cmd,
     )
-    return ValidationResult(
+    result = ValidationResult(
         success=success,
         feedback=feedback,
         linter_code=linter_code,
@@ -145,6 +266,10 @@ def run_validation(work_dir: Path, timeout: int = 300) -> ValidationResult:
         test_out=test_out,
         test_err=test_err,
     )
+    # -1 means timeout / could not run: not a property of the tree, so don't memoize it.
+    if cache_key is not None and -1 not in (linter_code, test_code):
+        _cache_put(cache_key, result)
+    return result
 
 
 def _format_feedback(
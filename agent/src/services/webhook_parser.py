@@ -1,11 +1,13 @@
 """
-Webhook payload parsing (F1.2, F1.3).
-Supports GitHub/GitLab issue-assignment style payloads and generic JSON body + headers.
+Webhook payload parsing (F1.2, F1.3, F7.1).
+Supports GitHub/GitLab issue-assignment style payloads and generic JSON body + headers,
+PR/MR comment payloads (GitHub issue_comment / pull_request_review_comment, GitLab note) and push events.
 """
 
 import logging
 from typing import Any
 
+from ..models.events import PRCommentPayload, PushEvent
 from ..models.task import GitProvider, WebhookTaskPayload
 
 logger = logging.getLogger(__name__)
@@ -142,3 +144,124 @@ def parse_task_payload(
         parsed.repo_full_name = repo_full
 
     return parsed
+
+
+def _split_repo(full_name: str) -> tuple[str, str]:
+    parts = full_name.split("/", 1)
+    return (parts[0], parts[1]) if len(parts) > 1 else ("", parts[0])
+
+
+def parse_github_comment(body: dict[str, Any]) -> PRCommentPayload | None:
+    """
+    Parse GitHub issue_comment (on a PR) or pull_request_review_comment.
+    issue_comment carries no head branch; pr_branch is then empty and resolved from the API later.
+    """
+    comment = body.get("comment") or {}
+    repo = body.get("repository") or {}
+    pr = body.get("pull_request")
+    issue = body.get("issue") or {}
+    if not comment or not (pr or issue.get("pull_request")):
+        return None
+    pr = pr or issue
+    repo_full = _safe_str(repo.get("full_name"))
+    owner, name = _split_repo(repo_full)
+    line = comment.get("line") or comment.get("original_line")
+    return PRCommentPayload(
+        provider="github",
+        repo_owner=owner,
+        repo_name=name,
+        repo_full_name=repo_full,
+        pr_number=int(pr.get("number") or 0),
+        comment_id=comment.get("id") or "",
+        comment_body=comment.get("body") or "",
+        comment_author=_safe_str((comment.get("user") or {}).get("login")),
+        pr_author=_safe_str((pr.get("user") or {}).get("login")),
+        pr_branch=_safe_str((pr.get("head") or {}).get("ref")),
+        pr_base_branch=_safe_str((pr.get("base") or {}).get("ref")) or _safe_str(repo.get("default_branch")) or "main",
+        file_path=comment.get("path") or None,
+        line_number=int(line) if line else None,
+        raw=body,
+    )
+
+
+def parse_gitlab_note(body: dict[str, Any]) -> PRCommentPayload | None:
+    """Parse GitLab note hook on a merge request. pr_author is unknown (hook only has author_id)."""
+    attrs = body.get("object_attributes") or {}
+    mr = body.get("merge_request") or {}
+    project = body.get("project") or {}
+    if body.get("object_kind") != "note" or attrs.get("noteable_type") != "MergeRequest" or not mr:
+        return None
+    path = _safe_str(project.get("path_with_namespace"))
+    owner, name = _split_repo(path)
+    position = attrs.get("position") or {}
+    line = position.get("new_line") or position.get("old_line")
+    return PRCommentPayload(
+        provider="gitlab",
+        repo_owner=owner,
+        repo_name=name,
+        repo_full_name=path,
+        pr_number=int(mr.get("iid") or 0),
+        comment_id=attrs.get("id") or "",
+        comment_body=attrs.get("note") or "",
+        comment_author=_safe_str((body.get("user") or {}).get("username")),
+        pr_branch=_safe_str(mr.get("source_branch")),
+        pr_base_branch=_safe_str(mr.get("target_branch")) or _safe_str(project.get("default_branch")) or "main",
+        file_path=position.get("new_path") or position.get("old_path") or None,
+        line_number=int(line) if line else None,
+        raw=body,
+    )
+
+
+def parse_pr_comment_payload(
+    body: dict[str, Any],
+    provider_header: str | None = None,
+    repo_header: str | None = None,
+) -> PRCommentPayload | None:
+    """Parse a PR/MR comment webhook (F7.1). Returns None for other events (e.g. comments on plain issues)."""
+    provider = (provider_header or "").strip().lower() or None
+    if provider == "github":
+        parsed = parse_github_comment(body)
+    elif provider == "gitlab":
+        parsed = parse_gitlab_note(body)
+    else:
+        parsed = parse_github_comment(body) or parse_gitlab_note(body)
+    if not parsed or not parsed.pr_number:
+        return None
+
+    repo_full = (repo_header or "").strip()
+    if repo_full and "/" in repo_full:
+        parsed.repo_owner, parsed.repo_name = _split_repo(repo_full)
+        parsed.repo_full_name = repo_full
+    return parsed
+
+
+def parse_push_payload(body: dict[str, Any], provider_header: str | None = None) -> PushEvent | None:
+    """Parse a GitHub push or GitLab push hook. None for tag pushes and other events."""
+    ref = _safe_str(body.get("ref"))
+    if not ref.startswith("refs/heads/"):
+        return None
+    provider = (provider_header or "").strip().lower() or None
+    if provider == "gitlab" or (not provider and body.get("object_kind") == "push"):
+        project = body.get("project") or {}
+        full = _safe_str(project.get("path_with_namespace"))
+        default_branch = _safe_str(project.get("default_branch"))
+        after = _safe_str(body.get("checkout_sha") or body.get("after"))
+        provider = "gitlab"
+    else:
+        repo = body.get("repository") or {}
+        full = _safe_str(repo.get("full_name"))
+        default_branch = _safe_str(repo.get("default_branch") or repo.get("master_branch"))
+        after = _safe_str(body.get("after"))
+        provider = "github"
+    if "/" not in full:
+        return None
+    owner, name = _split_repo(full)
+    return PushEvent(
+        provider=provider,
+        repo_owner=owner,
+        repo_name=name,
+        repo_full_name=full,
+        branch=ref[len("refs/heads/"):],
+        default_branch=default_branch,
+        after=after,
+    )
@@ -1,10 +1,26 @@
-"""Utilities: logging, idempotency."""
+"""Utilities: logging, idempotency, task progress."""
 
-from .logging import configure_logging
-from .idempotency import idempotency_check, idempotency_release
+from .logging import configure_logging, log_context
+from .idempotency import (
+    idempotency_acquire,
+    idempotency_check,
+    idempotency_release,
+    idempotency_renew,
+    lease_heartbeat,
+    async_lease_heartbeat,
+)
+from .progress import ProgressReporter, current_reporter, get_progress_store
 
 __all__ = [
     "configure_logging",
+    "log_context",
+    "idempotency_acquire",
     "idempotency_check",
     "idempotency_release",
+    "idempotency_renew",
+    "lease_heartbeat",
+    "async_lease_heartbeat",
+    "ProgressReporter",
+    "current_reporter",
+    "get_progress_store",
 ]
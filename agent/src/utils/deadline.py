@@ -0,0 +1,78 @@
+"""
+Per-task wall-clock deadline (task_timeout_seconds).
+run_pipeline activates a Deadline for the run; it follows the run into the stage pools (contextvars),
+every stage checks it on entry, and git / LLM / validation calls take their timeout from the remaining
+budget, so work still running when time is up is killed instead of holding a worker.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+class DeadlineExceeded(Exception):
+    """The task's deadline passed; the run ends as timed_out."""
+
+
+class Deadline:
+    """Absolute monotonic deadline with a cancel event set once it is found expired."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.cancel = threading.Event()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        if self.remaining() <= 0:
+            self.cancel.set()
+        return self.cancel.is_set()
+
+    def check(self, stage: str | None = None) -> None:
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if self.expired():
+            where = f" before {stage}" if stage else ""
+            raise DeadlineExceeded(f"Task deadline of {self.seconds:g}s exceeded{where}")
+
+    def timeout(self, cap: float) -> float:
+        """Timeout for one operation: the remaining budget, at most cap. Raises if nothing is left."""
+        self.check()
+        return min(cap, self.remaining())
+
+    @contextmanager
+    def activate(self) -> Iterator["Deadline"]:
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+_current: ContextVar[Deadline | None] = ContextVar("task_deadline", default=None)
+
+
+def check_deadline(stage: str | None = None) -> None:
+    """Raise DeadlineExceeded if the current task's deadline has passed (no-op outside a task)."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def remaining_timeout(cap: float) -> float:
+    """cap, limited to the current task's remaining budget (cap outside a task). Raises DeadlineExceeded when spent."""
+    deadline = _current.get()
+    return cap if deadline is None else deadline.timeout(cap)
+
+
+@contextmanager
+def deadline_suspended() -> Iterator[None]:
+    """Run without the task deadline: workspace cleanup must still happen after the budget is spent."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
@@ -1,21 +1,179 @@
 """
 Idempotency for webhook handling (F1.6).
-Memory backend: in-process set. Redis: use key = f"task:{ticket_id}:{repo_full_name}".
+Lease-based lock per key = f"task:{ticket_id}:{repo_full_name}": acquire with an owner token and TTL,
+renew by heartbeat while the pipeline runs, release only if the token still owns the lease.
+Memory backend: in-process dict (single instance). Redis backend: SET NX PX + compare-and-delete,
+so several agent replicas can share one lock space.
 """
 
+import asyncio
 import logging
-from typing import Callable
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterator
 
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
-# In-memory set of (ticket_id, repo_full_name) currently being processed
-_in_progress: set[tuple[str, str]] = set()
+_RELEASE_LUA = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_RENEW_LUA = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class IdempotencyBackend(ABC):
+    """Lease store: a key is held by one owner token until released or its TTL lapses."""
+
+    @abstractmethod
+    def acquire(self, key: str, token: str, ttl_ms: int) -> bool:
+        """Take the lease if free (or expired). Returns True if token now owns it."""
+        ...
+
+    @abstractmethod
+    def renew(self, key: str, token: str, ttl_ms: int) -> bool:
+        """Extend the lease if token still owns it."""
+        ...
+
+    @abstractmethod
+    def release(self, key: str, token: str) -> bool:
+        """Delete the lease if token still owns it."""
+        ...
+
+    @abstractmethod
+    def is_held(self, key: str) -> bool:
+        """True if some owner currently holds an unexpired lease."""
+        ...
+
+
+class MemoryIdempotencyBackend(IdempotencyBackend):
+    """In-process leases (thread-safe, with expiry). Only deduplicates within one process."""
+
+    def __init__(self) -> None:
+        self._leases: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> tuple[str, float] | None:
+        lease = self._leases.get(key)
+        if lease is not None and lease[1] <= time.monotonic():
+            del self._leases[key]
+            return None
+        return lease
+
+    def acquire(self, key: str, token: str, ttl_ms: int) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._leases[key] = (token, time.monotonic() + ttl_ms / 1000)
+            return True
+
+    def renew(self, key: str, token: str, ttl_ms: int) -> bool:
+        with self._lock:
+            lease = self._live(key)
+            if lease is None or lease[0] != token:
+                return False
+            self._leases[key] = (token, time.monotonic() + ttl_ms / 1000)
+            return True
+
+    def release(self, key: str, token: str) -> bool:
+        with self._lock:
+            lease = self._live(key)
+            if lease is None or lease[0] != token:
+                return False
+            del self._leases[key]
+            return True
+
+    def is_held(self, key: str) -> bool:
+        with self._lock:
+            return self._live(key) is not None
+
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """Redis leases. Pass client= to use an existing connection (or a fakeredis instance in tests)."""
+
+    def __init__(self, url: str | None = None, client: Any = None) -> None:
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("Install redis: pip install redis") from e
+            client = redis.Redis.from_url(url or get_settings().redis_url)
+        self._client = client
+        self._release = client.register_script(_RELEASE_LUA)
+        self._renew = client.register_script(_RENEW_LUA)
+
+    def acquire(self, key: str, token: str, ttl_ms: int) -> bool:
+        return bool(self._client.set(key, token, nx=True, px=ttl_ms))
+
+    def renew(self, key: str, token: str, ttl_ms: int) -> bool:
+        return bool(self._renew(keys=[key], args=[token, ttl_ms]))
+
+    def release(self, key: str, token: str) -> bool:
+        return bool(self._release(keys=[key], args=[token]))
+
+    def is_held(self, key: str) -> bool:
+        return bool(self._client.exists(key))
+
 
+_backend: IdempotencyBackend | None = None
+_backend_lock = threading.Lock()
+# Tokens of leases acquired through idempotency_check in this process (for token-less release).
+# Read and changed from request, heartbeat and worker threads.
+_local_tokens: dict[str, str] = {}
+_local_tokens_lock = threading.Lock()
 
-def _key(ticket_id: str, repo_full_name: str) -> tuple[str, str]:
-    return (ticket_id.strip(), repo_full_name.strip())
+
+def get_backend() -> IdempotencyBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if get_settings().idempotency_backend == "redis":
+                    _backend = RedisIdempotencyBackend()
+                else:
+                    _backend = MemoryIdempotencyBackend()
+    return _backend
+
+
+def set_backend(backend: IdempotencyBackend | None) -> None:
+    """Override the backend (e.g. RedisIdempotencyBackend(client=fakeredis.FakeRedis())); None resets."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    with _local_tokens_lock:
+        _local_tokens.clear()
+
+
+def _key(ticket_id: str, repo_full_name: str) -> str:
+    return f"task:{ticket_id.strip()}:{repo_full_name.strip()}"
+
+
+def _ttl_ms() -> int:
+    return get_settings().idempotency_lease_ttl_seconds * 1000
+
+
+def idempotency_acquire(ticket_id: str, repo_full_name: str) -> str | None:
+    """
+    Take the lease for this task. Returns the owner token, or None if already in progress.
+    The owner must keep it alive (lease_heartbeat) and pass the token to idempotency_release.
+    """
+    token = uuid.uuid4().hex
+    if not get_backend().acquire(_key(ticket_id, repo_full_name), token, _ttl_ms()):
+        logger.info("Idempotency: task already in progress ticket_id=%s repo=%s", ticket_id, repo_full_name)
+        return None
+    return token
 
 
 def idempotency_check(ticket_id: str, repo_full_name: str) -> bool:
@@ -23,19 +181,82 @@ def idempotency_check(ticket_id: str, repo_full_name: str) -> bool:
     Return True if this task can proceed (not already in progress).
     If True, caller should call idempotency_release when done.
     """
-    settings = get_settings()
-    if settings.idempotency_backend == "redis":
-        # TODO: Redis GET/SET with NX and TTL (e.g. task_timeout_seconds)
-        logger.warning("Redis idempotency not implemented; using memory")
-    k = _key(ticket_id, repo_full_name)
-    if k in _in_progress:
-        logger.info("Idempotency: task already in progress ticket_id=%s repo=%s", ticket_id, repo_full_name)
+    token = idempotency_acquire(ticket_id, repo_full_name)
+    if token is None:
         return False
-    _in_progress.add(k)
+    with _local_tokens_lock:
+        _local_tokens[_key(ticket_id, repo_full_name)] = token
     return True
 
 
-def idempotency_release(ticket_id: str, repo_full_name: str) -> None:
-    """Release idempotency lock after task completion (success or failure)."""
+def idempotency_renew(ticket_id: str, repo_full_name: str, token: str) -> bool:
+    """Extend the lease; False means it expired or was taken over."""
+    return get_backend().renew(_key(ticket_id, repo_full_name), token, _ttl_ms())
+
+
+def idempotency_release(ticket_id: str, repo_full_name: str, token: str | None = None) -> None:
+    """Release idempotency lock after task completion (success or failure). No-op if token no longer owns it."""
     k = _key(ticket_id, repo_full_name)
-    _in_progress.discard(k)
+    with _local_tokens_lock:
+        token = token or _local_tokens.get(k)
+        if token is not None and _local_tokens.get(k) == token:
+            del _local_tokens[k]
+    if token is None:
+        return
+    try:
+        if not get_backend().release(k, token):
+            logger.warning("Idempotency lease for %s expired or was taken over before release", k)
+    except Exception as e:
+        logger.warning("Idempotency release failed for %s (lease will expire): %s", k, e)
+
+
+@contextmanager
+def lease_heartbeat(ticket_id: str, repo_full_name: str, token: str | None) -> Iterator[None]:
+    """Renew the lease every ttl/3 while the block runs, so a live run never loses it and a dead one frees it."""
+    if token is None:
+        yield
+        return
+    stop = threading.Event()
+    interval = max(1.0, get_settings().idempotency_lease_ttl_seconds / 3)
+
+    def beat() -> None:
+        while not stop.wait(interval):
+            try:
+                if not idempotency_renew(ticket_id, repo_full_name, token):
+                    logger.warning("[%s] Idempotency lease lost for %s", ticket_id, repo_full_name)
+                    return
+            except Exception as e:
+                logger.warning("[%s] Idempotency lease renewal failed: %s", ticket_id, e)
+
+    t = threading.Thread(target=beat, name=f"lease-{ticket_id}", daemon=True)
+    t.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        t.join(timeout=5)
+
+
+@asynccontextmanager
+async def async_lease_heartbeat(ticket_id: str, repo_full_name: str, token: str | None) -> AsyncIterator[None]:
+    """lease_heartbeat for the asyncio pipeline: renewals run as a task on the loop instead of a thread per run."""
+    if token is None:
+        yield
+        return
+    interval = max(1.0, get_settings().idempotency_lease_ttl_seconds / 3)
+
+    async def beat() -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await asyncio.to_thread(idempotency_renew, ticket_id, repo_full_name, token):
+                    logger.warning("[%s] Idempotency lease lost for %s", ticket_id, repo_full_name)
+                    return
+            except Exception as e:
+                logger.warning("[%s] Idempotency lease renewal failed: %s", ticket_id, e)
+
+    t = asyncio.create_task(beat(), name=f"lease-{ticket_id}")
+    try:
+        yield
+    finally:
+        t.cancel()
@@ -1,24 +1,144 @@
-"""Structured logging setup."""
+"""
+Structured logging setup. Handlers only enqueue records; a QueueListener thread formats them and writes
+stdout, so a slow or blocked stdout never stalls a worker thread or the event loop. When the queue is full
+records are dropped (agent_log_records_dropped_total) rather than waiting.
+Records carry task_id (ticket), run_id and stage from log_context(); LOG_FORMAT=json writes one object per line.
+"""
 
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
-from typing import Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Iterator
 
+from .metrics import counter
 
-def configure_logging(level: str = "INFO", debug: bool = False) -> None:
-    """Configure root logger and format."""
+DATEFMT = "%Y-%m-%dT%H:%M:%S"
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+CONTEXT_FIELDS = ("task_id", "run_id", "stage")
+_BASE_KEYS = frozenset(("time", "level", "logger", "message", "thread", "exc_info", "stack_info"))
+
+LOG_RECORDS_DROPPED = counter(
+    "agent_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+_context: ContextVar[dict[str, Any]] = ContextVar("log_context", default={})
+_listener: QueueListener | None = None
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Attach fields (task_id, run_id, stage) to records logged in this block, including from stage pools."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context fields and log_task kwargs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        doc: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": getattr(record, "event", None) or record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                doc[key] = value
+        fields = getattr(record, "fields", None) or {}
+        doc.update({k: v for k, v in fields.items() if k not in _BASE_KEYS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            doc["exc_info"] = record.exc_text
+        if record.stack_info:
+            doc["stack_info"] = record.stack_info
+        return json.dumps(doc, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    """Enqueues without blocking; resolves message, exception text and log_context() in the caller's context."""
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(q)
+        self._exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None  # tracebacks hold frames; don't ship them to another thread
+        for key, value in _context.get().items():
+            if getattr(record, key, None) is None:
+                setattr(record, key, value)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # flushes what is queued
+        _listener = None
+
+
+def configure_logging(
+    level: str = "INFO", debug: bool = False, log_format: str = "text", queue_size: int = 10000
+) -> None:
+    """Configure the root logger: a non-blocking queue handler feeding a stdout writer thread."""
+    global _listener
     log_level = logging.DEBUG if debug else getattr(logging, level.upper(), logging.INFO)
-    fmt = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-    logging.basicConfig(
-        level=log_level,
-        format=fmt,
-        datefmt="%Y-%m-%dT%H:%M:%S",
-        stream=sys.stdout,
-        force=True,
+    formatter: logging.Formatter = (
+        JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT, datefmt=DATEFMT)
     )
+    _stop_listener()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(formatter)
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(max(queue_size, 0))
+    _listener = QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_QueueHandler(records))
+    root.setLevel(log_level)
+    # uvicorn installs its own synchronous stream handlers; send its records through the queue too.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uv = logging.getLogger(name)
+        uv.handlers.clear()
+        uv.propagate = True
+
+
+atexit.register(_stop_listener)
 
 
 def log_task(logger: logging.Logger, task_id: str, message: str, **kwargs: Any) -> None:
-    """Log with task_id for traceability."""
+    """Log with task_id for traceability; kwargs become JSON fields (and key=value pairs in text output)."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     extra = " | ".join(f"{k}={v}" for k, v in kwargs.items()) if kwargs else ""
-    logger.info("[%s] %s %s", task_id, message, extra)
+    fields = {"task_id": task_id, "event": message, "fields": kwargs}
+    if "run_id" in kwargs:
+        fields["run_id"] = kwargs["run_id"]
+    logger.info("[%s] %s %s", task_id, message, extra, extra=fields)
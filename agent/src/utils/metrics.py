@@ -0,0 +1,293 @@
+"""
+Metrics and tracing: in-process counters / histograms exported in Prometheus text format on GET /api/metrics,
+and spans around pipeline stages, LLM calls, git and validation subprocesses.
+span() times a block into a histogram (labelled outcome=ok|error); with OTEL_TRACES_ENABLED=true it also
+emits an OpenTelemetry span (OTLP/HTTP, configured by the standard OTEL_EXPORTER_OTLP_* env vars). Spans
+nest through contextvars, which the stage pools copy, so one trace covers a whole run.
+Metrics are per process: run standalone workers with WORKER_METRICS_PORT to scrape them too.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; stages and test runs span milliseconds to many minutes.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value read at scrape time from a callback returning {label values: value}."""
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...], collect: Callable[[], dict[tuple[str, ...], float]]
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self._collect = collect
+
+    def _samples(self) -> list[str]:
+        try:
+            items = sorted(self._collect().items())
+        except Exception as e:
+            logger.debug("Gauge %s collect failed: %s", self.name, e)
+            return []
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], list[float]] = {}  # bucket counts..., count, sum
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip((*self.buckets, math.inf), (*series[: len(self.buckets)], series[-2])):
+                le = f'le="{_num(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_num(count)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_num(series[-2])}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(series[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+def counter(name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    return _registry.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+) -> Histogram:
+    return _registry.register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+
+def gauge(
+    name: str, help: str, labelnames: tuple[str, ...], collect: Callable[[], dict[tuple[str, ...], float]]
+) -> Gauge:
+    return _registry.register(Gauge(name, help, labelnames, collect))  # type: ignore[return-value]
+
+
+def render_metrics() -> str:
+    return _registry.render()
+
+
+# ----- Pipeline metrics -----
+STAGE_SECONDS = histogram("agent_stage_duration_seconds", "Pipeline stage duration", ("stage", "outcome"))
+TASKS = counter("agent_tasks_total", "Pipeline runs by final (or hand-off) state", ("state",))
+LLM_SECONDS = histogram("agent_llm_request_duration_seconds", "Anthropic messages.create latency", ("model", "outcome"))
+LLM_TOKENS = counter("agent_llm_tokens_total", "LLM tokens", ("model", "direction"))
+LLM_REQUESTS = counter("agent_llm_requests_total", "LLM responses by stop reason", ("model", "stop_reason"))
+GIT_SECONDS = histogram("agent_git_command_duration_seconds", "git subprocess duration", ("command", "outcome"))
+VALIDATION_SECONDS = histogram(
+    "agent_validation_command_duration_seconds", "Lint / test / probe command duration", ("step", "outcome")
+)
+
+
+# ----- Spans -----
+_tracer: Any = None
+_tracer_resolved = False
+_tracer_lock = threading.Lock()
+
+
+def _otel_tracer() -> Any:
+    """
+    OpenTelemetry tracer with an OTLP/HTTP batch exporter, or None when OTEL_TRACES_ENABLED is off.
+    Resolved once per process: span() wraps every git call, so later calls are a global read. If the
+    opentelemetry packages are missing, tracing is disabled with one warning instead of failing every span.
+    """
+    global _tracer, _tracer_resolved
+    if _tracer_resolved:
+        return _tracer
+    with _tracer_lock:
+        if _tracer_resolved:
+            return _tracer
+        settings = get_settings()
+        if settings.otel_traces_enabled:
+            try:
+                from opentelemetry import trace
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            except ImportError as e:
+                logger.warning(
+                    "OTEL_TRACES_ENABLED is set but opentelemetry is not installed (%s); tracing disabled. "
+                    "Install opentelemetry: pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http",
+                    e,
+                )
+            else:
+                provider = TracerProvider(resource=Resource.create({"service.name": settings.otel_service_name}))
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+                trace.set_tracer_provider(provider)
+                _tracer = trace.get_tracer("ai-dev-agent")
+        _tracer_resolved = True
+        return _tracer
+
+
+class Span:
+    """
+    Handle yielded by span(): attributes go to the OpenTelemetry span (not to metric labels).
+    outcome is "error" if the block raised; set it for failures reported by return value (exit codes).
+    """
+
+    def __init__(self, otel_span: Any = None) -> None:
+        self._otel = otel_span
+        self.attributes: dict[str, Any] = {}
+        self.outcome = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+        if self._otel is not None:
+            for k, v in attributes.items():
+                if v is not None:
+                    self._otel.set_attribute(k, v if isinstance(v, (str, bool, int, float)) else str(v))
+
+
+@contextmanager
+def span(name: str, metric: Histogram | None = None, **labels: Any) -> Iterator[Span]:
+    """Time a block: observe metric with labels + outcome, and emit an OpenTelemetry span when enabled."""
+    tracer = _otel_tracer()
+    with tracer.start_as_current_span(name) if tracer is not None else nullcontext() as otel_span:
+        handle = Span(otel_span)
+        handle.set(**labels)
+        started = time.perf_counter()
+        try:
+            yield handle
+        except BaseException:
+            handle.outcome = "error"
+            raise
+        finally:
+            if metric is not None:
+                metric.observe(time.perf_counter() - started, **labels, outcome=handle.outcome)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("metrics: " + format, *args)
+
+
+def start_metrics_server(port: int, stop: threading.Event) -> threading.Thread:
+    """Serve /metrics on port (standalone workers, which have no API)."""
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics", daemon=True)
+    thread.start()
+    threading.Thread(target=lambda: (stop.wait(), server.shutdown()), name="metrics-stop", daemon=True).start()
+    logger.info("Serving metrics on :%s/metrics", port)
+    return thread
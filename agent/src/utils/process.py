@@ -0,0 +1,185 @@
+"""
+Bounded subprocess runner for validation commands (F5.1, F5.2).
+Streams stdout/stderr into head + tail buffers with a byte cap; full output is spilled to a log file.
+On timeout the whole process group is killed and partial output is kept.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import IO, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 8192
+
+
+class ProcessResult(NamedTuple):
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool
+    stdout_bytes: int
+    stderr_bytes: int
+    cancelled: bool = False
+
+
+class BoundedBuffer:
+    """Keep the first head_bytes and last tail_bytes of a stream; count what was dropped in between."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.head_limit = max(0, max_bytes // 2)
+        self.tail_limit = max(0, max_bytes - self.head_limit)
+        self._head = bytearray()
+        self._tail: deque[bytes] = deque()
+        self._tail_size = 0
+        self.total = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head.extend(chunk[:room])
+            chunk = chunk[room:]
+        if not chunk or self.tail_limit == 0:
+            return
+        self._tail.append(chunk)
+        self._tail_size += len(chunk)
+        while self._tail and self._tail_size - len(self._tail[0]) >= self.tail_limit:
+            self._tail_size -= len(self._tail.popleft())
+
+    def getvalue(self) -> str:
+        tail = b"".join(self._tail)
+        if len(tail) > self.tail_limit:
+            tail = tail[-self.tail_limit:]
+        omitted = self.total - len(self._head) - len(tail)
+        head_text = self._head.decode("utf-8", errors="replace")
+        tail_text = tail.decode("utf-8", errors="replace")
+        if omitted > 0:
+            return f"{head_text}\n... ({omitted} bytes omitted) ...\n{tail_text}"
+        return head_text + tail_text
+
+
+def _pump(stream: IO[bytes], buf: BoundedBuffer, log: IO[bytes] | None, log_lock: threading.Lock) -> None:
+    try:
+        for chunk in iter(lambda: stream.read1(_CHUNK_SIZE), b""):
+            buf.write(chunk)
+            if log is not None:
+                with log_lock:
+                    log.write(chunk)
+    except (OSError, ValueError) as e:
+        logger.debug("Output pump stopped: %s", e)
+    finally:
+        stream.close()
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+
+
+def run_bounded(
+    cmd: list[str],
+    cwd: Path,
+    *,
+    timeout: float = 300,
+    env: dict[str, str] | None = None,
+    max_output_bytes: int = 8000,
+    log_path: Path | None = None,
+    cancel: threading.Event | None = None,
+) -> ProcessResult:
+    """
+    Run cmd in its own process group, keeping at most max_output_bytes of each stream in memory.
+    If log_path is set, the full interleaved output is written there.
+    If cancel is set while the command runs, the process group is killed the same way as on timeout.
+    On timeout, kill the process group and return exit code -1 with the partial output.
+    """
+    out_buf = BoundedBuffer(max_output_bytes)
+    err_buf = BoundedBuffer(max_output_bytes)
+    log: IO[bytes] | None = None
+    if log_path is not None:
+        try:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            log = open(log_path, "wb")
+        except OSError as e:
+            logger.debug("Cannot open output log %s: %s", log_path, e)
+            log = None
+    log_lock = threading.Lock()
+
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            start_new_session=True,
+        )
+    except BaseException:
+        if log is not None:
+            log.close()
+        raise
+
+    pumps = [
+        threading.Thread(target=_pump, args=(proc.stdout, out_buf, log, log_lock), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, err_buf, log, log_lock), daemon=True),
+    ]
+    for t in pumps:
+        t.start()
+
+    timed_out = False
+    cancelled = False
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                proc.wait(timeout=max(0.0, min(remaining, 0.2 if cancel is not None else remaining)))
+                break
+            except subprocess.TimeoutExpired:
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    logger.info("Command cancelled; killing process group: %s", " ".join(cmd))
+                elif time.monotonic() >= deadline:
+                    timed_out = True
+                    logger.warning("Command timed out after %ss; killing process group: %s", timeout, " ".join(cmd))
+                else:
+                    continue
+                _kill_group(proc)
+                proc.wait()
+                break
+    finally:
+        # Background grandchildren may still hold the pipes open: reap the group, don't wait forever.
+        join_deadline = time.monotonic() + 1
+        for t in pumps:
+            t.join(timeout=max(0.0, join_deadline - time.monotonic()))
+        if any(t.is_alive() for t in pumps):
+            _kill_group(proc)
+            for t in pumps:
+                t.join(timeout=5)
+        if log is not None:
+            with log_lock:
+                log.close()
+
+    stderr = err_buf.getvalue()
+    if timed_out:
+        stderr = (stderr + "\n" if stderr else "") + f"Command timed out after {timeout}s"
+    elif cancelled:
+        stderr = (stderr + "\n" if stderr else "") + "Command cancelled"
+    return ProcessResult(
+        returncode=-1 if timed_out or cancelled else proc.returncode,
+        stdout=out_buf.getvalue(),
+        stderr=stderr,
+        timed_out=timed_out,
+        stdout_bytes=out_buf.total,
+        stderr_bytes=err_buf.total,
+        cancelled=cancelled,
+    )
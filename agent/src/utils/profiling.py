@@ -0,0 +1,267 @@
+"""
+Opt-in per-task profiling: for runs with PROFILING_ENABLED, the PROFILING_LABEL ticket label or the
+X-Agent-Profile webhook header (task.profile), each pipeline stage records
+- cProfile stats of the stage's thread and of every stage-pool call made on its behalf (merged per stage),
+- tracemalloc: traced memory and peak during the stage, and the top allocation sites it added,
+- resource.getrusage: CPU of this process and of reaped child processes (git, lint, tests), and the
+  children's peak RSS.
+Artifacts go to <profiles dir>/<time>-<ticket>-<task_id>/: one <n>-<stage>.prof per stage (pstats format:
+`python -m pstats`, snakeviz) and summary.json. Only the newest PROFILES_KEEP runs are kept.
+tracemalloc and rusage are process-wide, so runs overlapping a profiled one add to its memory and CPU numbers.
+In the asyncio pipeline only pool calls are cProfiled (the loop thread interleaves other tasks).
+"""
+
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import re
+import resource
+import shutil
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from ..config import get_settings
+from ..models.task import TaskContext
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_TOP_FUNCTIONS = 25
+_TOP_ALLOCATIONS = 15
+_TRACEMALLOC_FRAMES = 5
+
+_tracing_runs = 0
+_tracing_started = False  # tracemalloc was started here (not by -X tracemalloc / PYTHONTRACEMALLOC)
+_tracing_lock = threading.Lock()
+
+
+def profiling_requested(task: TaskContext) -> bool:
+    settings = get_settings()
+    return bool(
+        settings.profiling_enabled
+        or task.profile
+        or (settings.profiling_label and settings.profiling_label in task.labels)
+    )
+
+
+def profiles_dir() -> Path:
+    settings = get_settings()
+    return Path(settings.profiles_dir or Path(settings.workspace_base) / "profiles")
+
+
+def _rusage() -> dict[str, float]:
+    me = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "cpu_seconds": me.ru_utime + me.ru_stime,
+        "children_cpu_seconds": children.ru_utime + children.ru_stime,
+        "children_max_rss_kb": children.ru_maxrss,
+    }
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _Stage:
+    __slots__ = ("name", "profiles", "lock", "record")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.profiles: list[cProfile.Profile] = []
+        self.lock = threading.Lock()
+        self.record: dict[str, Any] = {"stage": name}
+
+    def add(self, profile: cProfile.Profile) -> None:
+        with self.lock:
+            self.profiles.append(profile)
+
+
+class RunProfiler:
+    """Collects one run's per-stage profiles; write() saves them."""
+
+    def __init__(self, task: TaskContext) -> None:
+        self.task = task
+        self.stages: list[_Stage] = []
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        stage = _Stage(name)
+        with self._lock:
+            self.stages.append(stage)
+        token = _stage.set(stage)
+        # Snapshots are slow; take them outside the measured window.
+        snapshot = tracemalloc.take_snapshot()
+        traced_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        profile = None
+        if not _in_event_loop():
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # another profiler is active in this thread
+                profile = None
+        before = _rusage()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            after = _rusage()
+            if profile is not None:
+                profile.disable()
+                stage.add(profile)
+            traced_after, traced_peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:_TOP_ALLOCATIONS]
+            stage.record.update(
+                wall_seconds=round(elapsed, 4),
+                cpu_seconds=round(after["cpu_seconds"] - before["cpu_seconds"], 4),
+                children_cpu_seconds=round(after["children_cpu_seconds"] - before["children_cpu_seconds"], 4),
+                children_max_rss_kb=after["children_max_rss_kb"],
+                traced_memory_bytes=traced_after,
+                traced_delta_bytes=traced_after - traced_before,
+                traced_peak_bytes=traced_peak,
+                top_allocations=[
+                    {"where": str(s.traceback[0]), "size_diff": s.size_diff, "count_diff": s.count_diff}
+                    for s in top if s.size_diff > 0
+                ],
+            )
+            _stage.reset(token)
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn (on a pool thread) under cProfile, attributed to the stage that submitted it."""
+        stage = _stage.get()
+        if stage is None:
+            return fn(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            stage.add(profile)
+
+    def write(self) -> Path:
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", self.task.ticket_id).strip("-") or "task"
+        out = profiles_dir() / f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(self.started))}-{slug}-{self.task.task_id}"
+        out.mkdir(parents=True, exist_ok=True)
+        summary = []
+        for i, stage in enumerate(self.stages, 1):
+            record = dict(stage.record)
+            if stage.profiles:
+                stats = pstats.Stats(stage.profiles[0])
+                for extra in stage.profiles[1:]:
+                    stats.add(extra)
+                path = out / f"{i:02d}-{stage.name}.prof"
+                stats.dump_stats(path)
+                record["profile"] = path.name
+                record["top_functions"] = _top_functions(stats)
+            summary.append(record)
+        (out / "summary.json").write_text(
+            json.dumps(
+                {
+                    "task_id": self.task.task_id,
+                    "ticket_id": self.task.ticket_id,
+                    "repo": self.task.repo_full_name,
+                    "started_at": self.started,
+                    "wall_seconds": round(time.time() - self.started, 3),
+                    "stages": summary,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        _prune(profiles_dir(), get_settings().profiles_keep)
+        return out
+
+
+def _top_functions(stats: pstats.Stats) -> list[dict[str, Any]]:
+    """Functions by cumulative time: file:line(name), calls, own and cumulative seconds."""
+    rows = []
+    for (file, line, name), (_, calls, own, cumulative, _) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append({
+            "function": f"{file}:{line}({name})", "calls": calls,
+            "tottime": round(own, 4), "cumtime": round(cumulative, 4),
+        })
+    rows.sort(key=lambda r: r["cumtime"], reverse=True)
+    return rows[:_TOP_FUNCTIONS]
+
+
+def _prune(root: Path, keep: int) -> None:
+    runs = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.name, reverse=True)
+    for old in runs[max(keep, 1):]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+_current: ContextVar[RunProfiler | None] = ContextVar("run_profiler", default=None)
+_stage: ContextVar[_Stage | None] = ContextVar("profiled_stage", default=None)
+
+
+def current_profiler() -> RunProfiler | None:
+    return _current.get()
+
+
+@contextmanager
+def profile_run(task: TaskContext) -> Iterator[RunProfiler | None]:
+    """Profile task's run if requested (see profiling_requested); artifacts are written when the block exits."""
+    global _tracing_runs, _tracing_started
+    if not profiling_requested(task):
+        yield None
+        return
+    profiler = RunProfiler(task)
+    with _tracing_lock:
+        if _tracing_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+            _tracing_started = True
+        _tracing_runs += 1
+    token = _current.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current.reset(token)
+        try:
+            path = profiler.write()
+            logger.info("[%s] Profile written to %s", task.ticket_id, path)
+        except OSError as e:
+            logger.warning("[%s] Writing profile failed: %s", task.ticket_id, e)
+        with _tracing_lock:
+            _tracing_runs -= 1
+            if _tracing_runs == 0 and _tracing_started:
+                tracemalloc.stop()
+                _tracing_started = False
+
+
+@contextmanager
+def profile_stage(name: str) -> Iterator[None]:
+    """Profile a stage of the current run (no-op when the run isn't profiled)."""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def profiled_call(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """fn(*args, **kwargs), under the current run's profiler if any (stage pools wrap submitted calls)."""
+    profiler = _current.get()
+    if profiler is None:
+        return fn(*args, **kwargs)
+    return profiler.call(fn, *args, **kwargs)
@@ -0,0 +1,259 @@
+"""
+Task progress: status store and in-process event bus behind GET /api/tasks/{task_id} (and its SSE stream).
+run_pipeline publishes stage transitions through a ProgressReporter; the current reporter is held in a
+contextvar so services (e.g. llm.chat token usage) can report without threading it through every call.
+Status lives in the process that runs the pipeline: with standalone workers (`python -m src.worker`)
+the API process only sees the "queued" state.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from ..models.events import PipelineEvent, TaskStatus
+from ..models.task import TaskContext
+from .deadline import check_deadline
+from .logging import log_context
+from .metrics import STAGE_SECONDS, TASKS, span
+from .profiling import profile_stage
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = frozenset(
+    {"succeeded", "no_changes", "validation_failed", "skipped", "failed", "cancelled", "timed_out"}
+)
+
+_MAX_TASKS = 1000
+_MAX_EVENTS_PER_TASK = 500
+
+
+class _Entry:
+    __slots__ = ("status", "events", "seq")
+
+    def __init__(self, status: TaskStatus) -> None:
+        self.status = status
+        self.events: list[PipelineEvent] = []
+        self.seq = 0
+
+
+class Subscription:
+    """Events for one task delivered to an asyncio queue on the subscriber's loop."""
+
+    def __init__(self, task_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        self.task_id = task_id
+        self.loop = loop
+        self.queue: asyncio.Queue[PipelineEvent] = asyncio.Queue()
+
+
+class ProgressStore:
+    """Bounded per-task status + event history, with fan-out to SSE subscribers (thread-safe publish)."""
+
+    def __init__(self, max_tasks: int = _MAX_TASKS) -> None:
+        self.max_tasks = max_tasks
+        self._tasks: OrderedDict[str, _Entry] = OrderedDict()
+        self._subscribers: dict[str, list[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, task: TaskContext) -> TaskStatus:
+        """Create (or return) the status entry for task in state "queued"."""
+        with self._lock:
+            entry = self._tasks.get(task.task_id)
+            if entry is None:
+                now = time.time()
+                entry = _Entry(TaskStatus(
+                    task_id=task.task_id,
+                    ticket_id=task.ticket_id,
+                    repo_full_name=task.repo_full_name,
+                    created_at=now,
+                    updated_at=now,
+                ))
+                self._tasks[task.task_id] = entry
+                while len(self._tasks) > self.max_tasks:
+                    self._tasks.popitem(last=False)
+            return entry.status.model_copy()
+
+    def get(self, task_id: str) -> TaskStatus | None:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            return entry.status.model_copy() if entry else None
+
+    def update(self, task_id: str, event_type: str | None = None, **changes: Any) -> None:
+        """Apply status changes; when event_type is given, also record and publish an event."""
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is None:
+                return
+            status = entry.status
+            now = time.time()
+            for k, v in changes.items():
+                if hasattr(status, k):
+                    setattr(status, k, v)
+            status.updated_at = now
+            if status.state == "running" and status.started_at is None:
+                status.started_at = now
+            if status.state in TERMINAL_STATES and status.finished_at is None:
+                status.finished_at = now
+            if event_type is None:
+                return
+            detail = changes.pop("detail", None) or {}
+            entry.seq += 1
+            event = PipelineEvent(
+                task_id=task_id,
+                seq=entry.seq,
+                type=event_type,
+                stage=changes.get("event_stage", status.stage),
+                state=status.state,
+                attempt=status.attempt or None,
+                duration_seconds=changes.get("duration_seconds"),
+                detail=detail,
+                timestamp=now,
+            )
+            entry.events.append(event)
+            if len(entry.events) > _MAX_EVENTS_PER_TASK:
+                del entry.events[1:-_MAX_EVENTS_PER_TASK + 1]  # keep the first event and the most recent ones
+            subscribers = list(self._subscribers.get(task_id, ()))
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.queue.put_nowait, event)
+            except RuntimeError:
+                self.unsubscribe(sub)  # subscriber's loop is closed
+
+    def add_stage_duration(self, task_id: str, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is not None:
+                durations = entry.status.stage_durations
+                durations[stage] = round(durations.get(stage, 0.0) + seconds, 3)
+
+    def add_usage(self, task_id: str, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is not None:
+                entry.status.llm_calls += 1
+                entry.status.input_tokens += input_tokens
+                entry.status.output_tokens += output_tokens
+                entry.status.updated_at = time.time()
+
+    def history(self, task_id: str) -> list[PipelineEvent]:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            return list(entry.events) if entry else []
+
+    def subscribe(self, task_id: str) -> Subscription:
+        """Subscribe from a running event loop. Subscribe before reading history(); dedupe by seq."""
+        sub = Subscription(task_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(task_id, []).append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.task_id)
+            if subs and sub in subs:
+                subs.remove(sub)
+                if not subs:
+                    del self._subscribers[sub.task_id]
+
+
+_store = ProgressStore()
+
+
+def get_progress_store() -> ProgressStore:
+    return _store
+
+
+class ProgressReporter:
+    """Publishes one pipeline run's progress (stages, attempts, token usage, outcome) to the store."""
+
+    def __init__(self, task: TaskContext, store: ProgressStore | None = None) -> None:
+        self.task_id = task.task_id
+        self.ticket_id = task.ticket_id
+        self.store = store or _store
+        self.store.register(task)
+        self.finished = False
+
+    @contextmanager
+    def activate(self) -> Iterator["ProgressReporter"]:
+        """Mark the task running and make this the current reporter. Unfinished runs end as failed/succeeded."""
+        token = _current.set(self)
+        self.store.update(self.task_id, "state", state="running")
+        try:
+            with log_context(task_id=self.ticket_id, run_id=self.task_id):
+                yield self
+        except BaseException as e:
+            if not self.finished:
+                self.finish("failed", error=f"{type(e).__name__}: {e}"[:500])
+            raise
+        else:
+            if not self.finished:
+                self.finish("succeeded")
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a pipeline stage and publish stage_started / stage_finished (or stage_failed).
+        Raises DeadlineExceeded before starting if the task's deadline has passed.
+        """
+        check_deadline(name)
+        self.store.update(self.task_id, "stage_started", stage=name)
+        started = time.monotonic()
+        try:
+            with span("stage", STAGE_SECONDS, stage=name) as sp, profile_stage(name), log_context(stage=name):
+                sp.set(task_id=self.task_id)
+                yield
+        except BaseException as e:
+            elapsed = time.monotonic() - started
+            self.store.add_stage_duration(self.task_id, name, elapsed)
+            self.store.update(
+                self.task_id, "stage_failed", event_stage=name, duration_seconds=round(elapsed, 3),
+                detail={"error": f"{type(e).__name__}: {e}"[:500]},
+            )
+            raise
+        elapsed = time.monotonic() - started
+        self.store.add_stage_duration(self.task_id, name, elapsed)
+        self.store.update(self.task_id, "stage_finished", event_stage=name, duration_seconds=round(elapsed, 3))
+
+    def set_attempt(self, attempt: int) -> None:
+        self.store.update(self.task_id, "attempt", attempt=attempt)
+
+    def add_usage(self, input_tokens: int, output_tokens: int) -> None:
+        self.store.add_usage(self.task_id, input_tokens, output_tokens)
+
+    def hand_off(self, state: str, **detail: Any) -> None:
+        """Record a non-terminal state (e.g. "delivering") that another component will finish; the run ends here."""
+        self.finished = True
+        TASKS.inc(state=state)
+        self.store.update(self.task_id, "state", state=state, stage=None, detail=detail)
+
+    def finish(self, state: str, **detail: Any) -> None:
+        """Record the terminal state (see TERMINAL_STATES); pr_url / error are copied onto the status."""
+        self.finished = True
+        TASKS.inc(state=state)
+        fields = {k: detail[k] for k in ("pr_url", "error") if detail.get(k)}
+        self.store.update(self.task_id, "state", state=state, stage=None, detail=detail, **fields)
+
+
+_current: ContextVar[ProgressReporter | None] = ContextVar("progress_reporter", default=None)
+
+
+def current_reporter() -> ProgressReporter | None:
+    return _current.get()
+
+
+def task_accepted(task: TaskContext) -> None:
+    """Register a task as queued (webhook accept), so GET /api/tasks/{task_id} works before a worker picks it up."""
+    _store.register(task)
+
+
+def record_llm_usage(input_tokens: int, output_tokens: int) -> None:
+    """Add token usage to the current task, if any (no-op outside a pipeline run)."""
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.add_usage(input_tokens, output_tokens)
@@ -0,0 +1,186 @@
+"""
+Resource-limited sandbox for validation subprocesses (F5.1, F5.2).
+Scrubbed environment, own process group, rlimits, and a cgroup v2 group (cpu.max / memory.max) when available.
+Limits are applied in the child before exec by a /bin/sh launcher (echo $$ > cgroup.procs, ulimit), so nothing
+the command forks escapes them and no preexec_fn runs in a threaded parent.
+"""
+
+import logging
+import math
+import os
+import shlex
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Environment variables passed through to repo commands; everything else (tokens, API keys) is dropped.
+ENV_ALLOWLIST = (
+    "PATH",
+    "HOME",
+    "USER",
+    "LOGNAME",
+    "SHELL",
+    "LANG",
+    "LC_ALL",
+    "LC_CTYPE",
+    "TERM",
+    "TZ",
+    "TMPDIR",
+)
+
+_CPU_PERIOD_US = 100_000
+_cgroup_root_ready: bool | None = None
+_cpu_fallback_warned = False
+
+
+def _write(path: Path, value: str) -> None:
+    path.write_text(value, encoding="utf-8")
+
+
+def _prepare_cgroup_root(root: Path) -> bool:
+    """Create the agent's parent cgroup and enable cpu/memory for its children (once per process)."""
+    global _cgroup_root_ready
+    if _cgroup_root_ready is not None:
+        return _cgroup_root_ready
+    _cgroup_root_ready = False
+    try:
+        if not (root.parent / "cgroup.controllers").is_file():
+            logger.info("cgroup v2 not available at %s; sandbox uses rlimits only", root.parent)
+            return False
+        root.mkdir(exist_ok=True)
+        _write(root / "cgroup.subtree_control", "+cpu +memory")
+        _cgroup_root_ready = True
+    except OSError as e:
+        logger.info("Cannot set up cgroup %s (%s); sandbox uses rlimits only", root, e)
+    return _cgroup_root_ready
+
+
+class Sandbox:
+    """
+    Per-command sandbox. Use as a context manager around run_bounded:
+    run wrap(cmd, env, timeout) with env() as the environment.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        cpu_share: float = 1.0,
+        memory_mb: int = 4096,
+        cgroup_root: str = "",
+        env_passthrough: list[str] | None = None,
+    ) -> None:
+        self.enabled = enabled
+        self.cpu_share = cpu_share
+        self.memory_mb = memory_mb
+        self.cgroup_root = Path(cgroup_root) if cgroup_root else None
+        self.env_passthrough = list(env_passthrough or [])
+        self.cgroup: Path | None = None
+
+    @classmethod
+    def from_settings(cls) -> "Sandbox":
+        settings = get_settings()
+        return cls(
+            enabled=settings.sandbox_enabled,
+            cpu_share=settings.sandbox_cpu_share,
+            memory_mb=settings.sandbox_memory_mb,
+            cgroup_root=settings.sandbox_cgroup_root,
+            env_passthrough=settings.sandbox_env_passthrough,
+        )
+
+    def __enter__(self) -> "Sandbox":
+        if self.enabled and self.cgroup_root and _prepare_cgroup_root(self.cgroup_root):
+            group = self.cgroup_root / f"task-{uuid.uuid4().hex[:12]}"
+            try:
+                group.mkdir()
+                if self.cpu_share > 0:
+                    _write(group / "cpu.max", f"{int(self.cpu_share * _CPU_PERIOD_US)} {_CPU_PERIOD_US}")
+                if self.memory_mb > 0:
+                    _write(group / "memory.max", str(self.memory_mb * 1024 * 1024))
+                    _write(group / "memory.swap.max", "0")
+                self.cgroup = group
+            except OSError as e:
+                logger.debug("cgroup %s setup failed: %s", group, e)
+                self._remove_cgroup(group)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self.cgroup is not None:
+            self._remove_cgroup(self.cgroup)
+            self.cgroup = None
+
+    def env(self, extra: dict[str, str] | None = None) -> dict[str, str]:
+        """Environment for the sandboxed command: allowlisted variables only unless the sandbox is disabled."""
+        if not self.enabled:
+            return {**os.environ, **(extra or {})}
+        keep = set(ENV_ALLOWLIST) | set(self.env_passthrough)
+        env = {k: v for k, v in os.environ.items() if k in keep}
+        env.update({"CI": "true", "PYTHONDONTWRITEBYTECODE": "1"})
+        env.update(extra or {})
+        return env
+
+    def wrap(self, cmd: list[str], env: dict[str, str] | None = None, timeout: float | None = None) -> list[str]:
+        """
+        cmd behind a launcher that joins the cgroup, or else sets rlimits (core, data, CPU seconds) and nice,
+        then execs it. Raises FileNotFoundError if cmd[0] is not on env's PATH, like a direct spawn would.
+        """
+        if not self.enabled or os.name != "posix" or not os.path.exists("/bin/sh"):
+            return cmd
+        if os.sep not in cmd[0]:
+            path = (env or os.environ).get("PATH", os.defpath)
+            if shutil.which(cmd[0], path=path) is None:
+                raise FileNotFoundError(cmd[0])
+        rlimits = self._rlimit_script(timeout)
+        if self.cgroup is not None:
+            procs = shlex.quote(str(self.cgroup / "cgroup.procs"))
+            script = f"if echo $$ 2>/dev/null > {procs}; then ulimit -c 0; else {rlimits}; fi; exec \"$@\""
+        else:
+            self._warn_cpu_fallback()
+            script = f"{rlimits}; exec \"$@\""
+        return ["/bin/sh", "-c", script, "sandbox", *cmd]
+
+    def _rlimit_script(self, timeout: float | None) -> str:
+        """
+        Fallback limits without a cgroup. The CPU share becomes a CPU-time budget (share x timeout seconds,
+        per process) plus nice 10; unlike cpu.max it does not throttle a command that stays within it.
+        """
+        # -d (RLIMIT_DATA, not RLIMIT_AS) so runtimes that reserve large PROT_NONE regions (V8, JVM) still start.
+        steps = ["ulimit -c 0"]
+        if self.memory_mb > 0:
+            steps.append(f"ulimit -d {self.memory_mb * 1024}")
+        if self.cpu_share > 0:
+            if timeout:
+                steps.append(f"ulimit -t {max(1, math.ceil(self.cpu_share * timeout))}")
+        steps.append("renice -n 10 -p $$ >/dev/null")
+        return "; ".join(f"{step} 2>/dev/null" for step in steps)
+
+    def _warn_cpu_fallback(self) -> None:
+        global _cpu_fallback_warned
+        if self.cpu_share > 0 and not _cpu_fallback_warned:
+            _cpu_fallback_warned = True
+            logger.warning(
+                "No cgroup for the sandbox: SANDBOX_CPU_SHARE=%s is enforced only as a CPU-time limit "
+                "(share x timeout) and nice, not as a CPU share", self.cpu_share,
+            )
+
+    @staticmethod
+    def _remove_cgroup(group: Path) -> None:
+        try:
+            if (group / "cgroup.kill").exists():
+                _write(group / "cgroup.kill", "1")
+        except OSError as e:
+            logger.debug("cgroup.kill on %s failed: %s", group, e)
+        for _ in range(20):
+            try:
+                group.rmdir()
+                return
+            except FileNotFoundError:
+                return
+            except OSError:
+                time.sleep(0.05)  # killed processes are still exiting
+        logger.debug("Could not remove cgroup %s", group)
@@ -0,0 +1,74 @@
+"""Bounded, thread-safe TTL cache (LRU eviction when full)."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """Entries expire ttl seconds after they were set; the least recently used entry is dropped when full."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_live(self, key: K) -> object:
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        if item[0] <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return item[1]
+
+    def _set(self, key: K, value: V, ttl: float | None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            value = self._get_live(key)
+            return default if value is _MISSING else value  # type: ignore[return-value]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key: K, value: V, ttl: float | None = None) -> bool:
+        """Set only if absent (or expired). Returns True if the entry was added."""
+        with self._lock:
+            if self._get_live(key) is not _MISSING:
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            value = self._get_live(key)
+            if value is _MISSING:
+                return default
+            del self._data[key]
+            return value  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return self._get_live(key) is not _MISSING  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
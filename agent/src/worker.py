@@ -0,0 +1,226 @@
+"""
+Pipeline worker entry. Run: python -m src.worker [--concurrency N] [--mode threads|async] (from agent/).
+Pulls tasks from the shared queue (TASK_QUEUE_BACKEND=sqlite|redis) and runs run_pipeline,
+so the API process only validates, deduplicates and enqueues.
+WORKER_MODE=async runs run_pipeline_async for all tasks on one event loop instead of a thread per task.
+Each worker process also drains the delivery outbox (DELIVERY_MODE=outbox) and renews the idempotency leases of
+queued tasks, so a task waiting behind long runs keeps the lease the API took for it.
+WORKER_METRICS_PORT serves the process's Prometheus metrics (the API's are at /api/metrics).
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import threading
+
+from .config import get_settings
+from .core.async_pipeline import run_pipeline_async
+from .core.delivery import get_delivery_worker
+from .core.pipeline import run_pipeline
+from .core.task_queue import QueuedTask, TaskQueue, get_task_queue
+from .core.workspace import get_workspace_reaper
+from .models.task import TaskContext
+from .utils.idempotency import idempotency_acquire, idempotency_renew
+from .utils.logging import configure_logging, log_task
+from .utils.metrics import start_metrics_server
+from .utils.progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+
+def _claim_lease(task: TaskContext) -> bool:
+    """
+    Confirm the lease the API took for task before running it: renew it, or take it again if it lapsed while
+    queued. False when another run holds it meanwhile (the task is then reported skipped and not run).
+    """
+    if task.lease_token is None:
+        return True
+    try:
+        if idempotency_renew(task.ticket_id, task.repo_full_name, task.lease_token):
+            return True
+        token = idempotency_acquire(task.ticket_id, task.repo_full_name)
+    except Exception as e:
+        logger.warning("[%s] Lease check failed, running anyway: %s", task.ticket_id, e)
+        return True
+    if token is None:
+        log_task(
+            logger, task.ticket_id, "Lease lapsed while queued and another run holds it; skipping", run_id=task.task_id
+        )
+        ProgressReporter(task).finish("skipped", reason="another run for this ticket holds the lease")
+        return False
+    task.lease_token = token
+    return True
+
+
+def _keep_queued_leases(queue: TaskQueue, stop: threading.Event) -> None:
+    """Renew the leases of queued tasks every ttl/3, so a task waiting behind long runs keeps its lease."""
+    interval = max(1.0, get_settings().idempotency_lease_ttl_seconds / 3)
+    while not stop.wait(interval):
+        try:
+            tasks = queue.pending()
+        except Exception as e:
+            logger.warning("Listing queued tasks failed: %s", e)
+            continue
+        for task in tasks:
+            if task.lease_token is None:
+                continue
+            try:
+                idempotency_renew(task.ticket_id, task.repo_full_name, task.lease_token)
+            except Exception as e:
+                logger.warning("[%s] Renewing queued lease failed: %s", task.ticket_id, e)
+
+
+def _work_loop(queue: TaskQueue, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            item = queue.get(timeout=1.0)
+        except Exception as e:
+            logger.warning("Queue get failed: %s", e)
+            stop.wait(1.0)
+            continue
+        if item is None:
+            continue
+        log_task(logger, item.task.ticket_id, "Dequeued", queue_id=item.id, repo=item.task.repo_full_name)
+        try:
+            if _claim_lease(item.task):
+                run_pipeline(item.task)
+        except Exception:
+            logger.exception("[%s] Pipeline failed", item.task.ticket_id)
+        finally:
+            try:
+                queue.done(item)
+            except Exception as e:
+                logger.warning("Queue ack failed for %s: %s", item.id, e)
+
+
+async def _run_item_async(queue: TaskQueue, item: QueuedTask) -> None:
+    log_task(logger, item.task.ticket_id, "Dequeued", queue_id=item.id, repo=item.task.repo_full_name)
+    try:
+        if await asyncio.to_thread(_claim_lease, item.task):
+            await run_pipeline_async(item.task)
+    except asyncio.CancelledError:
+        pass  # reported as cancelled by the pipeline; ack so the run isn't replayed
+    except Exception:
+        logger.exception("[%s] Pipeline failed", item.task.ticket_id)
+    finally:
+        try:
+            await asyncio.to_thread(queue.done, item)
+        except Exception as e:
+            logger.warning("Queue ack failed for %s: %s", item.id, e)
+
+
+async def _async_work_loop(
+    queue: TaskQueue, concurrency: int, stop: threading.Event, abort: threading.Event | None
+) -> None:
+    """Run up to concurrency pipelines on this loop. After stop, wait for them; abort cancels the ones still running."""
+    slots = asyncio.Semaphore(concurrency)
+    running: set[asyncio.Task] = set()
+
+    def finished(t: asyncio.Task) -> None:
+        running.discard(t)
+        slots.release()
+
+    while not stop.is_set():
+        await slots.acquire()
+        try:
+            item = await asyncio.to_thread(queue.get, 1.0)
+        except Exception as e:
+            slots.release()
+            logger.warning("Queue get failed: %s", e)
+            await asyncio.sleep(1.0)
+            continue
+        if item is None:
+            slots.release()
+            continue
+        t = asyncio.create_task(_run_item_async(queue, item), name=f"pipeline-{item.task.task_id}")
+        running.add(t)
+        t.add_done_callback(finished)
+
+    while running:
+        if abort is not None and abort.is_set():
+            logger.info("Cancelling %s running pipelines", len(running))
+            for t in running:
+                t.cancel()
+        await asyncio.wait(running, timeout=0.5)
+
+
+def start_workers(
+    concurrency: int, stop: threading.Event, abort: threading.Event | None = None
+) -> list[threading.Thread]:
+    """
+    Start workers consuming the configured queue until stop is set, plus the outbox delivery worker,
+    the workspace reaper and a thread renewing the leases of queued tasks.
+    threads mode: concurrency worker threads. async mode: one thread running an event loop (abort cancels its runs).
+    """
+    queue = get_task_queue()
+    settings = get_settings()
+    # Outbox items from earlier runs (or other processes) are picked up even in inline mode.
+    keeper = threading.Thread(target=_keep_queued_leases, args=(queue, stop), name="queued-leases", daemon=True)
+    keeper.start()
+    background = [get_delivery_worker().start(stop), keeper]
+    get_workspace_reaper().start(stop)
+    if settings.worker_mode == "async":
+        thread = threading.Thread(
+            target=asyncio.run,
+            args=(_async_work_loop(queue, concurrency, stop, abort),),
+            name="pipeline-loop",
+            daemon=True,
+        )
+        thread.start()
+        logger.info("Started async pipeline worker: %s tasks in flight (queue=%s)", concurrency, type(queue).__name__)
+        return [thread, *background]
+    threads = [
+        threading.Thread(target=_work_loop, args=(queue, stop), name=f"pipeline-worker-{i}", daemon=True)
+        for i in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    logger.info("Started %s pipeline workers (queue=%s)", concurrency, type(queue).__name__)
+    return threads + background
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ai-dev-agent pipeline worker")
+    parser.add_argument(
+        "--concurrency", type=int, default=None,
+        help="Tasks in flight (default: WORKER_CONCURRENCY, or ASYNC_WORKER_CONCURRENCY in async mode)",
+    )
+    parser.add_argument("--mode", choices=("threads", "async"), default=None, help="Default: WORKER_MODE")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    if args.mode:
+        settings.worker_mode = args.mode
+    configure_logging(
+        level=settings.log_level, debug=settings.debug,
+        log_format=settings.log_format, queue_size=settings.log_queue_size,
+    )
+    if settings.task_queue_backend == "memory":
+        raise SystemExit("TASK_QUEUE_BACKEND=memory is in-process only; use sqlite or redis for standalone workers")
+    if settings.idempotency_backend == "memory":
+        logger.warning("IDEMPOTENCY_BACKEND=memory: leases taken by the API cannot be released here (they expire by TTL)")
+
+    stop = threading.Event()
+    abort = threading.Event()
+
+    def on_signal(*_: object) -> None:
+        # Second signal: cancel in-flight runs (async mode) instead of waiting for them.
+        (abort if stop.is_set() else stop).set()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, on_signal)
+    default_concurrency = (
+        settings.async_worker_concurrency if settings.worker_mode == "async" else settings.worker_concurrency
+    )
+    threads = start_workers(args.concurrency or default_concurrency, stop, abort)
+    if settings.worker_metrics_port:
+        start_metrics_server(settings.worker_metrics_port, stop)
+    stop.wait()
+    logger.info("Stopping workers; waiting for running pipelines to finish")
+    for t in threads:
+        t.join()
+
+
+if __name__ == "__main__":
+    main()
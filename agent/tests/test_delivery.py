@@ -0,0 +1,112 @@
+"""Outbox delivery: an open PR for the feature branch counts as delivered; items hold the run's lease."""
+
+import subprocess
+
+import pytest
+
+from src.config import get_settings
+from src.core import delivery
+from src.models.task import GitProvider, TaskContext
+from src.utils.idempotency import idempotency_acquire
+
+EXISTING = {"url": "https://github.test/o/r/pull/3", "number": 3, "id": 300}
+CREATED = {"url": "https://github.test/o/r/pull/4", "number": 4, "id": 400}
+
+
+class _Provider:
+    def __init__(self, existing=None, lookup_error: Exception | None = None) -> None:
+        self.existing = existing
+        self.lookup_error = lookup_error
+        self.lookups: list[tuple[str, str, str]] = []
+        self.created: list[str] = []
+
+    def find_open_pull_request(self, repo_owner, repo_name, head_branch):
+        self.lookups.append((repo_owner, repo_name, head_branch))
+        if self.lookup_error:
+            raise self.lookup_error
+        return self.existing
+
+    def create_pull_request(self, repo_owner, repo_name, head_branch, base_branch, title, body, **kwargs):
+        if self.existing:
+            raise RuntimeError("A pull request already exists")
+        self.created.append(head_branch)
+        return CREATED
+
+
+def _task() -> TaskContext:
+    return TaskContext(
+        ticket_id="T-1", title="t", description="", provider=GitProvider.GITHUB,
+        repo_owner="o", repo_name="r", repo_full_name="o/r",
+    )
+
+
+@pytest.mark.parametrize(
+    ("provider", "expected", "created"),
+    [
+        (_Provider(existing=EXISTING), EXISTING, []),
+        (_Provider(), CREATED, ["ai/T-1"]),
+        (_Provider(lookup_error=RuntimeError("HTTP 502")), CREATED, ["ai/T-1"]),
+    ],
+    ids=["already-open", "none-open", "lookup-failed"],
+)
+def test_open_pr_reuses_an_open_pr_for_the_branch(monkeypatch, provider, expected, created):
+    monkeypatch.setattr(delivery, "get_git_provider", lambda _: provider)
+    assert delivery.open_pr(_task(), "ai/T-1") == expected
+    assert provider.lookups == [("o", "r", "ai/T-1")]
+    assert provider.created == created
+
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "workspace_base", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "delivery_max_attempts", 3)
+    return tmp_path / delivery.OUTBOX_DIRNAME
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_outbox_item_holds_the_lease_until_the_pr_is_open(outbox, tmp_path, monkeypatch):
+    for var in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{var}_NAME", "t")
+        monkeypatch.setenv(f"{var}_EMAIL", "t@t")
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    _git(work_dir, "init", "-q", "-b", "main")
+    (work_dir / "README.md").write_text("a\n")
+    _git(work_dir, "add", "-A")
+    _git(work_dir, "commit", "-q", "-m", "base")
+    _git(work_dir, "checkout", "-q", "-b", "ai/T-1")
+    (work_dir / "README.md").write_text("a\nb\n")
+
+    task = _task()
+    task.lease_token = idempotency_acquire(task.ticket_id, task.repo_full_name)
+    token = task.lease_token
+    item_id = delivery.enqueue_delivery(task, work_dir, "ai/T-1", "", None)
+    assert task.lease_token is None  # run_pipeline's release is now a no-op
+    delivery.idempotency_release(task.ticket_id, task.repo_full_name, task.lease_token)
+    assert idempotency_acquire(task.ticket_id, task.repo_full_name) is None  # a repeat webhook is refused
+
+    results = iter([RuntimeError("push rejected"), CREATED])
+
+    def deliver(item, bundle):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(delivery, "deliver_item", deliver)
+    monkeypatch.setattr(delivery, "save_branch_state", lambda *args: None)
+    worker = delivery.DeliveryWorker()
+    path = outbox / f"{item_id}.json"
+    worker._process(path)  # failed attempt: the item waits for its retry, still holding the lease
+    assert path.exists()
+    assert idempotency_acquire(task.ticket_id, task.repo_full_name) is None
+    worker._renew_leases()
+
+    worker._process(path)
+    assert not path.exists()
+    retry = idempotency_acquire(task.ticket_id, task.repo_full_name)
+    assert retry is not None and retry != token
+    delivery.idempotency_release(task.ticket_id, task.repo_full_name, retry)
@@ -0,0 +1,169 @@
+"""GraphQL PR delivery of GitHubProvider against a local HTTP stand-in for the GitHub API."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.config import get_settings
+from src.services.git.github_provider import GitHubProvider
+
+pytest.importorskip("github")
+
+PR_NODE = {"id": "PR_1", "number": 7, "url": "https://github.test/octo/repo/pull/7", "databaseId": 700}
+
+
+class _FakeGitHub(ThreadingHTTPServer):
+    """Records every request; answers GraphQL from `graphql` (a callable on the document) and REST from `rest`."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requests: list[tuple[str, str, dict]] = []
+        self.graphql = lambda document, variables: {"data": {}}
+        self.rest: dict[tuple[str, str], dict] = {}
+        self.drop: set[tuple[str, str]] = set()  # requests answered by closing the connection
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def graphql_calls(self) -> list[dict]:
+        return [body for method, path, body in self.requests if path == "/api/graphql"]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _FakeGitHub
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests.append((self.command, self.path, body))
+        if (self.command, self.path) in self.server.drop:
+            self.close_connection = True
+            return
+        if self.path == "/api/graphql":
+            status, payload = 200, self.server.graphql(body["query"], body["variables"])
+        elif (self.command, self.path) in self.server.rest:
+            status, payload = 200, self.server.rest[(self.command, self.path)]
+        else:
+            status, payload = 404, {"message": "Not Found"}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def github(monkeypatch):
+    server = _FakeGitHub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings = get_settings()
+    monkeypatch.setattr(settings, "github_token", "t0ken")
+    monkeypatch.setattr(settings, "github_api_url", f"{server.base}/api/v3")
+    monkeypatch.setattr(settings, "github_delivery_mode", "graphql")
+    monkeypatch.setattr(settings, "pr_label_ai_generated", "ai-generated")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _graphql_api(document: str, variables: dict) -> dict:
+    if document.startswith("query"):
+        return {"data": {
+            "repository": {"id": "R_1", "label": {"id": "L_1"}},
+            "u0": {"id": "U_alice"},
+        }}
+    if "createPullRequest" in document:
+        return {"data": {"createPullRequest": {"pullRequest": PR_NODE}}}
+    return {"data": {"labels": {"clientMutationId": None}, "reviews": {"clientMutationId": None}}}
+
+
+def _deliver(provider: GitHubProvider) -> dict:
+    return provider.create_pull_request(
+        "octo", "repo", "ai/T-1-readme", "main", "Add a README line", "Body", reviewer_logins=["alice"]
+    )
+
+
+def test_graphql_delivery_documents_and_warm_round_trips(github):
+    github.graphql = _graphql_api
+    provider = GitHubProvider()
+
+    assert _deliver(provider) == {"url": PR_NODE["url"], "number": 7, "id": 700}
+    lookup, create, batch = github.graphql_calls()
+    assert lookup["query"] == (
+        "query($owner: String!, $name: String!, $label: String!, $u0: String!) {"
+        " repository(owner: $owner, name: $name) { id label(name: $label) { id } } u0: user(login: $u0) { id } }"
+    )
+    assert lookup["variables"] == {"owner": "octo", "name": "repo", "label": "ai-generated", "u0": "alice"}
+    assert "createPullRequest(input: $input)" in create["query"]
+    assert create["variables"] == {"input": {
+        "repositoryId": "R_1", "baseRefName": "main", "headRefName": "ai/T-1-readme",
+        "title": "Add a README line", "body": "Body",
+    }}
+    assert batch["query"].startswith("mutation($pr: ID!, $labels: [ID!]!, $users: [ID!]!)")
+    assert "addLabelsToLabelable" in batch["query"] and "requestReviews" in batch["query"]
+    assert batch["variables"] == {"pr": "PR_1", "labels": ["L_1"], "users": ["U_alice"]}
+
+    # Node IDs are cached: a warm delivery is createPullRequest + the batched mutation, nothing else.
+    github.requests.clear()
+    _deliver(provider)
+    assert [path for _, path, _ in github.requests] == ["/api/graphql", "/api/graphql"]
+    create, batch = github.graphql_calls()
+    assert "createPullRequest" in create["query"] and create["variables"]["input"]["repositoryId"] == "R_1"
+    assert batch["variables"] == {"pr": "PR_1", "labels": ["L_1"], "users": ["U_alice"]}
+
+
+def test_create_pull_request_errors_fall_back_to_rest(github):
+    def graphql(document: str, variables: dict) -> dict:
+        if "createPullRequest" in document:
+            return {"data": {"createPullRequest": None}, "errors": [{"message": "Head sha can't be blank"}]}
+        return _graphql_api(document, variables)
+
+    github.graphql = graphql
+    api = f"{github.base}/api/v3"
+    github.rest = {
+        ("GET", "/api/v3/repos/octo/repo"): {"full_name": "octo/repo", "url": f"{api}/repos/octo/repo"},
+        ("POST", "/api/v3/repos/octo/repo/pulls"): {
+            "number": 7, "id": 700, "html_url": PR_NODE["url"],
+            "url": f"{api}/repos/octo/repo/pulls/7", "issue_url": f"{api}/repos/octo/repo/issues/7",
+        },
+        ("POST", "/api/v3/repos/octo/repo/pulls/7/requested_reviewers"): {"number": 7},
+        ("GET", "/api/v3/repos/octo/repo/labels/ai-generated"): {
+            "name": "ai-generated", "url": f"{api}/repos/octo/repo/labels/ai-generated",
+        },
+        ("POST", "/api/v3/repos/octo/repo/issues/7/labels"): [{"name": "ai-generated"}],
+    }
+
+    assert _deliver(GitHubProvider()) == {"url": PR_NODE["url"], "number": 7, "id": 700}
+    assert any("createPullRequest" in call["query"] for call in github.graphql_calls())
+    rest = [(method, path, body) for method, path, body in github.requests if path != "/api/graphql"]
+    assert ("POST", "/api/v3/repos/octo/repo/pulls", {
+        "title": "Add a README line", "body": "Body", "head": "ai/T-1-readme", "base": "main",
+    }) in rest
+    assert ("POST", "/api/v3/repos/octo/repo/pulls/7/requested_reviewers", {"reviewers": ["alice"]}) in rest
+    assert ("POST", "/api/v3/repos/octo/repo/issues/7/labels", ["ai-generated"]) in rest
+
+
+def test_label_create_transport_error_keeps_graphql_delivery(github):
+    def graphql(document: str, variables: dict) -> dict:
+        if document.startswith("query"):
+            return {"data": {"repository": {"id": "R_1", "label": None}, "u0": {"id": "U_alice"}}}
+        return _graphql_api(document, variables)
+
+    github.graphql = graphql
+    github.drop = {("POST", "/api/v3/repos/octo/repo/labels")}
+
+    assert _deliver(GitHubProvider()) == {"url": PR_NODE["url"], "number": 7, "id": 700}
+    assert ("POST", "/api/v3/repos/octo/repo/labels") in [(m, p) for m, p, _ in github.requests]
+    batch = github.graphql_calls()[-1]
+    assert batch["query"].startswith("mutation($pr: ID!, $users: [ID!]!)")
+    assert batch["variables"] == {"pr": "PR_1", "users": ["U_alice"]}
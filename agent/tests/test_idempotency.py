@@ -0,0 +1,64 @@
+"""Lease semantics of the idempotency backends, against fakeredis and the in-process store."""
+
+import time
+
+import pytest
+
+from src.utils.idempotency import MemoryIdempotencyBackend, RedisIdempotencyBackend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+TTL_MS = 60_000
+
+
+@pytest.fixture(params=["redis", "memory"])
+def backend(request):
+    if request.param == "redis":
+        return RedisIdempotencyBackend(client=fakeredis.FakeRedis())
+    return MemoryIdempotencyBackend()
+
+
+def test_acquire_then_conflict(backend):
+    assert backend.acquire("task:T-1:o/r", "a", TTL_MS)
+    assert not backend.acquire("task:T-1:o/r", "b", TTL_MS)
+    assert backend.is_held("task:T-1:o/r")
+    assert backend.acquire("task:T-2:o/r", "b", TTL_MS)
+
+
+def test_renew_with_owner_token(backend):
+    backend.acquire("k", "a", 200)
+    assert backend.renew("k", "a", TTL_MS)
+    time.sleep(0.3)
+    assert backend.is_held("k")
+
+
+def test_renew_with_wrong_token_rejected(backend):
+    backend.acquire("k", "a", 200)
+    assert not backend.renew("k", "b", TTL_MS)
+    time.sleep(0.3)
+    assert not backend.is_held("k")
+
+
+def test_release_is_compare_and_delete(backend):
+    backend.acquire("k", "a", TTL_MS)
+    assert not backend.release("k", "b")
+    assert backend.is_held("k")
+    assert backend.release("k", "a")
+    assert not backend.is_held("k")
+    assert not backend.release("k", "a")
+
+
+def test_release_after_takeover_keeps_new_owner(backend):
+    backend.acquire("k", "a", 100)
+    time.sleep(0.2)
+    assert backend.acquire("k", "b", TTL_MS)
+    assert not backend.release("k", "a")
+    assert backend.is_held("k")
+
+
+def test_lease_expires_after_ttl(backend):
+    assert backend.acquire("k", "a", 100)
+    time.sleep(0.2)
+    assert not backend.is_held("k")
+    assert not backend.renew("k", "a", TTL_MS)
+    assert backend.acquire("k", "b", TTL_MS)
@@ -0,0 +1,59 @@
+"""PR-comment runs keep the original ticket id across review rounds."""
+
+import pytest
+
+from src.config import get_settings
+from src.core import pr_feedback
+from src.models.events import PRCommentPayload
+from src.models.plan import ImplementationPlan
+from src.services.branch_state import load_branch_state, save_branch_state
+from src.utils.progress import ProgressReporter
+
+BRANCH = "ai/PROJ-7-readme"
+
+
+class _Provider:
+    def get_pull_request(self, repo_owner, repo_name, pr_number):
+        return {
+            "url": "https://github.test/o/r/pull/12", "number": pr_number, "head_branch": BRANCH,
+            "base_branch": "main", "author": "agent-bot", "title": "PROJ-7: Add a README line",
+            "body": "PR body", "state": "open",
+        }
+
+
+@pytest.fixture
+def commits(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "workspace_base", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "anthropic_api_key", "sk-test")
+    messages: list[str] = []
+    monkeypatch.setattr(pr_feedback, "get_git_provider", lambda _: _Provider())
+    monkeypatch.setattr(pr_feedback, "ensure_mirror", lambda url, mirror: mirror)
+    monkeypatch.setattr(pr_feedback, "mirror_worktree", lambda mirror, path, branch: path.mkdir(parents=True))
+    monkeypatch.setattr(pr_feedback, "_branch_diff", lambda work_dir, base: ("", ["README.md"]))
+    monkeypatch.setattr(pr_feedback, "apply_review_feedback", lambda *args: None)
+    monkeypatch.setattr(pr_feedback, "validate_with_self_heal", lambda *args: (True, False))
+    monkeypatch.setattr(pr_feedback, "has_changes", lambda work_dir: True)
+    monkeypatch.setattr(pr_feedback, "commit", lambda work_dir, message: messages.append(message))
+    monkeypatch.setattr(pr_feedback, "push", lambda work_dir, branch: None)
+    return messages
+
+
+def _comment_task(comment_id: int):
+    return pr_feedback.comment_task(PRCommentPayload(
+        provider="github", repo_owner="o", repo_name="r", repo_full_name="o/r", pr_number=12,
+        comment_id=comment_id, comment_body="Please reword", comment_author="reviewer",
+    ))
+
+
+def test_two_feedback_rounds_keep_the_ticket_id(commits):
+    first = _comment_task(1)
+    original = first.model_copy(update={"ticket_id": "PROJ-7", "title": "Add a README line", "description": "d"})
+    save_branch_state(original, BRANCH, "repo map", ImplementationPlan())
+
+    for comment_id in (1, 2):
+        task = _comment_task(comment_id)
+        pr_feedback.run_pr_feedback(task, ProgressReporter(task))
+
+    assert commits == ["PROJ-7: address review feedback"] * 2
+    state = load_branch_state(first, BRANCH)
+    assert (state.ticket_id, state.title, state.description) == ("PROJ-7", "Add a README line", "d")
@@ -0,0 +1,61 @@
+"""Claim / ack / stale-claim recovery of the Redis task queue, against fakeredis."""
+
+import pytest
+
+from src.config import get_settings
+from src.core import task_queue
+from src.core.task_queue import RedisTaskQueue
+from src.models.task import GitProvider, TaskContext
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _task(ticket_id: str) -> TaskContext:
+    return TaskContext(
+        ticket_id=ticket_id, title="t", description="", provider=GitProvider.GITHUB,
+        repo_owner="o", repo_name="r", repo_full_name="o/r",
+    )
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis()
+
+
+def test_claim_and_ack(client):
+    q = RedisTaskQueue(client=client)
+    q.put(_task("T-1"))
+    q.put(_task("T-2"))
+    assert [t.ticket_id for t in q.pending()] == ["T-1", "T-2"]
+    item = q.get(timeout=0.1)
+    assert item.task.ticket_id == "T-1"
+    assert (q.depth(), q.running()) == (1, 1)
+    q.done(item)
+    assert (q.depth(), q.running()) == (1, 0)
+    assert client.hlen("ai-dev-agent:queue:claims") == 0
+
+
+def test_stale_claims_are_requeued(client, monkeypatch):
+    monkeypatch.setattr(task_queue, "_REDIS_REQUEUE_INTERVAL", 0.0)
+    dead = RedisTaskQueue(client=client)
+    dead.put(_task("T-1"))
+    dead.put(_task("T-2"))
+    assert dead.get(timeout=0.1).task.ticket_id == "T-1"  # worker dies holding T-1
+    # ... and another died between BLMOVE and recording its claim time.
+    client.lmove("ai-dev-agent:queue:pending", "ai-dev-agent:queue:processing", "RIGHT", "LEFT")
+
+    live = RedisTaskQueue(client=client)
+    assert live.get(timeout=0.1) is None  # claims are fresh: nothing is requeued yet
+    assert live.running() == 2
+
+    settings = get_settings()
+    timeout = settings.task_timeout_seconds
+    monkeypatch.setattr(settings, "task_timeout_seconds", 0)  # every claim is now stale
+    live._requeue_stale()
+    monkeypatch.setattr(settings, "task_timeout_seconds", timeout)
+    assert (live.depth(), live.running()) == (2, 0)
+    claimed = [live.get(timeout=0.1), live.get(timeout=0.1)]
+    assert sorted(item.task.ticket_id for item in claimed) == ["T-1", "T-2"]
+    for item in claimed:
+        live.done(item)
+    assert (live.depth(), live.running()) == (0, 0)
@@ -0,0 +1,96 @@
+"""Webhook ingress: delivery-ID deduplication and follow-up runs for comments on a busy PR."""
+
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import api_router
+from src.api.routes import webhooks
+from src.config import get_settings
+from src.core.admission import AdmissionDecision
+from src.core.ingress import FollowUps
+from src.utils.idempotency import idempotency_acquire, idempotency_release
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(get_settings(), "webhook_debounce_seconds", 0)
+    monkeypatch.setattr(webhooks, "enqueue_task", lambda task: task.task_id)
+    app = FastAPI()
+    app.include_router(api_router)
+    return TestClient(app)
+
+
+def _issue(number: int) -> dict:
+    return {
+        "issue": {"number": number, "title": "Add a README line", "body": "Add one line to README.", "labels": []},
+        "repository": {
+            "full_name": "octo/repo", "name": "repo", "default_branch": "main", "owner": {"login": "octo"},
+        },
+    }
+
+
+def test_rejected_delivery_is_accepted_on_retry(client, monkeypatch):
+    decisions = iter([
+        AdmissionDecision(False, 429, "Queue full (50 waiting)", 30),
+        AdmissionDecision(True, 201, "", 0),
+    ])
+    monkeypatch.setattr(webhooks, "check_admission", lambda: next(decisions))
+    headers = {"X-GitHub-Delivery": uuid.uuid4().hex}
+    body = _issue(9001)
+
+    first = client.post("/api/webhook/task", json=body, headers=headers)
+    assert first.status_code == 429
+    assert first.headers["Retry-After"] == "30"
+
+    retry = client.post("/api/webhook/task", json=body, headers=headers)
+    assert retry.status_code == 201
+    assert retry.json()["status"] == "accepted"
+
+    again = client.post("/api/webhook/task", json=body, headers=headers)
+    assert again.status_code == 200
+    assert again.json()["status"] == "duplicate"
+
+
+def test_bad_payload_is_not_remembered(client):
+    headers = {"X-GitHub-Delivery": uuid.uuid4().hex}
+    assert client.post("/api/webhook/task", content=b"not json", headers=headers).status_code == 400
+    assert client.post("/api/webhook/task", content=b"not json", headers=headers).status_code == 400
+
+
+def _review_comment(comment_id: int, text: str) -> dict:
+    return {
+        "action": "created",
+        "comment": {"id": comment_id, "body": text, "user": {"login": "reviewer"}},
+        "pull_request": {
+            "number": 12, "user": {"login": "agent-bot"}, "head": {"ref": "ai/T-1-readme"}, "base": {"ref": "main"},
+        },
+        "repository": {"full_name": "octo/repo", "default_branch": "main"},
+    }
+
+
+def test_comments_during_a_run_become_one_follow_up_run(client, monkeypatch):
+    queued = []
+    follow_ups = FollowUps(poll_interval=3600)
+    monkeypatch.setattr(webhooks, "enqueue_task", queued.append)
+    monkeypatch.setattr(webhooks, "get_follow_ups", lambda: follow_ups)
+    monkeypatch.setattr(webhooks, "check_admission", lambda: AdmissionDecision(True, 201, "", 0))
+    running = idempotency_acquire("#12", "octo/repo")  # a feedback run for PR #12 is in progress
+    assert running is not None
+
+    first = client.post("/api/webhook/pr-comment", json=_review_comment(1, "Reword the line"))
+    second = client.post("/api/webhook/pr-comment", json=_review_comment(2, "And fix the typo"))
+    assert (first.status_code, first.json()["status"]) == (202, "deferred")
+    assert second.json()["task_id"] == first.json()["task_id"]
+    assert follow_ups.drain() == 0 and queued == []  # still running
+
+    idempotency_release("#12", "octo/repo", running)
+    assert follow_ups.drain() == 1
+    (task,) = queued
+    assert [c.comment_id for c in task.pr_comments] == [1, 2]
+    assert task.task_id == first.json()["task_id"]
+    assert task.lease_token is not None
+    assert idempotency_acquire("#12", "octo/repo") is None  # the follow-up run holds the lease
+    idempotency_release("#12", "octo/repo", task.lease_token)